@@ -0,0 +1,496 @@
+# backends.py - v1.0
+# Key/value storage backends behind the shared pricing cache and the conversation session store:
+# in-memory (one process), SQLite in WAL mode (all workers on a node) and Redis over RESP (all nodes).
+# Values are bytes with an optional TTL; callers namespace their keys (e.g. "pricing:", "session:").
+# Dependencies: none (stdlib sqlite3 / socket). Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from urllib.parse import unquote, urlparse
+
+BACKEND_KINDS = ("memory", "sqlite", "redis")
+
+
+class BackendError(RuntimeError):
+    """Storage backend unreachable or returned an error."""
+
+
+class CacheBackend(ABC):
+    """
+    Byte values by string key, each with an optional TTL in seconds. get() counts as a use for LRU
+    eviction where the backend bounds its size. add() stores only if the key is absent (leases).
+    touch() slides a key's TTL; backends override it to skip the read and rewrite of the value.
+    """
+
+    kind = "abstract"
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None: ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl_seconds: float | None = None) -> bool: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def keys(self, prefix: str = "") -> list[str]: ...
+
+    def touch(self, key: str, ttl_seconds: float | None = None) -> bool:
+        """Restart key's TTL (None: no expiry) without rewriting its value. False if the key is absent."""
+        value = self.get(key)
+        if value is None:
+            return False
+        self.set(key, value, ttl_seconds)
+        return True
+
+    def sweep(self) -> int:
+        """Drop expired keys now (backends that expire lazily). Returns the number removed."""
+        return 0
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": self.kind}
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local dict with LRU eviction by entry count and total value bytes."""
+
+    kind = "memory"
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def _expires(self, ttl_seconds: float | None) -> float | None:
+        return None if ttl_seconds is None else self._clock() + ttl_seconds
+
+    def _live(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= self._clock():
+            self._pop(key)
+            return None
+        return item[0]
+
+    def _pop(self, key: str) -> None:
+        value, _ = self._data.pop(key)
+        self._bytes -= len(value)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._live(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            if self._max_bytes is not None and len(value) > self._max_bytes:
+                self._evictions += 1
+                return
+            self._data[key] = (value, self._expires(ttl_seconds))
+            self._bytes += len(value)
+            while (self._max_entries is not None and len(self._data) > self._max_entries) or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                self._pop(next(iter(self._data)))
+                self._evictions += 1
+
+    def add(self, key: str, value: bytes, ttl_seconds: float | None = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._data[key] = (value, self._expires(ttl_seconds))
+            self._bytes += len(value)
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._pop(key)
+            return True
+
+    def keys(self, prefix: str = "") -> list[str]:
+        with self._lock:
+            return [k for k in list(self._data) if k.startswith(prefix) and self._live(k) is not None]
+
+    def touch(self, key: str, ttl_seconds: float | None = None) -> bool:
+        with self._lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self._data[key] = (value, self._expires(ttl_seconds))
+            self._data.move_to_end(key)
+            return True
+
+    def sweep(self) -> int:
+        now = self._clock()
+        with self._lock:
+            expired = [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]
+            for k in expired:
+                self._pop(k)
+            return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"backend": self.kind, "entries": len(self._data), "bytes": self._bytes, "evictions": self._evictions}
+
+
+class SqliteBackend(CacheBackend):
+    """
+    One table of a SQLite file in WAL mode; any number of processes on the host may open it at once.
+    LRU eviction by entry count and total value bytes, like MemoryBackend. A read records its use time
+    only when the stored one is older than touch_interval_seconds, so hot keys are not a write per read
+    (LRU order is that coarse). A call that cannot get the write lock within timeout_seconds, like any
+    other sqlite3 error, raises BackendError.
+    """
+
+    kind = "sqlite"
+
+    def __init__(
+        self,
+        path: str | Path,
+        table: str = "kv",
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        clock: Callable[[], float] = time.time,
+        timeout_seconds: float = 1.0,
+        touch_interval_seconds: float = 60,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._table = table
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._timeout = timeout_seconds
+        self._touch_interval = touch_interval_seconds
+        self._evictions = 0
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+        with self._connection() as db:
+            db.executescript(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, expires_at REAL, accessed_at REAL NOT NULL);"
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at);"
+            )
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """One connection shared by this process' threads (every use holds self._lock); reopened after close()."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, timeout=self._timeout, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """The connection, held under self._lock; sqlite3 errors are raised as BackendError."""
+        with self._lock:
+            try:
+                yield self._db
+            except sqlite3.Error as e:
+                raise BackendError(f"SQLite {self.path}: {e}") from e
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Serialize with this process' threads and, via BEGIN IMMEDIATE, with the other processes."""
+        with self._connection() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _expires(self, ttl_seconds: float | None) -> float | None:
+        return None if ttl_seconds is None else self._clock() + ttl_seconds
+
+    def get(self, key: str) -> bytes | None:
+        now = self._clock()
+        t = self._table
+        with self._connection() as db:
+            row = db.execute(
+                f"SELECT value, accessed_at FROM {t} WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self._touch_interval:
+                db.execute(f"UPDATE {t} SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        t = self._table
+        with self._transaction() as db:
+            if self._max_bytes is not None and len(value) > self._max_bytes:
+                db.execute(f"DELETE FROM {t} WHERE key = ?", (key,))
+                self._evictions += 1
+                return
+            db.execute(
+                f"INSERT OR REPLACE INTO {t} (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), self._expires(ttl_seconds), self._clock()),
+            )
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        if self._max_entries is None and self._max_bytes is None:
+            return
+        max_entries = self._max_entries if self._max_entries is not None else float("inf")
+        max_bytes = self._max_bytes if self._max_bytes is not None else float("inf")
+        count, total = db.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self._table}").fetchone()
+        victims = []
+        if count > max_entries or total > max_bytes:
+            for key, size in db.execute(f"SELECT key, size FROM {self._table} ORDER BY accessed_at"):
+                if count <= max_entries and total <= max_bytes:
+                    break
+                victims.append((key,))
+                count -= 1
+                total -= size
+        db.executemany(f"DELETE FROM {self._table} WHERE key = ?", victims)
+        self._evictions += len(victims)
+
+    def add(self, key: str, value: bytes, ttl_seconds: float | None = None) -> bool:
+        t = self._table
+        with self._transaction() as db:
+            db.execute(f"DELETE FROM {t} WHERE key = ? AND expires_at <= ?", (key, self._clock()))
+            cur = db.execute(
+                f"INSERT OR IGNORE INTO {t} (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), self._expires(ttl_seconds), self._clock()),
+            )
+            return cur.rowcount == 1
+
+    def delete(self, key: str) -> bool:
+        with self._connection() as db:
+            return db.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,)).rowcount > 0
+
+    def touch(self, key: str, ttl_seconds: float | None = None) -> bool:
+        now = self._clock()
+        with self._connection() as db:
+            return db.execute(
+                f"UPDATE {self._table} SET expires_at = ?, accessed_at = ?"
+                " WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (self._expires(ttl_seconds), now, key, now),
+            ).rowcount > 0
+
+    def keys(self, prefix: str = "") -> list[str]:
+        with self._connection() as db:
+            rows = db.execute(
+                f"SELECT key FROM {self._table} WHERE substr(key, 1, ?) = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (len(prefix), prefix, self._clock()),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def sweep(self) -> int:
+        with self._connection() as db:
+            return db.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (self._clock(),)).rowcount
+
+    def stats(self) -> dict[str, Any]:
+        with self._connection() as db:
+            count, total = db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self._table}"
+            ).fetchone()
+        return {
+            "backend": self.kind,
+            "path": str(self.path),
+            "entries": count,
+            "bytes": total,
+            "evictions": self._evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                conn.close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal Redis client over the RESP protocol (GET / SET PX NX / DEL / PEXPIRE / SCAN), so any Redis-compatible
+    server works without a client library. Size bounds and eviction are the server's maxmemory policy.
+    URL: redis://[:password@]host[:port][/db].
+    """
+
+    kind = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout_seconds: float = 5.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL: {url!r}")
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._db = int((parsed.path or "/0").lstrip("/") or 0)
+        self._username = unquote(parsed.username) if parsed.username else None
+        self._password = unquote(parsed.password) if parsed.password else None
+        self._timeout = timeout_seconds
+        self._sock: socket.socket | None = None
+        self._reader: Any = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        self._sock, self._reader = sock, sock.makefile("rb")
+        if self._password is not None:
+            auth = [self._username, self._password] if self._username else [self._password]
+            self._roundtrip("AUTH", *auth)
+        if self._db:
+            self._roundtrip("SELECT", self._db)
+
+    def _disconnect(self) -> None:
+        sock, self._sock = self._sock, None
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.close()
+        if sock is not None:
+            sock.close()
+
+    def _roundtrip(self, *args: Any) -> Any:
+        assert self._sock is not None
+        parts = [f"*{len(args)}\r\n".encode()]
+        for a in args:
+            b = a if isinstance(a, bytes) else str(a).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(b), b))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise BackendError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            n = int(body)
+            if n < 0:
+                return None
+            data = self._reader.read(n + 2)
+            if len(data) != n + 2:
+                raise ConnectionError("Connection closed by Redis server")
+            return data[:-2]
+        if kind == b"*":
+            n = int(body)
+            return None if n < 0 else [self._read_reply() for _ in range(n)]
+        raise BackendError(f"Unexpected Redis reply: {line[:40]!r}")
+
+    def command(self, *args: Any, retry: bool = True) -> Any:
+        """
+        Send one command and return its decoded reply. On a dropped connection, reconnects and sends it
+        once more. retry=False is for commands that must not run twice (SET NX): the server may have run
+        the first send before the reply was lost, so it is resent only if it never left this process.
+        """
+        with self._lock:
+            for attempt in (1, 2):
+                sent = False
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    sent = True
+                    return self._roundtrip(*args)
+                except BackendError:
+                    raise
+                except OSError as e:  # includes ConnectionError and socket timeouts
+                    self._disconnect()
+                    if attempt == 2 or (sent and not retry):
+                        raise BackendError(f"Redis {self._host}:{self._port}: {e}") from e
+
+    @staticmethod
+    def _px(ttl_seconds: float | None) -> list[Any]:
+        return [] if ttl_seconds is None else ["PX", max(1, int(ttl_seconds * 1000))]
+
+    def get(self, key: str) -> bytes | None:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        self.command("SET", key, value, *self._px(ttl_seconds))
+
+    def add(self, key: str, value: bytes, ttl_seconds: float | None = None) -> bool:
+        # Not resent: if a lost reply hid our own successful SET NX, a retry would answer "taken".
+        return self.command("SET", key, value, "NX", *self._px(ttl_seconds), retry=False) is not None
+
+    def delete(self, key: str) -> bool:
+        return self.command("DEL", key) > 0
+
+    def touch(self, key: str, ttl_seconds: float | None = None) -> bool:
+        if ttl_seconds is None:
+            # PERSIST answers 0 both for a missing key and for one without a TTL.
+            return self.command("PERSIST", key) == 1 or self.command("EXISTS", key) == 1
+        return self.command("PEXPIRE", key, max(1, int(ttl_seconds * 1000))) == 1
+
+    def keys(self, prefix: str = "") -> list[str]:
+        pattern = "".join("\\" + c if c in "*?[]\\" else c for c in prefix) + "*"
+        found: set[str] = set()
+        cursor = b"0"
+        while True:
+            cursor, batch = self.command("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            found.update(k.decode() for k in batch)
+            if cursor in (b"0", "0"):
+                return sorted(found)
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": self.kind, "server": f"{self._host}:{self._port}/{self._db}"}
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+def make_backend(
+    kind: str,
+    path: str | Path | None = None,
+    table: str = "kv",
+    redis_url: str | None = None,
+    max_entries: int | None = None,
+    max_bytes: int | None = None,
+) -> CacheBackend:
+    """Backend by kind (memory | sqlite | redis), as configured by environment settings."""
+    kind = kind.lower()
+    if kind == "memory":
+        return MemoryBackend(max_entries, max_bytes)
+    if kind == "sqlite":
+        if path is None:
+            raise ValueError("sqlite backend needs a path")
+        return SqliteBackend(path, table, max_entries, max_bytes)
+    if kind == "redis":
+        return RedisBackend(redis_url or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown backend {kind!r} (expected one of: {', '.join(BACKEND_KINDS)})")
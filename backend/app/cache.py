@@ -1,64 +1,355 @@
 # cache.py - v1.0
 # TTL cache for pricing responses. Keys: service, region, currency, storage_class (if S3).
+# Bounded (entries + approx bytes, LRU eviction), thread-safe, with optional background sweep of expired entries.
+# aget_or_compute coalesces concurrent misses for the same key on the event loop (single-flight: one
+# computation, the rest await it) and can serve expired entries (stale) while a background task refreshes them.
 # Dependencies: none. Port: N/A.
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import sys
+import threading
 import time
-from typing import Any, Callable, TypeVar
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+
+class CacheResult(NamedTuple):
+    """Outcome of aget_or_compute. stale=True: served past TTL while a background refresh runs."""
+    value: Any
+    cached_at: float
+    from_cache: bool
+    stale: bool
+
+
+def approx_size(value: Any) -> int:
+    """Approximate bytes held by value (recursive sys.getsizeof over dict/list/tuple/set)."""
+    seen: set[int] = set()
+    stack = [value]
+    total = 0
+    while stack:
+        v = stack.pop()
+        if id(v) in seen:
+            continue
+        seen.add(id(v))
+        total += sys.getsizeof(v)
+        if isinstance(v, dict):
+            stack.extend(v.keys())
+            stack.extend(v.values())
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            stack.extend(v)
+    return total
+
+
+class _Entry:
+    __slots__ = ("value", "cached_at", "size", "fields")
+
+    def __init__(self, value: Any, cached_at: float, size: int, fields: dict[str, Any]):
+        self.value = value
+        self.cached_at = cached_at
+        self.size = size
+        self.fields = fields
+
 
 class TTLCache:
-    """Simple in-memory TTL cache. Default TTL 24 hours."""
+    """
+    Thread-safe in-memory TTL cache with LRU eviction. Default TTL 24 hours.
+    Bounded by entry count and approximate bytes; expired entries are dropped on read and by
+    an optional background sweep (start_sweeper). stats() reports hit/miss/eviction counters.
+    With stale_ttl_seconds > 0, entries are kept that much longer past the TTL so aget_or_compute
+    can serve them stale while refreshing.
+    """
 
-    def __init__(self, ttl_seconds: float = 86400):
+    def __init__(
+        self,
+        ttl_seconds: float = 86400,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        stale_ttl_seconds: float = 0,
+    ):
         self._ttl = ttl_seconds
-        self._store: dict[str, tuple[Any, float]] = {}
+        self._stale_ttl = stale_ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._store: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale_hits = 0
+        self._refreshes = 0
+        self._aflights: dict[str, asyncio.Future[Any]] = {}
+        self._tasks: set[asyncio.Future[Any]] = set()
+        self._sweeper: threading.Thread | None = None
+        self._stop_sweeper = threading.Event()
+
+    # Clock for cached_at and ages; a cache shared between processes needs wall-clock time.
+    _now = staticmethod(time.monotonic)
 
     def _key(self, **kwargs: Any) -> str:
         parts = [f"{k}={v}" for k, v in sorted(kwargs.items()) if v is not None]
         return "|".join(parts)
 
+    def _remove(self, k: str) -> None:
+        entry = self._store.pop(k)
+        self._bytes -= entry.size
+
+    def _lookup(
+        self, k: str, count: bool = True, allow_stale: bool = False
+    ) -> tuple[Any, float, bool] | None:
+        """(value, cached_at, stale) or None. Entries past ttl + stale_ttl are dropped."""
+        with self._lock:
+            entry = self._store.get(k)
+            stale = False
+            if entry is not None:
+                age = self._now() - entry.cached_at
+                if age > self._ttl + self._stale_ttl:
+                    self._remove(k)
+                    self._expirations += 1
+                    entry = None
+                elif age > self._ttl:
+                    stale = True
+                    if not allow_stale:
+                        entry = None
+            if entry is None:
+                if count:
+                    self._misses += 1
+                return None
+            self._store.move_to_end(k)
+            if count:
+                self._hits += 1
+                self._stale_hits += stale
+            return (entry.value, entry.cached_at, stale)
+
     def get(self, **kwargs: Any) -> tuple[Any, float] | None:
         """Return (value, cached_at_timestamp) or None if miss/expired."""
-        k = self._key(**kwargs)
-        if k not in self._store:
-            return None
-        val, cached_at = self._store[k]
-        if time.monotonic() - cached_at > self._ttl:
-            del self._store[k]
-            return None
-        return (val, cached_at)
+        hit = self._lookup(self._key(**kwargs))
+        return None if hit is None else (hit[0], hit[1])
+
+    def get_stale(self, **kwargs: Any) -> tuple[Any, float, bool] | None:
+        """Return (value, cached_at, stale): also serves entries past the TTL but within stale_ttl."""
+        return self._lookup(self._key(**kwargs), allow_stale=True)
 
     def set(self, value: Any, **kwargs: Any) -> None:
+        """Store value; evicts least recently used entries while over max_entries / max_bytes.
+        A single value larger than max_bytes is not stored."""
         k = self._key(**kwargs)
-        self._store[k] = (value, time.monotonic())
+        size = approx_size(value)
+        with self._lock:
+            if k in self._store:
+                self._remove(k)
+            if size > self._max_bytes:
+                self._evictions += 1
+                return
+            self._store[k] = _Entry(value, self._now(), size, kwargs)
+            self._bytes += size
+            while len(self._store) > self._max_entries or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._store)))
+                self._evictions += 1
 
     def invalidate(self, **kwargs: Any) -> bool:
         """Remove entry if present. Returns True if removed."""
         k = self._key(**kwargs)
-        if k in self._store:
-            del self._store[k]
-            return True
-        return False
+        with self._lock:
+            if k in self._store:
+                self._remove(k)
+                return True
+            return False
+
+    def find(self, **match: Any) -> list[dict[str, Any]]:
+        """Key fields of every stored entry (fresh or stale) whose fields include all of match."""
+        with self._lock:
+            return [
+                dict(e.fields)
+                for e in self._store.values()
+                if all(e.fields.get(f) == v for f, v in match.items())
+            ]
 
     def invalidate_all(self) -> None:
-        self._store.clear()
-
-
-def cached(cache: TTLCache, key_fields: list[str]):
-    """Decorator: cache result of async or sync function by key_fields (kwargs names)."""
-
-    def decorator(f: Callable[..., T]) -> Callable[..., T]:
-        def wrapper(*args: Any, **kwargs: Any) -> T:
-            key_kw = {k: kwargs.get(k) for k in key_fields if k in kwargs}
-            hit = cache.get(**key_kw)
-            if hit is not None:
-                return hit[0]
-            result = f(*args, **kwargs)
-            cache.set(result, **key_kw)
-            return result
-        return wrapper
-    return decorator
+        with self._lock:
+            self._store.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def sweep(self) -> int:
+        """Drop all expired entries. Returns the number removed."""
+        now = self._now()
+        with self._lock:
+            max_age = self._ttl + self._stale_ttl
+            expired = [k for k, e in self._store.items() if now - e.cached_at > max_age]
+            for k in expired:
+                self._remove(k)
+            self._expirations += len(expired)
+            return len(expired)
+
+    def start_sweeper(self, interval_seconds: float = 300) -> None:
+        """Run sweep() every interval_seconds on a daemon thread (idempotent)."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+
+        def run() -> None:
+            while not self._stop_sweeper.wait(interval_seconds):
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=run, name="ttlcache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    def close(self) -> None:
+        """Stop the sweeper."""
+        self.stop_sweeper()
+
+    def stats(self) -> dict[str, int | float]:
+        """Counters and size accounting for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "stale_ttl_seconds": self._stale_ttl,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "background_refreshes": self._refreshes,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    # Store access from coroutines. Here the store is in memory, so these are plain calls; a subclass whose
+    # store does I/O overrides them to keep that I/O off the event loop.
+
+    async def _alookup(
+        self, k: str, count: bool = True, allow_stale: bool = False
+    ) -> tuple[Any, float, bool] | None:
+        return self._lookup(k, count, allow_stale)
+
+    async def _aset(self, value: Any, kwargs: dict[str, Any]) -> None:
+        self.set(value, **kwargs)
+
+    async def ainvalidate(self, **kwargs: Any) -> bool:
+        """invalidate() for coroutines."""
+        return self.invalidate(**kwargs)
+
+    async def afind(self, **match: Any) -> list[dict[str, Any]]:
+        """find() for coroutines."""
+        return self.find(**match)
+
+    async def aget_or_compute(
+        self,
+        compute: Callable[[], Awaitable[T]],
+        cache_if: Callable[[T], bool] | None = None,
+        allow_stale: bool = False,
+        **kwargs: Any,
+    ) -> CacheResult:
+        """
+        Return CacheResult(value, cached_at, from_cache, stale). On a miss, compute() runs once per key even
+        if many callers miss at the same time; the others await the same result (or exception). The value
+        is stored only if cache_if(value) is true (default: always). allow_stale: an entry past its TTL
+        (but within stale_ttl) is returned immediately with stale=True and refreshed by a background task
+        (stale-while-revalidate).
+        """
+        k = self._key(**kwargs)
+        hit = await self._alookup(k, allow_stale=allow_stale)
+        if hit is not None:
+            if hit[2]:
+                self._arevalidate(k, compute, cache_if, kwargs)
+            return CacheResult(hit[0], hit[1], True, hit[2])
+        return await singleflight(self._aflights, k, lambda: self._alead(k, compute, cache_if, kwargs))
+
+    async def arefresh(
+        self,
+        compute: Callable[[], Awaitable[T]],
+        cache_if: Callable[[T], bool] | None = None,
+        **kwargs: Any,
+    ) -> CacheResult:
+        """Recompute and replace an entry; readers keep getting the current value until the new one is
+        stored (nothing is invalidated first). Joins an in-flight computation for the key if any."""
+        k = self._key(**kwargs)
+        return await singleflight(
+            self._aflights, k, lambda: self._alead(k, compute, cache_if, kwargs, replace=True)
+        )
+
+    async def _alead(
+        self,
+        k: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] | None,
+        kwargs: dict[str, Any],
+        replace: bool = False,
+    ) -> CacheResult:
+        hit = None if replace else await self._alookup(k, count=False)
+        if hit is not None:
+            return CacheResult(hit[0], hit[1], True, False)
+        value = await compute()
+        if cache_if is None or cache_if(value):
+            await self._aset(value, kwargs)
+        return CacheResult(value, self._now(), False, False)
+
+    def _arevalidate(
+        self,
+        k: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] | None,
+        kwargs: dict[str, Any],
+    ) -> None:
+        if k in self._aflights:
+            return
+        self._refreshes += 1
+        task = _flight(self._aflights, k, lambda: self._alead(k, compute, cache_if, kwargs))
+        self._tasks.add(task)
+
+        def done(t: asyncio.Future[Any]) -> None:
+            self._tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.error("Background refresh failed for %s", k, exc_info=t.exception())
+
+        task.add_done_callback(done)
+
+
+async def singleflight(
+    flights: dict[str, asyncio.Future[Any]], key: str, factory: Callable[[], Awaitable[T]]
+) -> T:
+    """
+    Run factory() once per key among concurrent callers on the event loop; the rest await its result.
+    The computation runs in its own task: a caller that is cancelled (e.g. its client disconnected) only
+    stops waiting, while the others still get the result.
+    """
+    return await asyncio.shield(_flight(flights, key, factory))
+
+
+def _flight(
+    flights: dict[str, asyncio.Future[Any]], key: str, factory: Callable[[], Awaitable[T]]
+) -> asyncio.Future[T]:
+    """The running task for key, started from factory() if there is none; removed from flights when done."""
+    task = flights.get(key)
+    if task is not None:
+        return task
+    task = asyncio.ensure_future(factory())
+    flights[key] = task
+
+    def done(t: asyncio.Future[Any]) -> None:
+        if flights.get(key) is t:
+            del flights[key]
+        if not t.cancelled():
+            t.exception()  # retrieved: no "never retrieved" warning when every caller went away
+
+    task.add_done_callback(done)
+    return task
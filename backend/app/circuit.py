@@ -0,0 +1,97 @@
+# circuit.py - v1.0
+# Circuit breaker for upstream pricing sources (public price list host, AWS Pricing API): after repeated
+# failures calls are rejected immediately for a cool-down period instead of each waiting out a timeout.
+# Dependencies: none. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Literal
+
+# Consecutive failures that open a circuit, and how long it stays open before one trial call is let through.
+FAILURE_THRESHOLD = int(os.environ.get("PRICING_CIRCUIT_FAILURE_THRESHOLD", "5"))
+RESET_SECONDS = float(os.environ.get("PRICING_CIRCUIT_RESET_SECONDS", "30"))
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed / open / half-open breaker. Callers ask allow() before calling the upstream and
+    report the outcome with record_success() / record_failure(). While open, allow() is False until
+    reset_seconds have passed; then a single trial call is allowed (half-open): success closes the
+    circuit, failure opens it again. A trial that never reports back is replaced after reset_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_seconds: float = RESET_SECONDS,
+    ):
+        self.name = name
+        self._threshold = max(1, failure_threshold)
+        self._reset = reset_seconds
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._trips = 0
+        self._rejected = 0
+
+    _now = staticmethod(time.monotonic)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go to the upstream now (False: fail fast)."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            now = self._now()
+            last = self._opened_at if self._state == "open" else self._trial_at
+            if now - last >= self._reset:
+                self._state = "half_open"
+                self._trial_at = now
+                return True
+            self._rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed (0 when closed)."""
+        with self._lock:
+            if self._state == "closed":
+                return 0.0
+            last = self._opened_at if self._state == "open" else self._trial_at
+            return max(0.0, self._reset - (self._now() - last))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or (self._state == "closed" and self._failures >= self._threshold):
+                self._state = "open"
+                self._opened_at = self._now()
+                self._trips += 1
+
+    def status(self) -> dict[str, Any]:
+        """State and counters for /health."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self._threshold,
+                "reset_seconds": self._reset,
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
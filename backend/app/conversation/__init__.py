@@ -1,14 +1,21 @@
 # conversation - v1.0
 # AI conversation engine for multi-cloud calculator. Deps: anthropic, state, prompts.
-# Exposes: session store, mode-aware prompts, Claude engine.
+# Exposes: session store, mode-aware prompts, Claude engine, shared Anthropic client.
 
-from .state import create_or_update_session, get_session
-from .engine import chat_turn
+from .state import create_or_update_session, get_session, save_session, session_stats
+from .client import close_client, get_client, preload_client
+from .engine import chat_turn, chat_turn_stream
 from .prompts import get_system_prompt
 
 __all__ = [
     "get_session",
     "create_or_update_session",
+    "save_session",
+    "session_stats",
     "chat_turn",
+    "chat_turn_stream",
+    "get_client",
+    "preload_client",
+    "close_client",
     "get_system_prompt",
 ]
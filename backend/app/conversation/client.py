@@ -0,0 +1,84 @@
+# client.py - v1.0
+# Process-wide Anthropic client: created lazily on first use (or preloaded at startup), then reused by every
+# chat turn and thread so turns share one keep-alive connection pool instead of a new TLS handshake each.
+# Deps: anthropic, httpx. Port: N/A.
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+
+ANTHROPIC_TIMEOUT_SECONDS = float(os.environ.get("ANTHROPIC_TIMEOUT_SECONDS", "120"))
+ANTHROPIC_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("ANTHROPIC_CONNECT_TIMEOUT_SECONDS", "10"))
+ANTHROPIC_MAX_RETRIES = int(os.environ.get("ANTHROPIC_MAX_RETRIES", "2"))
+ANTHROPIC_MAX_CONNECTIONS = int(os.environ.get("ANTHROPIC_MAX_CONNECTIONS", "20"))
+ANTHROPIC_MAX_KEEPALIVE = int(os.environ.get("ANTHROPIC_MAX_KEEPALIVE", "10"))
+
+
+class ClientUnavailable(RuntimeError):
+    """No API key configured, or the anthropic package is not installed. str(e) is user-facing."""
+
+
+_lock = threading.Lock()
+_client: Any = None
+_client_key: str | None = None
+
+
+def get_client() -> Any:
+    """Shared anthropic.Anthropic for the current ANTHROPIC_API_KEY. If the key changes, a new client is
+    built and the old one closed, so its connection pool is not leaked (a turn still using it fails)."""
+    global _client, _client_key
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ClientUnavailable(
+            "Conversation is not configured: ANTHROPIC_API_KEY is missing. Set it in .env to use the AI assistant."
+        )
+    client = _client
+    if client is not None and _client_key == api_key:
+        return client
+    with _lock:
+        if _client is not None and _client_key == api_key:
+            return _client
+        old = _client
+        try:
+            import anthropic
+            import httpx
+        except ImportError as e:
+            raise ClientUnavailable(
+                "Server error: anthropic package not installed. Add 'anthropic' to requirements.txt and reinstall."
+            ) from e
+        _client = anthropic.Anthropic(
+            api_key=api_key,
+            max_retries=ANTHROPIC_MAX_RETRIES,
+            timeout=httpx.Timeout(ANTHROPIC_TIMEOUT_SECONDS, connect=ANTHROPIC_CONNECT_TIMEOUT_SECONDS),
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANTHROPIC_MAX_KEEPALIVE,
+                ),
+            ),
+        )
+        _client_key = api_key
+        client = _client
+    if old is not None:
+        old.close()
+    return client
+
+
+def preload_client() -> bool:
+    """Import anthropic and build the client ahead of the first turn (startup). False if unavailable."""
+    try:
+        get_client()
+    except ClientUnavailable:
+        return False
+    return True
+
+
+def close_client() -> None:
+    """Close the shared client's connection pool (app shutdown)."""
+    global _client, _client_key
+    with _lock:
+        client, _client, _client_key = _client, None, None
+    if client is not None:
+        client.close()
@@ -1,56 +1,26 @@
 # engine.py - v1.0
-# Conversation turn via Anthropic Claude; supports optional image (vision) for architecture drawings.
-# Deps: anthropic, state, prompts. Port: N/A.
+# Conversation turn via Anthropic Claude, blocking or streamed; supports optional image (vision) for
+# architecture drawings.
+# Deps: client (shared Anthropic client), state, prompts. Port: N/A.
 
 from __future__ import annotations
 
 import os
-from typing import Any
+from typing import Any, Iterator
 
+from .client import ClientUnavailable, get_client
 from .prompts import get_system_prompt
 from .state import ConversationMode, Session
 
-def chat_turn(
+
+def _request(
     session: Session,
     user_message: str,
-    image_base64: str | None = None,
-    image_media_type: str | None = None,
+    image_base64: str | None,
+    image_media_type: str | None,
 ) -> dict[str, Any]:
-    """
-    Call Claude with session history + current user message (and optional image). Append user + assistant to session.
-    Returns { "reply": str, "session_id": str, "recommendation": None }.
-    """
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        session.append("user", user_message)
-        session.append(
-            "assistant",
-            "Conversation is not configured: ANTHROPIC_API_KEY is missing. Set it in .env to use the AI assistant.",
-        )
-        return {
-            "reply": session.messages[-1].content,
-            "session_id": session.session_id,
-            "recommendation": None,
-        }
-
-    try:
-        import anthropic
-    except ImportError:
-        session.append("user", user_message)
-        session.append(
-            "assistant",
-            "Server error: anthropic package not installed. Add 'anthropic' to requirements.txt and reinstall.",
-        )
-        return {
-            "reply": session.messages[-1].content,
-            "session_id": session.session_id,
-            "recommendation": None,
-        }
-
-    client = anthropic.Anthropic(api_key=api_key)
-    system = get_system_prompt(session.mode)
-
-    # Build messages: previous turns (text only) + current user turn (text + optional image)
+    """messages.create / messages.stream arguments: previous turns (text only) + current user turn
+    (text + optional image)."""
     messages: list[dict[str, Any]] = [
         {"role": "user" if m.role == "user" else "assistant", "content": m.content}
         for m in session.messages
@@ -71,20 +41,15 @@ def chat_turn(
     else:
         messages.append({"role": "user", "content": user_message})
 
-    model = os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
-    max_tokens = int(os.environ.get("ANTHROPIC_MAX_TOKENS", "1024"))
+    return {
+        "model": os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-20250514"),
+        "max_tokens": int(os.environ.get("ANTHROPIC_MAX_TOKENS", "1024")),
+        "system": get_system_prompt(session.mode),
+        "messages": messages,
+    }
 
-    try:
-        response = client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            system=system,
-            messages=messages,
-        )
-        reply_text = response.content[0].text if response.content else ""
-    except Exception as e:
-        reply_text = f"Sorry, the assistant encountered an error: {str(e)}"
 
+def _finish_turn(session: Session, user_message: str, reply_text: str) -> dict[str, Any]:
     session.append("user", user_message or "[Image attached]")
     session.append("assistant", reply_text)
     return {
@@ -92,3 +57,56 @@ def chat_turn(
         "session_id": session.session_id,
         "recommendation": None,
     }
+
+
+def chat_turn(
+    session: Session,
+    user_message: str,
+    image_base64: str | None = None,
+    image_media_type: str | None = None,
+) -> dict[str, Any]:
+    """
+    Call Claude with session history + current user message (and optional image). Append user + assistant to session.
+    Returns { "reply": str, "session_id": str, "recommendation": None }.
+    """
+    try:
+        client = get_client()
+    except ClientUnavailable as e:
+        return _finish_turn(session, user_message, str(e))
+
+    try:
+        response = client.messages.create(**_request(session, user_message, image_base64, image_media_type))
+        reply_text = response.content[0].text if response.content else ""
+    except Exception as e:
+        reply_text = f"Sorry, the assistant encountered an error: {str(e)}"
+    return _finish_turn(session, user_message, reply_text)
+
+
+def chat_turn_stream(
+    session: Session,
+    user_message: str,
+    image_base64: str | None = None,
+    image_media_type: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streaming chat_turn. Yields {"type": "delta", "text"} events as Claude generates, then one
+    {"type": "done", **chat_turn result}; user + assistant are appended to session just before "done".
+    "done".reply is authoritative (on an error mid-stream it is the error message, not the partial text).
+    If the consumer stops early (client disconnected), the turn is not recorded.
+    """
+    try:
+        client = get_client()
+    except ClientUnavailable as e:
+        yield {"type": "done", **_finish_turn(session, user_message, str(e))}
+        return
+
+    parts: list[str] = []
+    try:
+        with client.messages.stream(**_request(session, user_message, image_base64, image_media_type)) as stream:
+            for text in stream.text_stream:
+                parts.append(text)
+                yield {"type": "delta", "text": text}
+        reply_text = "".join(parts)
+    except Exception as e:
+        reply_text = f"Sorry, the assistant encountered an error: {str(e)}"
+    yield {"type": "done", **_finish_turn(session, user_message, reply_text)}
@@ -1,15 +1,36 @@
 # state.py - v1.0
-# In-memory session store for conversation (session_id -> messages, mode). Redis in Phase 2.
-# Deps: none. Port: N/A.
+# Session store for conversation (session_id -> messages, mode), kept in a storage backend: in-memory by
+# default, SQLite or Redis so any worker / replica can serve any session (no sticky sessions needed).
+# Deps: backends. Port: N/A.
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+import threading
+import time
 import uuid
-from dataclasses import dataclass, field
-from typing import Literal
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+from ..backends import CacheBackend, make_backend
 
 ConversationMode = Literal["expert", "balanced", "guided"]
 
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory")
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH") or os.path.join(
+    tempfile.gettempdir(), "awspricing-sessions.sqlite3"
+)
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# Bounds: live sessions (LRU eviction) and their total bytes, idle expiry, and a per-session budget
+# (oldest messages are dropped first).
+SESSION_MAX_SESSIONS = int(os.environ.get("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_TOTAL_BYTES = int(os.environ.get("SESSION_MAX_TOTAL_BYTES", str(256 * 1024 * 1024)))
+SESSION_IDLE_SECONDS = float(os.environ.get("SESSION_IDLE_SECONDS", "7200"))
+SESSION_MAX_MESSAGES = int(os.environ.get("SESSION_MAX_MESSAGES", "200"))
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(512 * 1024)))
+
 
 @dataclass
 class Message:
@@ -27,7 +48,136 @@ class Session:
         self.messages.append(Message(role=role, content=content))
 
 
-_sessions: dict[str, Session] = {}
+class SessionStore:
+    """
+    Sessions serialized as JSON under "session:<id>" in a backend. Callers save() after changing one.
+    Every read (a backend touch, not a rewrite) or save restarts the idle timeout; the backend evicts least
+    recently used sessions when it holds too many (or too many bytes). save() trims the oldest messages
+    to the per-session budget, keeping the history starting with a user turn. The session count in
+    stats() is recounted at most once per sweep interval, since counting lists every session key.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        idle_seconds: float | None = None,
+        max_messages: int | None = None,
+        max_bytes: int | None = None,
+        sweep_interval_seconds: float = 60,
+    ):
+        self.backend = backend
+        self._idle = idle_seconds
+        self._max_messages = max_messages
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval_seconds
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        self._trimmed_messages = 0
+        self._expired = 0
+        self._count: int | None = None
+        self._counted_at = 0.0
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    def get(self, session_id: str) -> Session | None:
+        key = self._key(session_id)
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+        if self._idle is not None:
+            self.backend.touch(key, self._idle)  # sliding idle timeout
+        data = json.loads(raw)
+        return Session(
+            session_id=data["session_id"],
+            mode=data["mode"],
+            messages=[Message(**m) for m in data["messages"]],
+        )
+
+    def _encode(self, session: Session) -> bytes:
+        raw = json.dumps(asdict(session)).encode()
+        trimmed = 0
+        messages = session.messages
+        while messages and (
+            (self._max_messages is not None and len(messages) > self._max_messages)
+            or (self._max_bytes is not None and len(raw) > self._max_bytes)
+        ):
+            drop = 1
+            while drop < len(messages) and messages[drop].role != "user":
+                drop += 1
+            del messages[:drop]
+            trimmed += drop
+            raw = json.dumps(asdict(session)).encode()
+        if trimmed:
+            with self._lock:
+                self._trimmed_messages += trimmed
+        return raw
+
+    def save(self, session: Session) -> None:
+        self.backend.set(self._key(session.session_id), self._encode(session), self._idle)
+
+    def create_or_update(self, session_id: str | None = None, mode: ConversationMode = "balanced") -> Session:
+        s = self.get(session_id) if session_id else None
+        if s is None:
+            s = Session(session_id=session_id or str(uuid.uuid4()), mode=mode)
+            self._maybe_sweep()
+        s.mode = mode
+        self.save(s)
+        return s
+
+    def _maybe_sweep(self) -> None:
+        """Drop idle sessions from backends that expire lazily, at most once per sweep interval."""
+        with self._lock:
+            if time.monotonic() - self._last_sweep < self._sweep_interval:
+                return
+            self._last_sweep = time.monotonic()
+        removed = self.backend.sweep()
+        with self._lock:
+            self._expired += removed
+
+    def _session_count(self) -> int:
+        """Live sessions as of the last count, recounted when older than the sweep interval."""
+        with self._lock:
+            if self._count is not None and time.monotonic() - self._counted_at < self._sweep_interval:
+                return self._count
+        count = len(self.backend.keys("session:"))
+        with self._lock:
+            self._count, self._counted_at = count, time.monotonic()
+        return count
+
+    def stats(self) -> dict[str, Any]:
+        """Live sessions (approximate, see _session_count), bytes held and eviction counters for /health."""
+        self._maybe_sweep()
+        stats = self.backend.stats()
+        sessions = self._session_count()
+        with self._lock:
+            return {
+                "backend": stats["backend"],
+                "sessions": sessions,
+                "bytes": stats.get("bytes"),
+                "evictions": stats.get("evictions"),
+                "expired": self._expired,
+                "trimmed_messages": self._trimmed_messages,
+                "idle_seconds": self._idle,
+                "max_messages": self._max_messages,
+                "max_bytes": self._max_bytes,
+            }
+
+
+_sessions = SessionStore(
+    make_backend(
+        SESSION_BACKEND,
+        path=SESSION_STORE_PATH,
+        table="sessions",
+        redis_url=REDIS_URL,
+        max_entries=SESSION_MAX_SESSIONS,
+        max_bytes=SESSION_MAX_TOTAL_BYTES,
+    ),
+    idle_seconds=SESSION_IDLE_SECONDS or None,
+    max_messages=SESSION_MAX_MESSAGES,
+    max_bytes=SESSION_MAX_BYTES,
+)
 
 
 def create_or_update_session(
@@ -35,15 +185,17 @@ def create_or_update_session(
     mode: ConversationMode = "balanced",
 ) -> Session:
     """Create a new session or return existing. If session_id given and exists, update mode if needed."""
-    if session_id and session_id in _sessions:
-        s = _sessions[session_id]
-        s.mode = mode
-        return s
-    sid = session_id or str(uuid.uuid4())
-    s = Session(session_id=sid, mode=mode)
-    _sessions[sid] = s
-    return s
+    return _sessions.create_or_update(session_id, mode)
 
 
 def get_session(session_id: str) -> Session | None:
     return _sessions.get(session_id)
+
+
+def save_session(session: Session) -> None:
+    """Persist a session after appending messages (sessions are copies, not shared objects)."""
+    _sessions.save(session)
+
+
+def session_stats() -> dict[str, Any]:
+    return _sessions.stats()
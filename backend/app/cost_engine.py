@@ -1,12 +1,14 @@
 # cost_engine.py - v1.0
-# Pure cost math: TB/GB conversion, versioning overhead, copy multiplier, tier bands.
+# Pure cost math: TB/GB conversion, versioning overhead, copy multiplier, tier bands, compiled tier schedules.
 # Dependencies: none. Port: N/A (backend internal).
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Literal
+from functools import lru_cache
+from typing import Iterable, Literal
 
 TB_CONVERSION_BINARY = 1024
 TB_CONVERSION_DECIMAL = 1000
@@ -47,8 +49,11 @@ def cost_from_flat_rate(gb: float, rate_per_gb_month: float) -> float:
     return gb * rate_per_gb_month
 
 
-def cost_from_tiers(gb: float, tiers: list[TierBand]) -> float:
-    """Blended monthly cost using tier bands. Tiers must be sorted by from_gb."""
+def cost_from_tiers(gb: float, tiers: list[TierBand] | TierSchedule) -> float:
+    """Blended monthly cost using tier bands. Tiers must be sorted by from_gb; a compiled
+    TierSchedule is evaluated with a binary search instead of walking the bands."""
+    if isinstance(tiers, TierSchedule):
+        return tiers.cost(gb)
     total = 0.0
     remaining = gb
     for band in tiers:
@@ -61,6 +66,65 @@ def cost_from_tiers(gb: float, tiers: list[TierBand]) -> float:
     return total
 
 
+@dataclass(frozen=True)
+class TierSchedule:
+    """
+    Tier bands compiled for repeated evaluation. Band i covers cumulative GB [starts[i], starts[i+1])
+    at rates[i]; base_costs[i] is the cost of everything below it. The last band is open-ended
+    (rate 0 when the source bands were all finite, matching cost_from_tiers). Build with compile_tiers.
+    """
+    starts: tuple[float, ...]
+    base_costs: tuple[float, ...]
+    rates: tuple[float, ...]
+
+    def cost(self, gb: float) -> float:
+        """Blended monthly cost for gb: binary search for the band, then one multiply."""
+        if gb <= 0:
+            return 0.0
+        i = bisect_right(self.starts, gb) - 1
+        return self.base_costs[i] + (gb - self.starts[i]) * self.rates[i]
+
+    def gb_for_cost(self, usd: float) -> float:
+        """Inverse of cost(): the most GB whose monthly cost does not exceed usd (inf if unbounded)."""
+        if usd < 0:
+            return 0.0
+        i = bisect_right(self.base_costs, usd) - 1
+        if self.rates[i] == 0:
+            return self.starts[i + 1] if i + 1 < len(self.starts) else float("inf")
+        return self.starts[i] + (usd - self.base_costs[i]) / self.rates[i]
+
+
+TierKey = tuple[tuple[float, float, float], ...]
+
+
+def tier_key(tiers: Iterable[TierBand] | Iterable[dict[str, float]]) -> TierKey:
+    """Hashable (from_gb, to_gb, rate) key for bands or their JSON dicts, sorted by from_gb."""
+    rows = [
+        (t["from_gb"], t["to_gb"], t["rate_per_gb_month"]) if isinstance(t, dict)
+        else (t.from_gb, t.to_gb, t.rate_per_gb_month)
+        for t in tiers
+    ]
+    return tuple(sorted((float(f), float(to), float(r)) for f, to, r in rows))
+
+
+@lru_cache(maxsize=1024)
+def compile_tiers(key: TierKey) -> TierSchedule:
+    """Compile sorted bands (see tier_key) once; identical tier lists share one schedule."""
+    starts = [0.0]
+    base_costs = [0.0]
+    rates: list[float] = []
+    for from_gb, to_gb, rate in key:
+        rates.append(rate)
+        if to_gb == float("inf"):
+            break
+        width = max(0.0, to_gb - from_gb)
+        starts.append(starts[-1] + width)
+        base_costs.append(base_costs[-1] + width * rate)
+    else:
+        rates.append(0.0)  # GB beyond the last finite band costs nothing
+    return TierSchedule(tuple(starts), tuple(base_costs), tuple(rates))
+
+
 def aws_backup_total(
     base_gb: float,
     rate_per_gb_month: float,
@@ -75,7 +139,7 @@ def aws_backup_total(
 def s3_versioning_total(
     base_gb: float,
     overhead_pct: float,
-    tiers: list[TierBand],
+    tiers: list[TierBand] | TierSchedule,
     copy_mult: float = 1.0,
     flat_addon_usd: float = 0.0,
 ) -> float:
@@ -85,6 +149,29 @@ def s3_versioning_total(
     return base_cost * copy_mult + flat_addon_usd
 
 
+def aws_backup_gb_for_total(
+    total_usd: float,
+    rate_per_gb_month: float,
+    copy_mult: float,
+    flat_addon_usd: float = 0.0,
+) -> float:
+    """Inverse of aws_backup_total: base GB whose total does not exceed total_usd."""
+    spend = max(0.0, total_usd - flat_addon_usd) / copy_mult
+    return spend / rate_per_gb_month if rate_per_gb_month > 0 else float("inf")
+
+
+def s3_versioning_gb_for_total(
+    total_usd: float,
+    overhead_pct: float,
+    schedule: TierSchedule,
+    copy_mult: float = 1.0,
+    flat_addon_usd: float = 0.0,
+) -> float:
+    """Inverse of s3_versioning_total: base GB (before versioning overhead) within total_usd."""
+    spend = max(0.0, total_usd - flat_addon_usd) / copy_mult
+    return schedule.gb_for_cost(spend) / (1.0 + overhead_pct)
+
+
 def delta_usd(cost: float, reference: float) -> float:
     """cost - reference."""
     return cost - reference
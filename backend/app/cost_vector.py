@@ -0,0 +1,89 @@
+# cost_vector.py - v1.0
+# Array variants of the cost_engine formulas for bulk scenario sweeps: every input may be a NumPy array
+# (or scalar) and inputs broadcast against each other, so millions of scenarios cost one vectorized pass.
+# Dependencies: numpy, cost_engine. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .cost_engine import TierBand, TierSchedule, compile_tiers, tier_key
+
+FloatArray = NDArray[np.float64]
+
+
+class TierTable:
+    """
+    Array form of a cost_engine.TierSchedule: cumulative band starts, base costs and rates, evaluated
+    with searchsorted. Same semantics as cost_engine.cost_from_tiers.
+    """
+
+    def __init__(self, tiers: Sequence[TierBand] | TierSchedule):
+        schedule = tiers if isinstance(tiers, TierSchedule) else compile_tiers(tier_key(tiers))
+        self.starts: FloatArray = np.asarray(schedule.starts, dtype=np.float64)
+        self.base_costs: FloatArray = np.asarray(schedule.base_costs, dtype=np.float64)
+        self.rates: FloatArray = np.asarray(schedule.rates, dtype=np.float64)
+
+    def cost(self, gb: ArrayLike) -> FloatArray:
+        """Blended monthly cost for each GB value."""
+        x = np.maximum(np.asarray(gb, dtype=np.float64), 0.0)
+        i = np.searchsorted(self.starts, x, side="right") - 1
+        return self.base_costs[i] + (x - self.starts[i]) * self.rates[i]
+
+
+def _table(tiers: Sequence[TierBand] | TierSchedule | TierTable) -> TierTable:
+    return tiers if isinstance(tiers, TierTable) else TierTable(tiers)
+
+
+def versioned_gb(base_gb: ArrayLike, overhead_pct: ArrayLike) -> FloatArray:
+    """Effective stored GB with versioning overhead (overhead_pct in 0–1)."""
+    return np.asarray(base_gb, dtype=np.float64) * (1.0 + np.asarray(overhead_pct, dtype=np.float64))
+
+
+def copy_multiplier(num_copy_addons: ArrayLike) -> FloatArray:
+    """copy_multiplier = 1 + number_of_enabled_copy_addons (negative counts as 0)."""
+    return 1.0 + np.maximum(np.asarray(num_copy_addons, dtype=np.float64), 0.0)
+
+
+def cost_from_tiers(gb: ArrayLike, tiers: Sequence[TierBand] | TierSchedule | TierTable) -> FloatArray:
+    """Blended monthly cost per element. Tiers must be sorted by from_gb; pass a TierTable to reuse it."""
+    return _table(tiers).cost(gb)
+
+
+def aws_backup_total(
+    base_gb: ArrayLike,
+    rate_per_gb_month: ArrayLike,
+    copy_mult: ArrayLike,
+    flat_addon_usd: ArrayLike = 0.0,
+) -> FloatArray:
+    """AWS Backup total = (base_gb * rate) * copy_mult + flat_addon_usd."""
+    base_cost = np.asarray(base_gb, dtype=np.float64) * np.asarray(rate_per_gb_month, dtype=np.float64)
+    return base_cost * np.asarray(copy_mult, dtype=np.float64) + np.asarray(flat_addon_usd, dtype=np.float64)
+
+
+def s3_versioning_total(
+    base_gb: ArrayLike,
+    overhead_pct: ArrayLike,
+    tiers: Sequence[TierBand] | TierSchedule | TierTable,
+    copy_mult: ArrayLike = 1.0,
+    flat_addon_usd: ArrayLike = 0.0,
+) -> FloatArray:
+    """S3 versioning: versioned_gb from tiers, then * copy_mult + flat."""
+    base_cost = cost_from_tiers(versioned_gb(base_gb, overhead_pct), tiers)
+    return base_cost * np.asarray(copy_mult, dtype=np.float64) + np.asarray(flat_addon_usd, dtype=np.float64)
+
+
+def delta_usd(cost: ArrayLike, reference: ArrayLike) -> FloatArray:
+    """cost - reference."""
+    return np.asarray(cost, dtype=np.float64) - np.asarray(reference, dtype=np.float64)
+
+
+def delta_pct(cost: ArrayLike, reference: ArrayLike) -> FloatArray:
+    """(cost - reference) / reference * 100, or 0 where reference is 0."""
+    c = np.asarray(cost, dtype=np.float64)
+    r = np.asarray(reference, dtype=np.float64)
+    safe = np.where(r == 0, 1.0, r)
+    return np.where(r == 0, 0.0, (c - r) / safe * 100.0)
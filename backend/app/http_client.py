@@ -0,0 +1,60 @@
+# http_client.py - v1.0
+# Shared pooled async HTTP client for public price list fetches: keep-alive reuse to
+# pricing.us-east-1.amazonaws.com, HTTP/2 when h2 is installed, gzip/deflate/br negotiation.
+# httpx is imported when the first client is created, not at app startup.
+# Dependencies: httpx. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+USER_AGENT = "awspricing/1.0 (public price list client)"
+
+CONNECT_TIMEOUT = float(os.environ.get("PRICING_HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+READ_TIMEOUT = float(os.environ.get("PRICING_HTTP_READ_TIMEOUT_SECONDS", "90"))
+MAX_CONNECTIONS = int(os.environ.get("PRICING_HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.environ.get("PRICING_HTTP_MAX_KEEPALIVE", "10"))
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+# httpx advertises "gzip, deflate" and adds "br" when the brotli package is installed; bodies are decoded
+# transparently. The client is bound to the event loop that created it, so keep one per loop.
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        import httpx
+
+        for stale_loop in [lp for lp in _clients if lp.is_closed()]:
+            del _clients[stale_loop]
+        client = httpx.AsyncClient(
+            http2=_http2_available(),
+            headers={"Accept": "application/json", "User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE
+            ),
+            follow_redirects=True,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's client (app shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,41 +1,160 @@
 # main.py - v1.0
 # FastAPI app: pricing, calc, conversation (AI + image upload), session, health.
-# Deps: pricing_resolver, cost_engine, cache, conversation. Port: 8000.
+# Deps: pricing_resolver, pricing_client, cost_engine, cost_vector, cache, shared_cache, backends, circuit, conversation. Port: 8000.
 
 from __future__ import annotations
 
+import asyncio
+import json
+import math
 import os
-import time
-from typing import Any, Literal
+import tempfile
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Annotated, Any, AsyncIterator, Awaitable, Callable, Iterator, Literal
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from .cache import TTLCache
-from .conversation import chat_turn, create_or_update_session, get_session
+from . import public_pricing as pub
+from .backends import make_backend
+from .cache import CacheResult, TTLCache
+from .conversation import (
+    chat_turn,
+    chat_turn_stream,
+    close_client,
+    create_or_update_session,
+    get_session,
+    preload_client,
+    save_session,
+    session_stats,
+)
 from .cost_engine import (
-    TierBand,
+    TB_CONVERSION_BINARY,
+    TB_CONVERSION_DECIMAL,
+    TierSchedule,
+    aws_backup_gb_for_total,
     aws_backup_total,
+    compile_tiers,
     copy_multiplier,
     cost_from_flat_rate,
     cost_from_tiers,
     delta_pct,
     delta_usd,
+    s3_versioning_gb_for_total,
     s3_versioning_total,
     tb_to_gb,
+    tier_key,
     versioned_gb,
 )
+from .http_client import close_http_client
+from .pricing_client import close_pricing_client
 from .pricing_resolver import (
     PricingResult,
+    pricing_api_circuit,
     resolve_aws_backup_storage,
     resolve_s3_storage,
 )
+from .refresher import PriceListRefresher
+from .region_mapping import REGION_TO_LOCATION
+from .shared_cache import SharedTTLCache
+from .warmup import CacheWarmer, WarmJob, env_list
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CACHE_TTL = float(os.environ.get("PRICING_CACHE_TTL_SECONDS", "86400"))  # 24h
+CACHE_MAX_ENTRIES = int(os.environ.get("PRICING_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.environ.get("PRICING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_SWEEP_SECONDS = float(os.environ.get("PRICING_CACHE_SWEEP_SECONDS", "300"))
+# Expired entries are served (stale: true) for this long while a background refresh runs.
+CACHE_STALE_SECONDS = float(os.environ.get("PRICING_CACHE_STALE_SECONDS", "604800"))  # 7d
+# Largest scenario grid /api/calc/grid will evaluate (sizes × overheads × copy counts).
+CALC_GRID_MAX_CELLS = int(os.environ.get("PRICING_CALC_GRID_MAX_CELLS", "1000000"))
+# Batch pricing: request size limit and how many items resolve at once.
+BATCH_MAX_ITEMS = int(os.environ.get("PRICING_BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.environ.get("PRICING_BATCH_CONCURRENCY", "16"))
+# Startup warm-up: resolve these regions / S3 storage classes into the cache in the background.
+WARMUP_ENABLED = os.environ.get("PRICING_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_REGIONS = env_list(os.environ.get("PRICING_WARMUP_REGIONS"), list(REGION_TO_LOCATION))
+WARMUP_STORAGE_CLASSES = env_list(
+    os.environ.get("PRICING_WARMUP_STORAGE_CLASSES"),
+    [
+        "Standard",
+        "Standard-IA",
+        "Intelligent-Tiering",
+        "Glacier Instant Retrieval",
+        "Glacier Flexible Retrieval",
+        "Glacier Deep Archive",
+    ],
+)
+WARMUP_CURRENCY = os.environ.get("PRICING_WARMUP_CURRENCY", "USD")
+WARMUP_CONCURRENCY = int(os.environ.get("PRICING_WARMUP_CONCURRENCY", "8"))
+# /ready returns 503 until the warm-up has finished (for load balancer / Kubernetes readiness).
+WARMUP_GATE_READINESS = os.environ.get("PRICING_WARMUP_GATE_READINESS", "false").lower() in ("1", "true", "yes")
+# Background price list refresh (catalog + changed offer files); 0 disables.
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("PRICING_REFRESH_INTERVAL_SECONDS", "3600"))
+# "memory": per-process cache. "sqlite": one cache file shared by all workers on the node.
+# "redis": one cache shared by every replica (shared_cache.py / backends.py).
+CACHE_BACKEND = os.environ.get("PRICING_CACHE_BACKEND", "memory").lower()
+CACHE_PATH = os.environ.get("PRICING_CACHE_PATH") or os.path.join(tempfile.gettempdir(), "awspricing-cache.sqlite3")
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# Shared cache: how long other workers wait for the worker computing a missing key.
+CACHE_LEASE_SECONDS = float(os.environ.get("PRICING_CACHE_LEASE_SECONDS", "120"))
+if CACHE_BACKEND != "memory":
+    pricing_cache: TTLCache = SharedTTLCache(
+        make_backend(
+            CACHE_BACKEND,
+            path=CACHE_PATH,
+            table="pricing",
+            redis_url=REDIS_URL,
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=CACHE_MAX_BYTES,
+        ),
+        ttl_seconds=CACHE_TTL,
+        stale_ttl_seconds=CACHE_STALE_SECONDS,
+        lease_seconds=CACHE_LEASE_SECONDS,
+        count_interval_seconds=CACHE_SWEEP_SECONDS,
+    )
+else:
+    pricing_cache = TTLCache(
+        ttl_seconds=CACHE_TTL,
+        max_entries=CACHE_MAX_ENTRIES,
+        max_bytes=CACHE_MAX_BYTES,
+        stale_ttl_seconds=CACHE_STALE_SECONDS,
+    )
+# Failed resolutions (no listing for the region, upstream down) are remembered per key this long, so
+# repeated requests return the error at once instead of re-running the fallback chain; 0 disables.
+NEGATIVE_CACHE_TTL = float(os.environ.get("PRICING_NEGATIVE_CACHE_TTL_SECONDS", "60"))
+failure_cache = TTLCache(ttl_seconds=NEGATIVE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Start background maintenance (cache sweep, warm-up, price list refresh) with the app; stop it on shutdown."""
+    pricing_cache.start_sweeper(CACHE_SWEEP_SECONDS)
+    # Import anthropic and open the shared client off the request path (no-op without an API key).
+    preload = asyncio.create_task(asyncio.to_thread(preload_client))
+    if WARMUP_ENABLED:
+        warmer.start()
+    if REFRESH_INTERVAL_SECONDS > 0:
+        refresher.start()
+    yield
+    await refresher.stop()
+    await warmer.stop()
+    pricing_cache.close()
+    await preload
+    close_client()
+    close_pricing_client()
+    await close_http_client()
+
 
 app = FastAPI(
     title="awspricing",
     description="Live AWS Backup vs S3 versioning cost calculator",
     version="1.0.0",
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -45,9 +164,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-CACHE_TTL = float(os.environ.get("PRICING_CACHE_TTL_SECONDS", "86400"))  # 24h
-pricing_cache = TTLCache(ttl_seconds=CACHE_TTL)
-
 
 # --- Request/Response models ---
 
@@ -72,6 +188,32 @@ class CalcInput(BaseModel):
     # Add-ons
     num_copy_addons: int = Field(0, ge=0)
     flat_addon_usd: float = Field(0, ge=0)
+    budget_usd: float | None = Field(None, ge=0)  # optional inverse query: GB covered by this budget
+
+
+class TbRange(BaseModel):
+    start: float = Field(10, ge=0)
+    stop: float = Field(90, ge=0)  # inclusive
+    step: float = Field(10, gt=0)
+
+
+class CalcGridInput(BaseModel):
+    """Grid of scenarios: every combination of data size, overhead and copy count. Each axis value is
+    bounded like the matching CalcInput field; the cell count is checked per request."""
+    # explicit sizes; else data_tb_range
+    data_tb: list[Annotated[float, Field(ge=0)]] | None = Field(None, max_length=CALC_GRID_MAX_CELLS)
+    data_tb_range: TbRange | None = None  # default: 10–90 TB preset
+    tb_binary: bool = True
+    aws_backup_rate_per_gb_month: float | None = None
+    s3_tiers: list[dict[str, float]] | None = None
+    s3_flat_rate_per_gb_month: float | None = None
+    versioning_overhead_pct: list[Annotated[float, Field(ge=0, le=2)]] = Field(
+        default_factory=lambda: [0.25], min_length=1, max_length=CALC_GRID_MAX_CELLS
+    )
+    num_copy_addons: list[Annotated[int, Field(ge=0)]] = Field(
+        default_factory=lambda: [0], min_length=1, max_length=CALC_GRID_MAX_CELLS
+    )
+    flat_addon_usd: float = Field(0, ge=0)
 
 
 ConversationModeType = Literal["expert", "balanced", "guided"]
@@ -85,6 +227,22 @@ class ConversationRequest(BaseModel):
     image_media_type: str | None = None  # e.g. image/png, image/jpeg
 
 
+class BatchPricingItem(BaseModel):
+    service: Literal["aws-backup", "s3-storage"]
+    region: str = "us-east-1"
+    storageClass: str = "Standard"  # ignored for aws-backup
+    currency: str = "USD"
+
+    def key(self) -> tuple[str, str, str, str]:
+        storage_class = self.storageClass if self.service == "s3-storage" else ""
+        return (self.service, self.region, storage_class, self.currency)
+
+
+class BatchPricingRequest(BaseModel):
+    items: list[BatchPricingItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    refresh: bool = False  # bypass cache for every item
+
+
 class SessionRequest(BaseModel):
     session_id: str | None = None
     mode: ConversationModeType = "balanced"
@@ -110,9 +268,49 @@ def post_conversation(body: ConversationRequest) -> dict[str, Any]:
         image_base64=body.image,
         image_media_type=body.image_media_type or (body.image and "image/png"),
     )
+    save_session(session)
     return result
 
 
+def _sse(event: dict[str, Any]) -> str:
+    """One server-sent event: the event type as `event:`, the remaining fields as JSON `data:`."""
+    payload = {k: v for k, v in event.items() if k != "type"}
+    return f"event: {event['type']}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.post("/api/conversation/stream")
+def post_conversation_stream(body: ConversationRequest) -> StreamingResponse:
+    """
+    Streaming /api/conversation as server-sent events: `start` (session_id), `delta` (text) per generated
+    chunk, then `done` with the same fields as /api/conversation. The turn is saved to the session at `done`.
+    """
+    if not (body.message.strip() or body.image):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide at least a message or an image",
+        )
+    session = create_or_update_session(session_id=body.session_id, mode=body.mode)
+
+    def events() -> Iterator[str]:
+        yield _sse({"type": "start", "session_id": session.session_id})
+        for event in chat_turn_stream(
+            session,
+            body.message.strip(),
+            image_base64=body.image,
+            image_media_type=body.image_media_type or (body.image and "image/png"),
+        ):
+            if event["type"] == "done":
+                save_session(session)
+            yield _sse(event)
+
+    # Sync generator: Starlette iterates it on the threadpool, like the sync endpoints.
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # no proxy (nginx) buffering
+    )
+
+
 @app.post("/api/session")
 def post_session(body: SessionRequest) -> dict[str, Any]:
     """Create or reset a conversation session. Returns session_id and mode."""
@@ -135,21 +333,10 @@ def get_session_info(session_id: str) -> dict[str, Any]:
 
 # --- Pricing endpoints (with optional cache bypass) ---
 
-@app.get("/api/pricing/aws-backup")
-def get_aws_backup_pricing(
-    region: str = Query("us-east-1"),
-    currency: str = Query("USD"),
-    refresh: bool = Query(False, description="Bypass cache"),
-) -> dict[str, Any]:
-    """Return AWS Backup storage pricing for S3 backups. Rate normalized to USD/GB-month."""
-    if refresh:
-        pricing_cache.invalidate(service="AWS Backup", region=region, currency=currency)
-    hit = pricing_cache.get(service="AWS Backup", region=region, currency=currency)
-    if hit is not None:
-        data, cached_at = hit
-        return {**data, "cached_at": cached_at, "from_cache": True}
+async def _aws_backup_payload(region: str, currency: str) -> dict[str, Any]:
+    """Resolve AWS Backup pricing into the response payload. Payloads with "error" are not cached."""
     try:
-        result = resolve_aws_backup_storage(region_code=region, currency=currency)
+        result = await resolve_aws_backup_storage(region_code=region, currency=currency)
     except Exception as e:
         return {
             "error": f"Pricing resolution failed: {e}",
@@ -170,7 +357,7 @@ def get_aws_backup_pricing(
             "term_code": result.term_code,
             "raw_filter": result.raw_filter_used,
         }
-    data = {
+    return {
         "rate_per_gb_month": result.rate_per_gb_month,
         "currency": result.currency,
         "unit": result.unit,
@@ -180,31 +367,13 @@ def get_aws_backup_pricing(
         "price_dimension": result.price_dimension,
         "raw_filter": result.raw_filter_used,
     }
-    pricing_cache.set(data, service="AWS Backup", region=region, currency=currency)
-    return {**data, "cached_at": time.monotonic(), "from_cache": False}
 
 
-@app.get("/api/pricing/s3-storage")
-def get_s3_storage_pricing(
-    region: str = Query("us-east-1"),
-    currency: str = Query("USD"),
-    storageClass: str = Query("Standard"),
-    refresh: bool = Query(False),
-) -> dict[str, Any]:
-    """Return S3 storage pricing. Flat rate or tier bands, normalized to USD/GB-month."""
-    if refresh:
-        pricing_cache.invalidate(
-            service="Amazon S3", region=region, currency=currency, storage_class=storageClass
-        )
-    hit = pricing_cache.get(
-        service="Amazon S3", region=region, currency=currency, storage_class=storageClass
-    )
-    if hit is not None:
-        data, cached_at = hit
-        return {**data, "cached_at": cached_at, "from_cache": True}
+async def _s3_storage_payload(region: str, currency: str, storage_class: str) -> dict[str, Any]:
+    """Resolve S3 storage pricing into the response payload. Payloads with "error" are not cached."""
     try:
-        result = resolve_s3_storage(
-            region_code=region, storage_class=storageClass, currency=currency
+        result = await resolve_s3_storage(
+            region_code=region, storage_class=storage_class, currency=currency
         )
     except Exception as e:
         return {
@@ -231,7 +400,9 @@ def get_s3_storage_pricing(
         if to_gb == float("inf") or to_gb > 1e35:
             to_gb = 1e40
         tiers_json.append({**t, "to_gb": to_gb})
-    data = {
+    if tiers_json:
+        compile_tiers(tier_key(tiers_json))  # compiled with the cache entry; /api/calc reuses it
+    return {
         "rate_per_gb_month": result.rate_per_gb_month,
         "tiers": tiers_json,
         "currency": result.currency,
@@ -242,14 +413,166 @@ def get_s3_storage_pricing(
         "price_dimension": result.price_dimension,
         "raw_filter": result.raw_filter_used,
     }
-    pricing_cache.set(
-        data,
-        service="Amazon S3",
-        region=region,
-        currency=currency,
-        storage_class=storageClass,
+
+
+def _is_cacheable(payload: dict[str, Any]) -> bool:
+    return not payload.get("error")
+
+
+async def _remember_failure(compute: Callable[[], Awaitable[dict[str, Any]]], **key: Any) -> dict[str, Any]:
+    """compute() unless the same key failed within NEGATIVE_CACHE_TTL; a failed payload is kept that long."""
+    hit = failure_cache.get(**key)
+    if hit is not None:
+        return hit[0]
+    payload = await compute()
+    if NEGATIVE_CACHE_TTL > 0 and not _is_cacheable(payload):
+        failure_cache.set(payload, **key)
+    return payload
+
+
+def _with_cache_info(hit: CacheResult) -> dict[str, Any]:
+    """Add cached_at / from_cache / stale to a successful payload; error payloads pass through."""
+    if not _is_cacheable(hit.value):
+        return hit.value
+    return {**hit.value, "cached_at": hit.cached_at, "from_cache": hit.from_cache, "stale": hit.stale}
+
+
+async def _cached_aws_backup(region: str, currency: str, refresh: bool = False) -> dict[str, Any]:
+    """AWS Backup payload through the pricing cache (shared by the single and batch endpoints)."""
+    key = {"service": "AWS Backup", "region": region, "currency": currency}
+    if refresh:
+        await pricing_cache.ainvalidate(**key)
+        failure_cache.invalidate(**key)
+    hit = await pricing_cache.aget_or_compute(
+        lambda: _remember_failure(lambda: _aws_backup_payload(region, currency), **key),
+        cache_if=_is_cacheable,
+        allow_stale=True,
+        **key,
     )
-    return {**data, "cached_at": time.monotonic(), "from_cache": False}
+    return _with_cache_info(hit)
+
+
+async def _cached_s3_storage(
+    region: str, currency: str, storage_class: str, refresh: bool = False
+) -> dict[str, Any]:
+    """S3 storage payload through the pricing cache (shared by the single and batch endpoints)."""
+    key = {"service": "Amazon S3", "region": region, "currency": currency, "storage_class": storage_class}
+    if refresh:
+        await pricing_cache.ainvalidate(**key)
+        failure_cache.invalidate(**key)
+    hit = await pricing_cache.aget_or_compute(
+        lambda: _remember_failure(lambda: _s3_storage_payload(region, currency, storage_class), **key),
+        cache_if=_is_cacheable,
+        allow_stale=True,
+        **key,
+    )
+    return _with_cache_info(hit)
+
+
+def _warmup_jobs() -> list[WarmJob]:
+    """Backup then every storage class per region, so one region's offer file is parsed once."""
+    jobs: list[WarmJob] = []
+    for region in WARMUP_REGIONS:
+        jobs.append((f"AWS Backup {region}", lambda r=region: _cached_aws_backup(r, WARMUP_CURRENCY)))
+        for storage_class in WARMUP_STORAGE_CLASSES:
+            jobs.append((
+                f"Amazon S3 {region} {storage_class}",
+                lambda r=region, sc=storage_class: _cached_s3_storage(r, WARMUP_CURRENCY, sc),
+            ))
+    return jobs
+
+
+warmer = CacheWarmer(_warmup_jobs(), concurrency=WARMUP_CONCURRENCY)
+
+
+async def _recompute_cached_pricing(service_code: str) -> None:
+    """After a service's offer data was re-ingested, recompute its cached payloads in place.
+    Requests keep getting the previous entry until each new one is stored."""
+    service = "Amazon S3" if service_code == pub.SERVICE_CODE_S3 else "AWS Backup"
+    for fields in failure_cache.find(service=service):
+        failure_cache.invalidate(**fields)  # new data may resolve what failed before
+    if service_code == pub.SERVICE_CODE_S3:
+        for fields in await pricing_cache.afind(service="Amazon S3"):
+            await pricing_cache.arefresh(
+                lambda f=fields: _s3_storage_payload(f["region"], f["currency"], f["storage_class"]),
+                cache_if=_is_cacheable,
+                **fields,
+            )
+    else:
+        for fields in await pricing_cache.afind(service="AWS Backup"):
+            await pricing_cache.arefresh(
+                lambda f=fields: _aws_backup_payload(f["region"], f["currency"]),
+                cache_if=_is_cacheable,
+                **fields,
+            )
+
+
+refresher = PriceListRefresher(
+    pub.catalog,
+    watched=pub.compiled_service_codes,
+    reingest=pub.reingest,
+    on_change=_recompute_cached_pricing,
+    interval_seconds=REFRESH_INTERVAL_SECONDS,
+)
+
+
+@app.get("/api/pricing/aws-backup")
+async def get_aws_backup_pricing(
+    region: str = Query("us-east-1"),
+    currency: str = Query("USD"),
+    refresh: bool = Query(False, description="Bypass cache"),
+) -> dict[str, Any]:
+    """Return AWS Backup storage pricing for S3 backups. Rate normalized to USD/GB-month.
+    Concurrent cache misses for the same key share one resolution. An expired entry is returned
+    with stale=true while it refreshes in the background; refresh=true forces a blocking fetch."""
+    return await _cached_aws_backup(region, currency, refresh)
+
+
+@app.get("/api/pricing/s3-storage")
+async def get_s3_storage_pricing(
+    region: str = Query("us-east-1"),
+    currency: str = Query("USD"),
+    storageClass: str = Query("Standard"),
+    refresh: bool = Query(False),
+) -> dict[str, Any]:
+    """Return S3 storage pricing. Flat rate or tier bands, normalized to USD/GB-month.
+    Concurrent cache misses for the same key share one resolution. An expired entry is returned
+    with stale=true while it refreshes in the background; refresh=true forces a blocking fetch."""
+    return await _cached_s3_storage(region, currency, storageClass, refresh)
+
+
+@app.post("/api/pricing/batch")
+async def post_pricing_batch(body: BatchPricingRequest) -> dict[str, Any]:
+    """
+    Resolve many (service, region, storageClass, currency) items in one call. Items resolve
+    concurrently through the pricing cache; items backed by the same offer file share one download
+    and one compiled index. Results are returned in request order; failed items carry "error".
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    pending: dict[tuple[str, str, str, str], asyncio.Task[dict[str, Any]]] = {}
+
+    async def resolve(item: BatchPricingItem) -> dict[str, Any]:
+        async with semaphore:
+            if item.service == "aws-backup":
+                return await _cached_aws_backup(item.region, item.currency, body.refresh)
+            return await _cached_s3_storage(item.region, item.currency, item.storageClass, body.refresh)
+
+    for item in body.items:
+        key = item.key()
+        if key not in pending:
+            pending[key] = asyncio.create_task(resolve(item))
+    # One item raising (e.g. a bug or an unexpected upstream reply) must not fail the whole batch.
+    outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+    payloads = {
+        key: {"error": f"Pricing lookup failed: {out}"} if isinstance(out, BaseException) else out
+        for key, out in zip(pending, outcomes)
+    }
+    results = [{**item.model_dump(), **payloads[item.key()]} for item in body.items]
+    return {
+        "results": results,
+        "count": len(results),
+        "errors": sum(1 for r in results if r.get("error")),
+    }
 
 
 # --- Calc (server-side optional; frontend can compute with fetched rates) ---
@@ -274,33 +597,22 @@ def post_calc(body: CalcInput) -> dict[str, Any]:
 
     # S3 versioning
     v_gb = versioned_gb(gb, body.versioning_overhead_pct)
-    if body.s3_tiers:
-        tiers = [
-            TierBand(b["from_gb"], b["to_gb"], b["rate_per_gb_month"])
-            for b in body.s3_tiers
-        ]
-        tiers.sort(key=lambda t: t.from_gb)
-        s3_base_cost = cost_from_tiers(v_gb, tiers)
-    elif body.s3_flat_rate_per_gb_month is not None:
-        tiers = [TierBand(0, float("inf"), body.s3_flat_rate_per_gb_month)]
-        s3_base_cost = cost_from_flat_rate(v_gb, body.s3_flat_rate_per_gb_month)
-    else:
-        tiers = []
-        s3_base_cost = None
-
-    if tiers:
+    schedule = _s3_schedule(body)
+    if schedule is not None:
+        s3_base_cost = cost_from_tiers(v_gb, schedule)
         s3_total = s3_versioning_total(
             gb,
             body.versioning_overhead_pct,
-            tiers,
+            schedule,
             copy_mult,
             body.flat_addon_usd,
         )
     else:
+        s3_base_cost = None
         s3_total = None
 
     reference = awb_total if awb_total is not None else 0
-    return {
+    result = {
         "data_tb": body.data_tb,
         "data_gb": gb,
         "versioned_gb": v_gb,
@@ -323,6 +635,114 @@ def post_calc(body: CalcInput) -> dict[str, Any]:
             "s3_delta_pct": delta_pct(s3_total or 0, reference) if s3_total is not None else None,
         },
     }
+    if body.budget_usd is not None:
+        # Inverse query: data GB (before versioning overhead) each option covers within the budget.
+        result["budget"] = {
+            "budget_usd": body.budget_usd,
+            "aws_backup_gb": _json_gb(
+                aws_backup_gb_for_total(body.budget_usd, awb_rate, copy_mult, body.flat_addon_usd)
+            ) if awb_rate is not None else None,
+            "s3_versioning_gb": _json_gb(
+                s3_versioning_gb_for_total(
+                    body.budget_usd, body.versioning_overhead_pct, schedule, copy_mult, body.flat_addon_usd
+                )
+            ) if schedule is not None else None,
+        }
+    return result
+
+
+def _json_gb(gb: float) -> float:
+    """JSON has no Infinity: unbounded GB (free tier) uses the same sentinel as open-ended tiers."""
+    return 1e40 if gb == float("inf") else gb
+
+
+def _s3_schedule(body: CalcInput | CalcGridInput) -> TierSchedule | None:
+    """Compiled S3 tier schedule for the request: explicit tiers, a flat rate as one open band, or
+    None. Compiled once per distinct tier list (the same bands the pricing endpoint returned)."""
+    if body.s3_tiers:
+        return compile_tiers(tier_key(body.s3_tiers))
+    if body.s3_flat_rate_per_gb_month is not None:
+        return compile_tiers(((0.0, float("inf"), body.s3_flat_rate_per_gb_month),))
+    return None
+
+
+def _grid_sizes_tb(body: CalcGridInput) -> np.ndarray:
+    import numpy as np
+
+    if body.data_tb is not None:
+        return np.asarray(body.data_tb, dtype=np.float64)
+    r = body.data_tb_range or TbRange()
+    # Bound the float ratio before int(): a tiny step (or huge stop) makes it inf, which int() rejects.
+    steps = (r.stop - r.start) / r.step if r.stop >= r.start else -1.0
+    if not math.isfinite(steps) or steps + 1 > CALC_GRID_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"Grid exceeds {CALC_GRID_MAX_CELLS} cells")
+    count = int(np.floor(steps + 1e-9)) + 1 if steps >= 0 else 0
+    return r.start + r.step * np.arange(count, dtype=np.float64)
+
+
+def _column(values: np.ndarray | None) -> list[float] | None:
+    return None if values is None else values.ravel().tolist()
+
+
+@app.post("/api/calc/grid")
+def post_calc_grid(body: CalcGridInput) -> dict[str, Any]:
+    """
+    Evaluate every (data_tb, versioning_overhead_pct, num_copy_addons) combination in one vectorized
+    pass. Columnar response: "columns" maps each field to a flat list of length "rows", ordered with
+    data_tb outermost and num_copy_addons innermost ("shape" gives the axis lengths). Cost columns are
+    null when the matching rate was not provided.
+    """
+    # numpy and the vector kernels load on the first grid request, not at app startup.
+    import numpy as np
+
+    from . import cost_vector as cv
+
+    sizes_tb = _grid_sizes_tb(body)
+    overheads = np.asarray(body.versioning_overhead_pct, dtype=np.float64)
+    copies = np.asarray(body.num_copy_addons, dtype=np.float64)
+    shape = (len(sizes_tb), len(overheads), len(copies))
+    rows = shape[0] * shape[1] * shape[2]
+    if rows > CALC_GRID_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"Grid exceeds {CALC_GRID_MAX_CELLS} cells")
+
+    tb, overhead, n_copies = np.meshgrid(sizes_tb, overheads, copies, indexing="ij")
+    gb = tb * (TB_CONVERSION_BINARY if body.tb_binary else TB_CONVERSION_DECIMAL)
+    v_gb = cv.versioned_gb(gb, overhead)
+    copy_mult = cv.copy_multiplier(n_copies)
+
+    awb_rate = body.aws_backup_rate_per_gb_month
+    awb_total = (
+        cv.aws_backup_total(gb, awb_rate, copy_mult, body.flat_addon_usd) if awb_rate is not None else None
+    )
+    schedule = _s3_schedule(body)
+    s3_total = (
+        cv.s3_versioning_total(gb, overhead, cv.TierTable(schedule), copy_mult, body.flat_addon_usd)
+        if schedule is not None
+        else None
+    )
+    has_delta = s3_total is not None
+    reference = awb_total if awb_total is not None else np.zeros(shape)
+    return {
+        "rows": rows,
+        "shape": list(shape),
+        "axes": {
+            "data_tb": sizes_tb.tolist(),
+            "versioning_overhead_pct": overheads.tolist(),
+            "num_copy_addons": body.num_copy_addons,
+        },
+        "columns": {
+            "data_tb": _column(tb),
+            "data_gb": _column(gb),
+            "versioning_overhead_pct": _column(overhead),
+            "num_copy_addons": _column(n_copies.astype(np.int64)),
+            "copy_multiplier": _column(copy_mult),
+            "versioned_gb": _column(v_gb),
+            "aws_backup_total_usd": _column(awb_total),
+            "s3_total_usd": _column(s3_total),
+            "s3_delta_usd": _column(cv.delta_usd(s3_total, reference) if has_delta else None),
+            "s3_delta_pct": _column(cv.delta_pct(s3_total, reference) if has_delta else None),
+        },
+    }
 
 
 @app.get("/api/regions")
@@ -333,9 +753,28 @@ def list_regions() -> list[dict[str, str]]:
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    """Health check for container orchestration."""
-    return {"status": "ok", "service": "awspricing-api"}
+def health() -> dict[str, Any]:
+    """Health check for container orchestration. Includes pricing cache / session counters, warm-up progress
+    and the state of the upstream circuit breakers."""
+    return {
+        "status": "ok",
+        "service": "awspricing-api",
+        "pricing_cache": pricing_cache.stats(),
+        "warmup": {"enabled": WARMUP_ENABLED, **warmer.progress()},
+        "refresher": refresher.status(),
+        "sessions": session_stats(),
+        "negative_cache": failure_cache.stats(),
+        "circuits": [pub.offer_store.circuit.status(), pricing_api_circuit.status()],
+    }
+
+
+@app.get("/ready")
+def ready(response: Response) -> dict[str, Any]:
+    """Readiness probe. With PRICING_WARMUP_GATE_READINESS=true, 503 until the cache warm-up finishes."""
+    warming = WARMUP_ENABLED and WARMUP_GATE_READINESS and not warmer.finished
+    if warming:
+        response.status_code = 503
+    return {"status": "warming" if warming else "ready", "warmup": warmer.progress()}
 
 
 if __name__ == "__main__":
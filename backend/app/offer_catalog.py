@@ -0,0 +1,144 @@
+# offer_catalog.py - v1.0
+# Main price list index (offers/v1.0/aws/index.json), downloaded and parsed once per TTL and shared by
+# every resolver: service codes, currentVersionUrl and currentRegionIndexUrl, plus each service's region
+# index (region code -> exact per-region offer file URL), loaded on first use and kept for the same TTL.
+# Dependencies: cache (singleflight). Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from .cache import singleflight
+
+# fetch(url, revalidate=False): revalidate=True asks the store to check the origin even if its copy is fresh.
+FetchJson = Callable[..., Awaitable[tuple[dict[str, Any] | None, str]]]
+
+
+class OfferCatalog:
+    """
+    TTL-memoized view of the main offer index. Call (await) refresh() before reading; it reloads
+    only when the TTL has passed, and concurrent refreshes share one fetch. Getters never fetch.
+    """
+
+    def __init__(self, index_url: str, base_url: str, fetch: FetchJson, ttl_seconds: float = 3600):
+        self.index_url = index_url
+        self._base_url = base_url.rstrip("/")
+        self._fetch = fetch
+        self._ttl = ttl_seconds
+        self._offers: dict[str, dict[str, Any]] | None = None
+        self._publication_date: str | None = None
+        self._loaded_at = 0.0
+        self._error = ""
+        self._flights: dict[str, asyncio.Future[Any]] = {}
+        # service code -> (region index URL, loaded_at, region code -> absolute offer URL)
+        self._regions: dict[str, tuple[str, float, dict[str, str]]] = {}
+
+    def _expired(self) -> bool:
+        return self._offers is None or time.monotonic() - self._loaded_at > self._ttl
+
+    async def refresh(self, force: bool = False) -> str:
+        """Load the index if expired (or force: reload and revalidate with the origin). Returns error
+        message ('' on success or still fresh). A failed reload keeps the previous offers."""
+        if not force and not self._expired():
+            return ""
+        return await singleflight(self._flights, "index", lambda: self._load(force))
+
+    async def _load(self, revalidate: bool = False) -> str:
+        data, error = await self._fetch(self.index_url, revalidate=revalidate)
+        if not data:
+            self._error = error or "Empty offer index"
+            return self._error
+        offers = data.get("offers") or {}
+        self._offers = {k: v for k, v in offers.items() if k and isinstance(v, dict)}
+        self._publication_date = data.get("publicationDate")
+        self._loaded_at = time.monotonic()
+        self._error = ""
+        return ""
+
+    def _get(self) -> dict[str, dict[str, Any]]:
+        return self._offers or {}
+
+    @property
+    def publication_date(self) -> str | None:
+        return self._publication_date
+
+    @property
+    def error(self) -> str:
+        """Last load error ('' if the last load succeeded)."""
+        return self._error
+
+    def service_codes(self) -> list[str]:
+        return list(self._get())
+
+    def offer(self, service_code: str) -> dict[str, Any] | None:
+        return self._get().get(service_code)
+
+    def find_service(self, substring: str) -> str | None:
+        """First service code containing substring (case-insensitive), e.g. 'backup'."""
+        needle = substring.lower()
+        for code in self._get():
+            if needle in code.lower():
+                return code
+        return None
+
+    def absolute_url(self, rel: str) -> str:
+        if rel.startswith("http"):
+            return rel
+        if rel.startswith("/"):
+            return f"{self._base_url}{rel}"
+        return f"{self.index_url.rsplit('/', 1)[0]}/{rel}"
+
+    def _url(self, service_code: str, key: str) -> str | None:
+        offer = self.offer(service_code)
+        rel = offer.get(key) if offer else None
+        if not rel or not isinstance(rel, str):
+            return None
+        return self.absolute_url(rel)
+
+    def current_version_url(self, service_code: str) -> str | None:
+        return self._url(service_code, "currentVersionUrl")
+
+    def current_region_index_url(self, service_code: str) -> str | None:
+        return self._url(service_code, "currentRegionIndexUrl")
+
+    async def region_urls(self, service_code: str, force: bool = False) -> dict[str, str] | None:
+        """
+        Region code -> absolute currentVersionUrl of that region's offer file, from the service's
+        region_index.json. Loaded once per TTL (or when the catalog points at a new region index; force:
+        reload and revalidate). None if the service has no region index or it could not be loaded;
+        a failed reload keeps the previous mapping. Call (await) refresh() first.
+        """
+        url = self.current_region_index_url(service_code)
+        if not url:
+            return None
+        cached = self._regions.get(service_code)
+        if (
+            not force
+            and cached is not None
+            and cached[0] == url
+            and time.monotonic() - cached[1] <= self._ttl
+        ):
+            return cached[2]
+        return await singleflight(
+            self._flights, f"regions:{service_code}", lambda: self._load_regions(service_code, url, force)
+        )
+
+    async def _load_regions(self, service_code: str, url: str, revalidate: bool) -> dict[str, str] | None:
+        data, _ = await self._fetch(url, revalidate=revalidate)
+        cached = self._regions.get(service_code)
+        if not data:
+            return cached[2] if cached else None
+        regions: dict[str, str] = {}
+        for code, entry in (data.get("regions") or {}).items():
+            rel = entry.get("currentVersionUrl") if isinstance(entry, dict) else None
+            if code and rel and isinstance(rel, str):
+                regions[code] = self.absolute_url(rel)
+        self._regions[service_code] = (url, time.monotonic(), regions)
+        return regions
+
+    def cached_region_urls(self, service_code: str) -> dict[str, str]:
+        """Last loaded region index of the service ({} if never loaded). Never fetches."""
+        cached = self._regions.get(service_code)
+        return dict(cached[2]) if cached else {}
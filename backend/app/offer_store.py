@@ -0,0 +1,165 @@
+# offer_store.py - v1.0
+# On-disk store for price list files: keeps downloaded bodies and revalidates them with conditional
+# GETs (If-None-Match / If-Modified-Since), so an unchanged file is never downloaded twice. Downloads go
+# through a circuit breaker: while the origin keeps failing, stored copies are served without a request.
+# Dependencies: httpx (via http_client, imported on first download), cache, circuit. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from .cache import singleflight
+from .circuit import CircuitBreaker
+from .http_client import CONNECT_TIMEOUT, get_http_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(tempfile.gettempdir(), "awspricing-offers")
+# Within this window a stored file is served without contacting the origin at all.
+DEFAULT_MAX_AGE_SECONDS = 900.0
+
+
+class OfferFileStore:
+    """Directory of price list bodies keyed by URL, each with a small JSON metadata sidecar."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        circuit: CircuitBreaker | None = None,
+    ):
+        self._root = Path(root)
+        self._max_age = max_age_seconds
+        self.circuit = circuit or CircuitBreaker("price-list")
+        self._flights: dict[str, asyncio.Future[tuple[Path | None, str]]] = {}
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def key(self, url: str) -> str:
+        """Stable file-name stem for url (shared with derived files such as index snapshots)."""
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        name = self.key(url)
+        return self._root / f"{name}.json", self._root / f"{name}.meta.json"
+
+    def _read_meta(self, meta_path: Path) -> dict[str, str | float]:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta_path: Path, meta: dict[str, str | float]) -> None:
+        tmp = meta_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def metadata(self, url: str) -> dict[str, str | float]:
+        """Stored validators for url (etag, last_modified, validated_at), or {} if not stored."""
+        body_path, meta_path = self._paths(url)
+        return self._read_meta(meta_path) if body_path.exists() else {}
+
+    async def fetch(
+        self, url: str, timeout: float | None = None, revalidate: bool = False
+    ) -> tuple[Path | None, str]:
+        """
+        Return (path to local copy of url, error_message). Downloads on first use, revalidates with a
+        conditional GET once the copy is older than max_age (or always, with revalidate=True), and falls
+        back to the stored copy if the origin is unreachable. Concurrent fetches of one URL share a
+        single request. While the circuit is open (origin failing) no request is sent: the stored copy
+        is served, or the error returned at once.
+        """
+        return await singleflight(self._flights, url, lambda: self._fetch(url, timeout, revalidate))
+
+    async def _fetch(self, url: str, timeout: float | None, revalidate: bool) -> tuple[Path | None, str]:
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path) if body_path.exists() else {}
+        if meta and not revalidate and time.time() - float(meta.get("validated_at", 0)) < self._max_age:
+            return body_path, ""
+        if not self.circuit.allow():
+            if meta:
+                return body_path, ""
+            return None, f"Price list host unavailable (circuit open, retry in {self.circuit.retry_in():.0f}s)"
+
+        import httpx
+
+        headers: dict[str, str] = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = str(meta["etag"])
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = str(meta["last_modified"])
+        request_timeout: httpx.Timeout | Any = httpx.USE_CLIENT_DEFAULT
+        if timeout:
+            request_timeout = httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT))
+        try:
+            async with get_http_client().stream(
+                "GET", url, headers=headers, timeout=request_timeout
+            ) as resp:
+                # 5xx / 429 count against the origin; any other answer (including 404) shows it is up.
+                if resp.status_code >= 500 or resp.status_code == 429:
+                    self.circuit.record_failure()
+                else:
+                    self.circuit.record_success()
+                if resp.status_code == 304 and meta:
+                    self._write_meta(meta_path, {**meta, "validated_at": time.time()})
+                    return body_path, ""
+                if resp.status_code != 200:
+                    msg = f"HTTP {resp.status_code}: {resp.reason_phrase}"
+                else:
+                    self._root.mkdir(parents=True, exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(dir=self._root, suffix=".part")
+                    try:
+                        with os.fdopen(fd, "wb") as out:
+                            async for chunk in resp.aiter_bytes(1 << 20):
+                                out.write(chunk)
+                        os.replace(tmp, body_path)
+                    except BaseException:
+                        os.unlink(tmp)
+                        raise
+                    new_meta: dict[str, str | float] = {"url": url, "validated_at": time.time()}
+                    if resp.headers.get("ETag"):
+                        new_meta["etag"] = resp.headers["ETag"]
+                    if resp.headers.get("Last-Modified"):
+                        new_meta["last_modified"] = resp.headers["Last-Modified"]
+                    self._write_meta(meta_path, new_meta)
+                    return body_path, ""
+        except httpx.HTTPError as e:
+            self.circuit.record_failure()
+            msg = str(e) or e.__class__.__name__
+        except OSError as e:
+            msg = str(e)
+        logger.warning("Failed to fetch %s: %s", url, msg)
+        if meta:
+            logger.warning("Serving stored copy of %s", url)
+            return body_path, ""
+        return None, msg
+
+    def discard(self, url: str) -> None:
+        """Drop the stored copy of url (e.g. after it failed to parse)."""
+        body_path, meta_path = self._paths(url)
+        for p in (meta_path, body_path):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+
+
+offer_store = OfferFileStore(
+    os.environ.get("PRICING_OFFER_STORE_DIR") or DEFAULT_STORE_DIR,
+    max_age_seconds=float(
+        os.environ.get("PRICING_OFFER_STORE_MAX_AGE_SECONDS", str(DEFAULT_MAX_AGE_SECONDS))
+    ),
+)
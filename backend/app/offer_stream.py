@@ -0,0 +1,187 @@
+# offer_stream.py - v1.0
+# Incremental parser for AWS price list offer files: walks products / terms.OnDemand as a stream
+# and keeps only the SKUs a caller asks for, so multi-hundred-MB files parse in bounded memory.
+# Dependencies: none. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import IO, Any, Callable, Iterator
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Top-level scalar fields worth keeping (small); everything else not walked is skipped.
+OFFER_HEADER_FIELDS = ("formatVersion", "offerCode", "version", "publicationDate")
+
+_WS = " \t\r\n"
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+
+
+class OfferStreamError(ValueError):
+    """Offer file is truncated or not the JSON shape we expect."""
+
+
+class _StreamReader:
+    """Pull-style JSON reader over a binary file object. Holds at most one value plus one chunk."""
+
+    def __init__(self, fp: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read one more chunk into the buffer. Returns False at EOF."""
+        if self._eof:
+            return False
+        raw = self._fp.read(self._chunk_size)
+        if not raw:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+            self._pos = 0
+            return False
+        self._buf = self._buf[self._pos:] + self._decoder.decode(raw)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF) without consuming it."""
+        while True:
+            buf, pos = self._buf, self._pos
+            n = len(buf)
+            while pos < n and buf[pos] in _WS:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        got = self._peek()
+        if got != ch:
+            raise OfferStreamError(f"Expected {ch!r}, got {got!r}")
+        self._pos += 1
+
+    def _read_string(self) -> str:
+        self._expect('"')
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise OfferStreamError("Unterminated string")
+                continue
+            self._pos = end
+            return value
+
+    def read_value(self) -> Any:
+        """Decode the next JSON value in full."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise OfferStreamError("Truncated value")
+                continue
+            # A number or literal that ends exactly at the buffer edge may continue in the next chunk.
+            if end >= len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Advance past the next JSON value without building it."""
+        ch = self._peek()
+        if ch == '"':
+            self._read_string()
+            return
+        if ch not in "{[":
+            self.read_value()
+            return
+        self._pos += 1
+        depth = 1
+        while depth:
+            m = _STRUCTURAL.search(self._buf, self._pos)
+            if m is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise OfferStreamError("Truncated container")
+                continue
+            self._pos = m.start()
+            c = m.group()
+            if c == '"':
+                self._read_string()
+                continue
+            self._pos += 1
+            depth += 1 if c in "{[" else -1
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of the next JSON object. The caller must consume (read or skip) the value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_string()
+            self._expect(":")
+            yield key
+            ch = self._peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise OfferStreamError(f"Expected ',' or '}}', got {ch!r}")
+
+
+def load_offer(
+    fp: IO[bytes],
+    keep_product: Callable[[str, dict[str, Any]], bool],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict[str, Any]:
+    """
+    Parse an offer file from fp, keeping only products for which keep_product(sku, product) is True
+    and their terms.OnDemand entries. Other term types are skipped.
+    Returns a dict shaped like the full file: {"products": {...}, "terms": {"OnDemand": {...}}, header fields}.
+    """
+    reader = _StreamReader(fp, chunk_size)
+    products: dict[str, Any] = {}
+    on_demand: dict[str, Any] = {}
+    out: dict[str, Any] = {"products": products, "terms": {"OnDemand": on_demand}}
+    products_seen = False
+    for key in reader.iter_object():
+        if key == "products":
+            for sku in reader.iter_object():
+                product = reader.read_value()
+                if isinstance(product, dict) and keep_product(sku, product):
+                    products[sku] = product
+            products_seen = True
+        elif key == "terms":
+            for term_type in reader.iter_object():
+                if term_type != "OnDemand":
+                    reader.skip_value()
+                    continue
+                for sku in reader.iter_object():
+                    # Terms normally follow products; if not, keep all and prune below.
+                    if not products_seen or sku in products:
+                        on_demand[sku] = reader.read_value()
+                    else:
+                        reader.skip_value()
+        elif key in OFFER_HEADER_FIELDS:
+            out[key] = reader.read_value()
+        else:
+            reader.skip_value()
+    if reader._peek():
+        raise OfferStreamError("Trailing data after offer object")
+    if not products_seen:
+        on_demand.clear()
+    else:
+        for sku in [s for s in on_demand if s not in products]:
+            del on_demand[sku]
+    return out
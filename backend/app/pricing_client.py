@@ -0,0 +1,57 @@
+# pricing_client.py - v1.0
+# Process-wide boto3 Pricing API client: created lazily on first GetProducts fallback, then reused by every
+# request and worker thread (boto3 clients are thread-safe), so each fallback skips session/client setup
+# and reuses pooled connections. Pool size, retry mode and timeouts come from env.
+# Dependencies: boto3, botocore. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+
+# AWS Pricing API is only available in us-east-1 (and ap-south-1 for India)
+PRICING_REGION = "us-east-1"
+PRICING_API_MAX_POOL_CONNECTIONS = int(os.environ.get("PRICING_API_MAX_POOL_CONNECTIONS", "10"))
+# botocore retry mode: legacy, standard or adaptive (client-side rate limiting on throttling).
+PRICING_API_RETRY_MODE = os.environ.get("PRICING_API_RETRY_MODE", "standard")
+PRICING_API_MAX_ATTEMPTS = int(os.environ.get("PRICING_API_MAX_ATTEMPTS", "3"))
+PRICING_API_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("PRICING_API_CONNECT_TIMEOUT_SECONDS", "5"))
+PRICING_API_READ_TIMEOUT_SECONDS = float(os.environ.get("PRICING_API_READ_TIMEOUT_SECONDS", "30"))
+
+_lock = threading.Lock()
+_client: Any = None
+
+
+def get_pricing_client() -> Any:
+    """Shared boto3 "pricing" client (created on first call). Raises what boto3 raises if it cannot be built."""
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+
+            # Own session: the default boto3 session is not thread-safe to create clients from.
+            _client = boto3.session.Session().client(
+                "pricing",
+                region_name=PRICING_REGION,
+                config=Config(
+                    max_pool_connections=PRICING_API_MAX_POOL_CONNECTIONS,
+                    retries={"mode": PRICING_API_RETRY_MODE, "max_attempts": PRICING_API_MAX_ATTEMPTS},
+                    connect_timeout=PRICING_API_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=PRICING_API_READ_TIMEOUT_SECONDS,
+                ),
+            )
+        return _client
+
+
+def close_pricing_client() -> None:
+    """Close the shared client's connection pool (app shutdown)."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
@@ -0,0 +1,199 @@
+# pricing_index.py - v1.0
+# Compiles a (filtered) offer file once into rate rows indexed by location, (location, storage class) and
+# (location, usage type), so resolver lookups are dictionary hits instead of scans over every product.
+# Dependencies: none. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterator
+
+
+@dataclass(frozen=True)
+class RateRow:
+    """One OnDemand price dimension of one product, normalized for lookup."""
+    sku: str
+    location: str
+    product_family: str
+    storage_class: str
+    usagetype: str
+    unit: str
+    begin_gb: float
+    end_gb: float
+    prices: dict[str, float] = field(hash=False)  # currency -> price per unit
+    attributes: dict[str, Any] = field(hash=False, compare=False)
+    price_dimension: dict[str, Any] = field(hash=False, compare=False)
+
+    def price(self, currency: str) -> float | None:
+        return self.prices.get(currency)
+
+
+def range_from_dim(dim: dict[str, Any]) -> tuple[float, float]:
+    """Get begin/end range from price dimension; support both key naming conventions."""
+    start = 0.0
+    end = float("inf")
+    br = dim.get("beginRange") or dim.get("startingRange")
+    er = dim.get("endRange") or dim.get("endingRange")
+    if br is not None:
+        try:
+            start = float(br)
+        except (TypeError, ValueError):
+            pass
+    if er is not None:
+        try:
+            end = float(er)
+        except (TypeError, ValueError):
+            pass
+    return start, end
+
+
+def _prices_from_dim(dim: dict[str, Any]) -> dict[str, float]:
+    pu = dim.get("pricePerUnit")
+    if not isinstance(pu, dict):
+        return {}
+    out: dict[str, float] = {}
+    for currency, value in pu.items():
+        try:
+            out[currency] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class PricingIndex:
+    """
+    Rate rows of one offer file, in file order, keyed by location, by (location, storage class) and by
+    (location, usage type). select() is the fallback for lookups no key answers: it scans a location
+    with a predicate and memoizes the result per query key, least recently used first out past
+    max_selections (queries can carry client-supplied values such as an S3 storage class).
+    """
+
+    def __init__(
+        self,
+        service_code: str,
+        rows: list[RateRow],
+        url: str | None = None,
+        version: str | None = None,
+        publication_date: str | None = None,
+        max_selections: int = 256,
+    ):
+        self.service_code = service_code
+        self.url = url
+        self.version = version
+        self.publication_date = publication_date
+        self._by_location: dict[str, list[RateRow]] = {}
+        by_storage_class: dict[tuple[str, str], list[RateRow]] = {}
+        by_usagetype: dict[tuple[str, str], list[RateRow]] = {}
+        for row in rows:
+            self._by_location.setdefault(row.location, []).append(row)
+            if row.storage_class:
+                by_storage_class.setdefault((row.location, row.storage_class.strip().lower()), []).append(row)
+            if row.usagetype:
+                by_usagetype.setdefault((row.location, row.usagetype.strip()), []).append(row)
+        self._by_storage_class: dict[tuple[str, str], tuple[RateRow, ...]] = {
+            k: tuple(v) for k, v in by_storage_class.items()
+        }
+        self._by_usagetype: dict[tuple[str, str], tuple[RateRow, ...]] = {
+            k: tuple(v) for k, v in by_usagetype.items()
+        }
+        self._selections: OrderedDict[tuple[str, Hashable], tuple[RateRow, ...]] = OrderedDict()
+        self._max_selections = max_selections
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._by_location.values())
+
+    def __iter__(self) -> Iterator[RateRow]:
+        """All rows, grouped by location in first-seen order (file order within a location)."""
+        for rows in self._by_location.values():
+            yield from rows
+
+    def locations(self) -> list[str]:
+        return list(self._by_location)
+
+    def at(self, location: str) -> tuple[RateRow, ...]:
+        """All rows of location, in file order."""
+        return tuple(self._by_location.get(location, ()))
+
+    def by_storage_class(self, location: str, storage_class: str) -> tuple[RateRow, ...]:
+        """Rows of location whose storage class attribute is storage_class (case-insensitive)."""
+        return self._by_storage_class.get((location, storage_class.strip().lower()), ())
+
+    def by_usagetype(self, location: str, usagetype: str) -> tuple[RateRow, ...]:
+        """Rows of location with exactly this usage type."""
+        return self._by_usagetype.get((location, usagetype.strip()), ())
+
+    def select(
+        self, location: str, query: Hashable, match: Callable[[RateRow], bool]
+    ) -> tuple[RateRow, ...]:
+        """Rows of location accepted by match, in file order. Memoized per (location, query), misses
+        included, within max_selections."""
+        key = (location, query)
+        with self._lock:
+            hit = self._selections.get(key)
+            if hit is not None:
+                self._selections.move_to_end(key)
+                return hit
+        found = tuple(r for r in self._by_location.get(location, ()) if match(r))
+        with self._lock:
+            self._selections[key] = found
+            while len(self._selections) > self._max_selections:
+                self._selections.popitem(last=False)
+        return found
+
+
+def compile_offer(
+    data: dict[str, Any],
+    service_code: str,
+    url: str | None = None,
+    keep_unit: Callable[[str], bool] | None = None,
+) -> PricingIndex:
+    """
+    Build a PricingIndex from offer data ({"products", "terms": {"OnDemand"}}).
+    keep_unit filters price dimensions by unit (e.g. only GB-Mo); default keeps all.
+    """
+    products = data.get("products") or {}
+    on_demand = (data.get("terms") or {}).get("OnDemand") or {}
+    rows: list[RateRow] = []
+    for sku, product in products.items():
+        term_entries = on_demand.get(sku)
+        if not term_entries:
+            continue
+        attrs = product.get("attributes") or {}
+        location = (attrs.get("location") or "").strip()
+        product_family = product.get("productFamily") or attrs.get("productFamily") or ""
+        storage_class = attrs.get("storageClass") or attrs.get("storage class") or ""
+        usagetype = attrs.get("usagetype") or attrs.get("usageType") or ""
+        for _term_sku, term_detail in term_entries.items():
+            for _dim_id, dim in (term_detail.get("priceDimensions") or {}).items():
+                unit = dim.get("unit", "") or ""
+                if keep_unit is not None and not keep_unit(unit):
+                    continue
+                prices = _prices_from_dim(dim)
+                if not prices:
+                    continue
+                begin, end = range_from_dim(dim)
+                rows.append(
+                    RateRow(
+                        sku=sku,
+                        location=location,
+                        product_family=product_family,
+                        storage_class=storage_class,
+                        usagetype=usagetype,
+                        unit=unit,
+                        begin_gb=begin,
+                        end_gb=end,
+                        prices=prices,
+                        attributes=attrs,
+                        price_dimension=dim,
+                    )
+                )
+    return PricingIndex(
+        service_code,
+        rows,
+        url=url,
+        version=data.get("version"),
+        publication_date=data.get("publicationDate"),
+    )
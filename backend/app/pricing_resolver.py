@@ -1,24 +1,31 @@
 # pricing_resolver.py - v1.0
 # Resolves AWS Backup and S3 storage pricing: tries public price list first (no credentials), then GetProducts.
-# Dependencies: boto3, region_mapping, public_pricing. Port: N/A (backend).
+# Async; the blocking boto3 fallback runs on a worker thread. botocore is imported only when the fallback runs.
+# Dependencies: botocore, circuit, pricing_client, region_mapping, public_pricing. Port: N/A (backend).
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
 from dataclasses import dataclass, field
-from typing import Any
-
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from typing import Any, Iterable, Iterator
 
+from .circuit import CircuitBreaker
+from .pricing_client import get_pricing_client
 from .region_mapping import get_location_for_region
 from . import public_pricing as pub
 
 logger = logging.getLogger(__name__)
 
-# AWS Pricing API is only available in us-east-1 (and ap-south-1 for India)
-PRICING_REGION = "us-east-1"
+# GetProducts pagination: products per page (MaxResults, at most 100) and the most pages one lookup reads.
+PRICING_API_PAGE_SIZE = min(100, int(os.environ.get("PRICING_API_PAGE_SIZE", "100")))
+PRICING_API_MAX_PAGES = int(os.environ.get("PRICING_API_MAX_PAGES", "20"))
+
+# Open after repeated GetProducts failures: the fallback then returns at once instead of tying up a worker
+# thread per request on a failing or unreachable API.
+pricing_api_circuit = CircuitBreaker("pricing-api")
 
 
 @dataclass
@@ -83,24 +90,51 @@ def _s3_storage_class_for_api(storage_class: str) -> str:
     return S3_STORAGE_CLASS_API_MAP.get(key, storage_class.strip() or storage_class)
 
 
-def get_products(client: Any, service: str, filters: list[dict]) -> list[dict]:
-    """Paginate GetProducts and return all product list."""
-    out: list[dict] = []
+def get_products(
+    client: Any,
+    service: str,
+    filters: list[dict],
+    page_size: int | None = None,
+    max_pages: int | None = None,
+) -> Iterator[dict]:
+    """
+    Lazily paginate GetProducts, yielding each decoded product as its page arrives. Callers that stop
+    iterating early (first match found) fetch no further pages. At most max_pages pages of page_size
+    (MaxResults) products are read; hitting that budget ends the iteration with a warning.
+    """
+    from botocore.exceptions import ClientError, NoCredentialsError
+
+    page_size = page_size or PRICING_API_PAGE_SIZE
+    max_pages = max_pages or PRICING_API_MAX_PAGES
+    pages = 0
     try:
         paginator = client.get_paginator("get_products")
-        for page in paginator.paginate(ServiceCode=service, Filters=filters):
+        for page in paginator.paginate(
+            ServiceCode=service, Filters=filters, PaginationConfig={"PageSize": page_size}
+        ):
+            pages += 1
             for price_str in page.get("PriceList", []):
                 try:
-                    out.append(json.loads(price_str))
+                    yield json.loads(price_str)
                 except json.JSONDecodeError:
                     continue
+            if pages >= max_pages and page.get("NextToken"):
+                logger.warning("get_products %s: stopped after %d pages (PRICING_API_MAX_PAGES)", service, pages)
+                return
     except (ClientError, NoCredentialsError) as e:
         logger.exception("get_products failed: %s", e)
         raise
-    return out
 
 
-def resolve_aws_backup_storage(
+def _circuit_open_result(pub_result: Any) -> PricingResult:
+    return PricingResult(
+        error=pub_result.error
+        or f"AWS Pricing API unavailable after repeated failures; retry in {pricing_api_circuit.retry_in():.0f}s.",
+        raw_filter_used=pub_result.raw_filter_used,
+    )
+
+
+async def resolve_aws_backup_storage(
     region_code: str,
     currency: str = "USD",
     client: Any | None = None,
@@ -114,7 +148,7 @@ def resolve_aws_backup_storage(
         return PricingResult(error=f"Unknown region: {region_code}")
 
     # 1) Try public price list (no credentials required)
-    pub_result = pub.resolve_aws_backup_storage_public(region_code, currency)
+    pub_result = await pub.resolve_aws_backup_storage_public(region_code, currency)
     if pub_result.rate_per_gb_month is not None:
         # Return public result (exact region or fallback region + warning) so UI shows rate and any message
         return PricingResult(
@@ -130,13 +164,27 @@ def resolve_aws_backup_storage(
         )
 
     # 2) Fallback to Pricing API (requires credentials)
+    return await asyncio.to_thread(_resolve_aws_backup_storage_api, location, currency, client, pub_result)
+
+
+def _resolve_aws_backup_storage_api(
+    location: str,
+    currency: str,
+    client: Any | None,
+    pub_result: Any,
+) -> PricingResult:
+    """GetProducts fallback for AWS Backup storage (blocking; run off the event loop)."""
     filters = [
         {"Type": "TERM_MATCH", "Field": "productFamily", "Value": "Storage"},
         {"Type": "TERM_MATCH", "Field": "location", "Value": location},
         {"Type": "TERM_MATCH", "Field": "serviceCode", "Value": "AWS Backup"},
     ]
+    from botocore.exceptions import ClientError, NoCredentialsError
+
+    if not pricing_api_circuit.allow():
+        return _circuit_open_result(pub_result)
     try:
-        c = client or boto3.client("pricing", region_name=PRICING_REGION)
+        c = client or get_pricing_client()
     except NoCredentialsError:
         return PricingResult(
             error=pub_result.error or "Pricing unavailable. Public price list failed; no AWS credentials for API fallback.",
@@ -146,75 +194,76 @@ def resolve_aws_backup_storage(
         return PricingResult(error=f"Failed to create pricing client: {e}")
 
     try:
-        products = get_products(c, "AWS Backup", filters)
+        best = _backup_rate_from_products(get_products(c, "AWS Backup", filters), location, currency, filters)
     except NoCredentialsError:
         return PricingResult(
             error=pub_result.error or "Public price list failed; no AWS credentials for API fallback.",
             raw_filter_used=pub_result.raw_filter_used,
         )
     except ClientError as e:
+        pricing_api_circuit.record_failure()
         return PricingResult(error=str(e), raw_filter_used={"filters": filters})
     except Exception as e:
+        pricing_api_circuit.record_failure()
         return PricingResult(error=str(e), raw_filter_used={"filters": filters})
+    pricing_api_circuit.record_success()
+    return best
+
+
+def _gb_month_rate(
+    product: dict[str, Any], term_type: str, currency: str
+) -> tuple[float, dict[str, Any]] | None:
+    """First (rate, price dimension) in product's term_type terms priced per GB-month, or None."""
+    for term_detail in ((product.get("terms") or {}).get(term_type) or {}).values():
+        for dim in (term_detail.get("priceDimensions") or {}).values():
+            price_per_unit, unit = _parse_price_dimension(dim, currency)
+            if price_per_unit is None:
+                continue
+            rate = _normalize_to_gb_month(price_per_unit, unit)
+            if rate is not None and rate >= 0:
+                return rate, dim
+    return None
 
-    # Prefer OnDemand, then any term with GB-Mo unit
+
+def _backup_rate_from_products(
+    products: Iterable[dict[str, Any]], location: str, currency: str, filters: list[dict]
+) -> PricingResult:
+    """
+    First OnDemand GB-month rate among Storage products; stops consuming products (and so paginating)
+    as soon as one is found. If no product has one, the first Reserved GB-month rate seen.
+    """
     best: PricingResult = PricingResult(
         raw_filter_used={"service": "AWS Backup", "location": location, "filters": filters},
     )
-    for product in products:
-        attrs = product.get("product", {}).get("attributes", {})
-        # Optional: filter to S3-related if present
-        # if "storageMedia" in attrs and "S3" not in str(attrs.get("storageMedia", "")):
-        #     continue
-        product_family = attrs.get("productFamily", "")
-        if product_family != "Storage":
-            continue
-
-        terms = product.get("terms", {}) or {}
-        on_demand = terms.get("OnDemand", {})
-        for sku, term_detail in on_demand.items():
-            for dim_id, dim in (term_detail.get("priceDimensions") or {}).items():
-                price_per_unit, unit = _parse_price_dimension(dim, currency)
-                if price_per_unit is None:
-                    continue
-                rate = _normalize_to_gb_month(price_per_unit, unit)
-                if rate is not None and rate >= 0:
-                    best.rate_per_gb_month = rate
-                    best.sku = product.get("product", {}).get("sku")
-                    best.product_attributes = attrs
-                    best.term_code = "OnDemand"
-                    best.price_dimension = dim
-                    best.currency = currency
-                    best.unit = "GB-Mo"
-                    return best
-
-    # If no OnDemand, try Reserved or first Storage term with GB-Mo
+    chosen: tuple[dict[str, Any], str, float, dict[str, Any]] | None = None
+    reserved: tuple[dict[str, Any], str, float, dict[str, Any]] | None = None
     for product in products:
         attrs = product.get("product", {}).get("attributes", {})
         if attrs.get("productFamily") != "Storage":
             continue
-        for term_type in ("OnDemand", "Reserved"):
-            for sku, term_detail in (product.get("terms", {}).get(term_type) or {}).items():
-                for dim_id, dim in (term_detail.get("priceDimensions") or {}).items():
-                    price_per_unit, unit = _parse_price_dimension(dim, currency)
-                    if price_per_unit is None:
-                        continue
-                    rate = _normalize_to_gb_month(price_per_unit, unit)
-                    if rate is not None and rate >= 0:
-                        best.rate_per_gb_month = rate
-                        best.sku = product.get("product", {}).get("sku")
-                        best.product_attributes = attrs
-                        best.term_code = term_type
-                        best.price_dimension = dim
-                        best.currency = currency
-                        best.unit = "GB-Mo"
-                        return best
-
-    best.error = "No AWS Backup storage price found for location"
+        hit = _gb_month_rate(product, "OnDemand", currency)
+        if hit is not None:
+            chosen = (product, "OnDemand", *hit)
+            break
+        if reserved is None:
+            hit = _gb_month_rate(product, "Reserved", currency)
+            if hit is not None:
+                reserved = (product, "Reserved", *hit)
+    chosen = chosen or reserved
+    if chosen is None:
+        best.error = "No AWS Backup storage price found for location"
+        return best
+    product, term_code, best.rate_per_gb_month, best.price_dimension = chosen
+    attrs = product.get("product", {}).get("attributes", {})
+    best.sku = product.get("product", {}).get("sku")
+    best.product_attributes = attrs
+    best.term_code = term_code
+    best.currency = currency
+    best.unit = "GB-Mo"
     return best
 
 
-def resolve_s3_storage(
+async def resolve_s3_storage(
     region_code: str,
     storage_class: str,
     currency: str = "USD",
@@ -229,7 +278,7 @@ def resolve_s3_storage(
         return PricingResult(error=f"Unknown region: {region_code}")
 
     # 1) Try public price list (no credentials required)
-    pub_result = pub.resolve_s3_storage_public(region_code, storage_class, currency)
+    pub_result = await pub.resolve_s3_storage_public(region_code, storage_class, currency)
     if not pub_result.error and (pub_result.rate_per_gb_month is not None or pub_result.tiers):
         return PricingResult(
             rate_per_gb_month=pub_result.rate_per_gb_month,
@@ -244,6 +293,19 @@ def resolve_s3_storage(
         )
 
     # 2) Fallback to Pricing API (requires credentials)
+    return await asyncio.to_thread(
+        _resolve_s3_storage_api, location, storage_class, currency, client, pub_result
+    )
+
+
+def _resolve_s3_storage_api(
+    location: str,
+    storage_class: str,
+    currency: str,
+    client: Any | None,
+    pub_result: Any,
+) -> PricingResult:
+    """GetProducts fallback for S3 storage (blocking; run off the event loop)."""
     api_storage_class = _s3_storage_class_for_api(storage_class)
     filters = [
         {"Type": "TERM_MATCH", "Field": "productFamily", "Value": "Storage"},
@@ -251,8 +313,12 @@ def resolve_s3_storage(
         {"Type": "TERM_MATCH", "Field": "serviceCode", "Value": "Amazon S3"},
         {"Type": "TERM_MATCH", "Field": "storageClass", "Value": api_storage_class},
     ]
+    from botocore.exceptions import ClientError, NoCredentialsError
+
+    if not pricing_api_circuit.allow():
+        return _circuit_open_result(pub_result)
     try:
-        c = client or boto3.client("pricing", region_name=PRICING_REGION)
+        c = client or get_pricing_client()
     except NoCredentialsError:
         return PricingResult(
             error=pub_result.error or "Pricing unavailable. Public price list failed; no AWS credentials for API fallback.",
@@ -262,17 +328,26 @@ def resolve_s3_storage(
         return PricingResult(error=f"Failed to create pricing client: {e}")
 
     try:
-        products = get_products(c, "Amazon S3", filters)
+        result = _s3_tiers_from_products(get_products(c, "Amazon S3", filters), location, storage_class, currency)
     except NoCredentialsError:
         return PricingResult(
             error=pub_result.error or "Public price list failed; no AWS credentials for API fallback.",
             raw_filter_used=pub_result.raw_filter_used,
         )
     except ClientError as e:
+        pricing_api_circuit.record_failure()
         return PricingResult(error=str(e), raw_filter_used={"filters": filters})
     except Exception as e:
+        pricing_api_circuit.record_failure()
         return PricingResult(error=str(e), raw_filter_used={"filters": filters})
+    pricing_api_circuit.record_success()
+    return result
 
+
+def _s3_tiers_from_products(
+    products: Iterable[dict[str, Any]], location: str, storage_class: str, currency: str
+) -> PricingResult:
+    """Flat rate or tier bands from every OnDemand GB-month price dimension of the Storage products."""
     result = PricingResult(
         raw_filter_used={"service": "Amazon S3", "storageClass": storage_class, "location": location},
     )
@@ -1,16 +1,25 @@
 # public_pricing.py - v1.0
-# Fetches AWS pricing from public price list URLs (no credentials).
-# Dependencies: region_mapping. Port: N/A (backend).
+# Fetches AWS pricing from public price list URLs (no credentials). Async: network I/O on the shared
+# httpx client, offer parsing on worker threads.
+# Dependencies: cache, region_mapping, offer_catalog, offer_store, offer_stream, pricing_index, snapshot. Port: N/A (backend).
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import urllib.request
+import os
 from dataclasses import dataclass, field
-from typing import Any
-
+from pathlib import Path
+from typing import Any, Callable
+
+from .cache import singleflight
+from .offer_catalog import OfferCatalog
+from .offer_store import offer_store
+from .offer_stream import OfferStreamError, load_offer
+from .pricing_index import PricingIndex, RateRow, compile_offer
 from .region_mapping import get_location_for_region
+from .snapshot import SnapshotError, load_snapshot, snapshot_source_mtime, write_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +28,10 @@ OFFERS_BASE = f"{BASE_URL}/offers/v1.0/aws"
 # Service codes in public index: AmazonS3; AWS Backup may be under different code
 SERVICE_CODE_S3 = "AmazonS3"
 SERVICE_CODE_BACKUP = "AWSBackup"
+CATALOG_TTL = float(os.environ.get("PRICING_CATALOG_TTL_SECONDS", "3600"))
+# Compiled indexes are also written as binary snapshots (see snapshot.py) so a restart skips JSON parsing.
+SNAPSHOTS_ENABLED = os.environ.get("PRICING_SNAPSHOTS_ENABLED", "true").lower() in ("1", "true", "yes")
+SNAPSHOT_DIR = os.environ.get("PRICING_SNAPSHOT_DIR")  # default: <offer store dir>/snapshots
 
 
 @dataclass
@@ -36,31 +49,37 @@ class PricingResult:
     error: str | None = None
 
 
-def _fetch_json(url: str, timeout: int = 90) -> tuple[dict[str, Any] | None, str]:
+async def _fetch_json(
+    url: str, timeout: float | None = None, revalidate: bool = False
+) -> tuple[dict[str, Any] | None, str]:
     """
-    GET URL and parse JSON. Returns (data, error_message).
-    Uses User-Agent so public AWS price list accepts the request.
+    GET URL (via the on-disk offer store) and parse JSON. Returns (data, error_message).
+    Only for small files (main index); offer files go through _fetch_index.
     """
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "awspricing/1.0 (public price list client)",
-    }
-    try:
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read().decode()), ""
-    except urllib.error.HTTPError as e:
-        msg = f"HTTP {e.code}: {e.reason}"
-        logger.warning("Failed to fetch %s: %s", url, msg)
+    path, msg = await offer_store.fetch(url, timeout, revalidate=revalidate)
+    if path is None:
         return None, msg
-    except urllib.error.URLError as e:
-        msg = str(e.reason) if e.reason else str(e)
-        logger.warning("Failed to fetch %s: %s", url, msg)
-        return None, msg
-    except Exception as e:
+    return await asyncio.to_thread(_parse_stored, url, path, json.load)
+
+
+def _parse_stored(
+    url: str, path: Path, parse: Callable[[Any], dict[str, Any]]
+) -> tuple[dict[str, Any] | None, str]:
+    """Parse the stored copy of url. A file that fails to parse is dropped from the store."""
+    try:
+        with open(path, "rb") as fp:
+            return parse(fp), ""
+    except (OfferStreamError, ValueError) as e:
+        msg = f"Invalid price list JSON: {e}"
+    except OSError as e:
         msg = str(e)
-        logger.warning("Failed to fetch %s: %s", url, msg)
-        return None, msg
+    logger.warning("Failed to parse %s: %s", url, msg)
+    offer_store.discard(url)
+    return None, msg
+
+
+# Main offer index, fetched once per CATALOG_TTL and shared by every resolver.
+catalog = OfferCatalog(f"{OFFERS_BASE}/index.json", BASE_URL, _fetch_json, ttl_seconds=CATALOG_TTL)
 
 
 def _normalize_to_gb_month(price_per_unit: float, unit: str) -> float | None:
@@ -70,22 +89,6 @@ def _normalize_to_gb_month(price_per_unit: float, unit: str) -> float | None:
     return None
 
 
-def _parse_price_dimension(dim: dict[str, Any], currency: str) -> tuple[float | None, str]:
-    # Public JSON uses pricePerUnit; support both dict and direct access
-    pu = dim.get("pricePerUnit")
-    if isinstance(pu, dict):
-        price_per_unit = pu.get(currency)
-    else:
-        price_per_unit = None
-    if price_per_unit is None:
-        return None, dim.get("unit", "")
-    try:
-        p = float(price_per_unit)
-    except (TypeError, ValueError):
-        return None, dim.get("unit", "")
-    return p, dim.get("unit", "")
-
-
 def _build_tier_band(from_gb: float, to_gb: float, rate: float) -> dict[str, float]:
     return {"from_gb": from_gb, "to_gb": to_gb, "rate_per_gb_month": rate}
 
@@ -100,67 +103,35 @@ def _get_offer_url_regional(service_code: str, region_code: str) -> str:
     return f"{OFFERS_BASE}/{service_code}/current/{region_code}/index.json"
 
 
-def _resolve_offer_url(service_code: str) -> str | None:
+async def _regional_offer_urls(service_code: str, region_code: str) -> list[str]:
     """
-    Fetch main index and get currentVersionUrl for the service (exact URL from AWS).
-    Returns full URL or None if not found.
+    Offer file for just one region: the exact per-region currentVersionUrl from the service's
+    region_index.json, or the conventional regional path if there is no usable region index.
+    Empty if the region index does not list the region (there is no regional file to fetch).
     """
-    index_url = f"{OFFERS_BASE}/index.json"
-    data, _ = _fetch_json(index_url)
-    if not data:
-        return None
-    offers = data.get("offers") or {}
-    offer = offers.get(service_code)
-    if not offer:
-        return None
-    rel = offer.get("currentVersionUrl") or offer.get("currentRegionIndexUrl")
-    if not rel or not isinstance(rel, str):
-        return None
-    if rel.startswith("/"):
-        return f"{BASE_URL}{rel}"
-    return f"{OFFERS_BASE}/{rel}" if not rel.startswith("http") else rel
+    await catalog.refresh()
+    regions = await catalog.region_urls(service_code)
+    if regions is None:
+        return [_get_offer_url_regional(service_code, region_code)]
+    url = regions.get(region_code)
+    return [url] if url else []
 
 
-def _discover_backup_offer_code() -> str | None:
+def _global_offer_urls(service_code: str) -> list[str]:
+    """All-regions offer file (last resort: 20-30x the size of one region's). Call after catalog.refresh()."""
+    urls = [catalog.current_version_url(service_code), _get_offer_url_global(service_code)]
+    return [u for u in dict.fromkeys(urls) if u]
+
+
+async def _discover_backup_offer_code() -> str | None:
     """Discover AWS Backup offer code from main index (may be AWSBackup, awspricing, etc.)."""
-    index_url = f"{OFFERS_BASE}/index.json"
-    data, _ = _fetch_json(index_url)
-    if not data:
-        return None
-    offers = data.get("offers") or {}
-    for code, _ in offers.items():
-        if code and "backup" in code.lower():
-            return code
-    return None
+    await catalog.refresh()
+    return catalog.find_service("backup")
 
 
-def _range_from_dim(dim: dict[str, Any]) -> tuple[float, float]:
-    """Get begin/end range from price dimension; support both key naming conventions."""
-    start = 0.0
-    end = float("inf")
-    br = dim.get("beginRange") or dim.get("startingRange")
-    er = dim.get("endRange") or dim.get("endingRange")
-    if br is not None:
-        try:
-            start = float(br)
-        except (TypeError, ValueError):
-            pass
-    if er is not None:
-        try:
-            end = float(er)
-        except (TypeError, ValueError):
-            pass
-    return start, end
-
-
-def _backup_storage_match(
-    attrs: dict[str, Any], location: str, product_family: str | None = None
-) -> bool:
-    """True if product looks like Backup storage for the given location.
+def _is_backup_storage(attrs: dict[str, Any], product_family: str | None = None) -> bool:
+    """True if product looks like Backup storage (any location).
     product_family: from product-level attribute (AWS JSON has it at product level)."""
-    loc = (attrs.get("location") or "").strip()
-    if loc != location:
-        return False
     pf = (product_family or attrs.get("productFamily") or "").strip().lower()
     if pf in ("storage", "backup storage", "backup"):
         return True
@@ -172,35 +143,127 @@ def _backup_storage_match(
     return False
 
 
+def _is_gb_month_unit(unit: str) -> bool:
+    u = (unit or "").strip().lower()
+    return "gb-mo" in u or "gb-month" in u
+
+
+# Compiled indexes per offer URL, keyed by the stored file's mtime so a revalidated download recompiles.
+_indexes: dict[str, tuple[int, PricingIndex]] = {}
+# One compile per URL at a time: concurrent lookups (e.g. several storage classes) share the result.
+_index_flights: dict[str, asyncio.Future[tuple[PricingIndex | None, str]]] = {}
+
+
+async def _fetch_index(
+    url: str,
+    service_code: str,
+    keep_product: Callable[[str, dict[str, Any]], bool],
+    keep_unit: Callable[[str], bool],
+    revalidate: bool = False,
+) -> tuple[PricingIndex | None, str]:
+    """
+    Return the compiled PricingIndex for an offer URL, stream-parsing and compiling it only when
+    the stored file changed. Returns (index, error_message). A recompiled index replaces the old one
+    in a single dict assignment; lookups already holding the old index finish on it.
+    """
+    return await singleflight(
+        _index_flights, url, lambda: _load_index(url, service_code, keep_product, keep_unit, revalidate)
+    )
+
+
+async def _load_index(
+    url: str,
+    service_code: str,
+    keep_product: Callable[[str, dict[str, Any]], bool],
+    keep_unit: Callable[[str], bool],
+    revalidate: bool,
+) -> tuple[PricingIndex | None, str]:
+    path, msg = await offer_store.fetch(url, revalidate=revalidate)
+    if path is None:
+        return None, msg
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError as e:
+        return None, str(e)
+    cached = _indexes.get(url)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], ""
+
+    def build() -> tuple[PricingIndex | None, str]:
+        index = _read_snapshot(url, mtime)
+        if index is not None:
+            return index, ""
+        # Stream-parse keeping only relevant products, then compile; the raw file is never fully loaded.
+        data, msg = _parse_stored(url, path, lambda fp: load_offer(fp, keep_product))
+        if not data:
+            return None, msg
+        index = compile_offer(data, service_code, url=url, keep_unit=keep_unit)
+        _write_snapshot(index, url, mtime)
+        return index, ""
+
+    # CPU-bound parse runs on a worker thread so the event loop keeps serving requests.
+    index, msg = await asyncio.to_thread(build)
+    if index is not None:
+        _indexes[url] = (mtime, index)
+    return index, msg
+
+
+def _snapshot_path(url: str) -> Path | None:
+    if not SNAPSHOTS_ENABLED:
+        return None
+    return Path(SNAPSHOT_DIR or offer_store.root / "snapshots") / f"{offer_store.key(url)}.idx"
+
+
+def _read_snapshot(url: str, source_mtime_ns: int) -> PricingIndex | None:
+    """Compiled index from a snapshot of exactly this stored file, or None (missing, stale, unreadable)."""
+    path = _snapshot_path(url)
+    if path is None or snapshot_source_mtime(path) != source_mtime_ns:
+        return None
+    try:
+        return load_snapshot(path)
+    except SnapshotError as e:
+        logger.warning("Ignoring snapshot %s: %s", path, e)
+        return None
+
+
+def _write_snapshot(index: PricingIndex, url: str, source_mtime_ns: int) -> None:
+    path = _snapshot_path(url)
+    if path is None:
+        return
+    try:
+        write_snapshot(index, path, source_mtime_ns)
+    except OSError as e:
+        logger.warning("Could not write snapshot %s: %s", path, e)
+
+
+async def _backup_index(
+    url: str, service_code: str, revalidate: bool = False
+) -> tuple[PricingIndex | None, str]:
+    return await _fetch_index(
+        url,
+        service_code,
+        lambda _sku, p: _is_backup_storage(p.get("attributes") or {}, p.get("productFamily")),
+        _is_gb_month_unit,
+        revalidate,
+    )
+
+
 def _find_backup_rate_for_location(
-    products: dict[str, Any],
-    on_demand: dict[str, Any],
+    index: PricingIndex,
     location: str,
     currency: str,
 ) -> tuple[float, str, dict[str, Any], dict[str, Any]] | None:
     """Find first Backup storage rate for the given location. Returns (rate, sku, attrs, dim) or None.
-    Prefers GB-Mo / GB-month (storage) over plain GB (transfer)."""
-    product_family = None
-    for sku, product in products.items():
-        attrs = product.get("attributes") or {}
-        product_family = product.get("productFamily")  # AWS JSON has it at product level
-        if not _backup_storage_match(attrs, location, product_family):
+    Only GB-Mo / GB-month Backup storage rows are compiled into the Backup index."""
+    # The Backup index keeps only Backup storage products (see _backup_index), so every row of the
+    # location qualifies: a dictionary hit, no predicate scan.
+    for row in index.at(location):
+        price_per_unit = row.price(currency)
+        if price_per_unit is None:
             continue
-        if sku not in on_demand:
-            continue
-        term_entries = on_demand[sku]
-        for _term_sku, term_detail in term_entries.items():
-            dims = term_detail.get("priceDimensions") or {}
-            for _dim_id, dim in dims.items():
-                price_per_unit, unit = _parse_price_dimension(dim, currency)
-                if price_per_unit is None:
-                    continue
-                u = (unit or "").strip().lower()
-                if "gb-mo" not in u and "gb-month" not in u:
-                    continue
-                rate = _normalize_to_gb_month(price_per_unit, unit)
-                if rate is not None and rate >= 0:
-                    return (rate, sku, dict(attrs), dict(dim))
+        rate = _normalize_to_gb_month(price_per_unit, row.unit)
+        if rate is not None and rate >= 0:
+            return (rate, row.sku, dict(row.attributes), dict(row.price_dimension))
     return None
 
 
@@ -208,96 +271,80 @@ def _find_backup_rate_for_location(
 BACKUP_FALLBACK_REGION = "us-east-1"
 
 
-def resolve_aws_backup_storage_public(
+async def resolve_aws_backup_storage_public(
     region_code: str,
     currency: str = "USD",
 ) -> PricingResult:
     """
     Resolve AWS Backup storage pricing from public price list (no credentials).
-    Tries discovered Backup offer code from index, then AWSBackup. If the selected region
-    has no Backup listing, falls back to us-east-1 rate and returns a warning so the comparison still works.
+    Tries discovered Backup offer code from index, then AWSBackup, fetching only the selected region's
+    offer file (from the region index), then us-east-1's; the all-regions file is the last resort.
+    If the selected region has no Backup listing, returns the us-east-1 rate with a warning so the
+    comparison still works.
     """
     location = get_location_for_region(region_code)
     if not location:
         return PricingResult(error=f"Unknown region: {region_code}")
+    fallback_location = get_location_for_region(BACKUP_FALLBACK_REGION)
+
+    service_codes = [c for c in dict.fromkeys((await _discover_backup_offer_code(), SERVICE_CODE_BACKUP)) if c]
+    attempts: list[tuple[str, str]] = []
+    for region in dict.fromkeys((region_code, BACKUP_FALLBACK_REGION)):
+        for service_code in service_codes:
+            attempts += [(service_code, u) for u in await _regional_offer_urls(service_code, region)]
+    for service_code in service_codes:
+        attempts += [(service_code, u) for u in _global_offer_urls(service_code)]
 
     fetch_error = ""
-    data = None
+    loaded_url = None
     url = None
-    # Try discovered offer code first, then known code
-    for service_code in (_discover_backup_offer_code(), SERVICE_CODE_BACKUP):
-        if not service_code:
+    for service_code, url in attempts:
+        index, error = await _backup_index(url, service_code)
+        if not index:
+            fetch_error = error or fetch_error
             continue
-        url = _resolve_offer_url(service_code)
-        if url:
-            data, fetch_error = _fetch_json(url)
-            if data:
-                break
-        if not data:
-            url = _get_offer_url_global(service_code)
-            data, fetch_error2 = _fetch_json(url)
-            if fetch_error2:
-                fetch_error = fetch_error2
-            if data:
-                break
-        if not data:
-            url = _get_offer_url_regional(service_code, region_code)
-            data, fetch_error2 = _fetch_json(url)
-            if fetch_error2:
-                fetch_error = fetch_error2
-        if data:
-            break
-
-    if not data:
+        loaded_url = url
+        found = _find_backup_rate_for_location(index, location, currency)
+        if found:
+            return _backup_result(found, location, url, currency)
+        # Not found for this region: try fallback region so user still gets a comparison
+        if fallback_location and fallback_location != location:
+            fallback_found = _find_backup_rate_for_location(index, fallback_location, currency)
+            if fallback_found:
+                best = _backup_result(fallback_found, location, url, currency)
+                best.error = (
+                    f"AWS Backup storage not in public price list for this region. "
+                    f"Rate shown is for {BACKUP_FALLBACK_REGION} ({fallback_location}). "
+                    "S3 comparison below uses public pricing for your selected region. Use \"Refresh prices\" to retry."
+                )
+                return best
+
+    if not loaded_url:
         return PricingResult(
             error=f"AWS Backup not in public price list. {fetch_error or 'Try Pricing API with credentials for Backup.'}",
             raw_filter_used={"service": "AWS Backup", "region": region_code, "url": url},
         )
+    # No rate at all
+    return PricingResult(
+        raw_filter_used={"service": "AWS Backup (public)", "location": location, "url": loaded_url},
+        error="AWS Backup storage not in public price list for this region. S3 comparison below uses public pricing.",
+    )
 
-    products = data.get("products") or {}
-    terms = data.get("terms") or {}
-    on_demand = terms.get("OnDemand") or {}
 
-    best = PricingResult(
+def _backup_result(
+    found: tuple[float, str, dict[str, Any], dict[str, Any]], location: str, url: str, currency: str
+) -> PricingResult:
+    rate, sku, attrs, dim = found
+    return PricingResult(
+        rate_per_gb_month=rate,
+        sku=sku,
+        product_attributes=attrs,
+        term_code="OnDemand",
+        price_dimension=dim,
+        currency=currency,
+        unit="GB-Mo",
         raw_filter_used={"service": "AWS Backup (public)", "location": location, "url": url},
     )
-    found = _find_backup_rate_for_location(products, on_demand, location, currency)
-    if found:
-        rate, sku, attrs, dim = found
-        best.rate_per_gb_month = rate
-        best.sku = sku
-        best.product_attributes = attrs
-        best.term_code = "OnDemand"
-        best.price_dimension = dim
-        best.currency = currency
-        best.unit = "GB-Mo"
-        return best
-
-    # Not found for this region: try fallback region so user still gets a comparison
-    fallback_location = get_location_for_region(BACKUP_FALLBACK_REGION)
-    if fallback_location and fallback_location != location:
-        fallback_found = _find_backup_rate_for_location(
-            products, on_demand, fallback_location, currency
-        )
-        if fallback_found:
-            rate, sku, attrs, dim = fallback_found
-            best.rate_per_gb_month = rate
-            best.sku = sku
-            best.product_attributes = attrs
-            best.term_code = "OnDemand"
-            best.price_dimension = dim
-            best.currency = currency
-            best.unit = "GB-Mo"
-            best.error = (
-                f"AWS Backup storage not in public price list for this region. "
-                f"Rate shown is for {BACKUP_FALLBACK_REGION} ({fallback_location}). "
-                "S3 comparison below uses public pricing for your selected region. Use \"Refresh prices\" to retry."
-            )
-            return best
-
-    # No rate at all
-    best.error = "AWS Backup storage not in public price list for this region. S3 comparison below uses public pricing."
-    return best
 
 
 def _s3_usagetype_matches(storage_class: str, usagetype: str) -> bool:
@@ -319,45 +366,134 @@ def _s3_usagetype_matches(storage_class: str, usagetype: str) -> bool:
     return ut == f"TimedStorage-{storage_class}" or storage_class.lower() in ut.lower()
 
 
-def resolve_s3_storage_public(
+def _s3_storage_class_matches(
+    attrs: dict[str, Any], product_family: str | None, storage_class: str
+) -> bool:
+    """True if an S3 product (from global or regional offer file) is the requested storage class."""
+    product_family = attrs.get("productFamily") or product_family
+    if product_family == "Storage":
+        want = storage_class.strip().lower()
+        sc = (attrs.get("storageClass") or attrs.get("storage class") or "").strip().lower()
+        if want == "standard" and ("general" in sc or sc == "standard" or not sc):
+            return True
+        return bool(sc and (want == sc or want in sc or sc in want))
+    ut = attrs.get("usagetype") or attrs.get("usageType") or ""
+    return _s3_usagetype_matches(storage_class, ut)
+
+
+# Request names whose rows carry another storageClass attribute in the offer files.
+_S3_STORAGE_CLASS_NAMES = {"standard": "general purpose", "standard-ia": "infrequent access"}
+# Request names priced by one exact usage type (rows outside the Storage product family).
+_S3_USAGETYPES = {"standard": "TimedStorage-ByteHrs", "general purpose": "TimedStorage-ByteHrs"}
+
+
+def _s3_family(row: RateRow) -> str:
+    return row.attributes.get("productFamily") or row.product_family
+
+
+def _s3_storage_rows(index: PricingIndex, location: str, storage_class: str) -> tuple[RateRow, ...]:
+    """
+    Rows pricing storage_class at location. Exact class names (and their request aliases) are dictionary
+    hits on (location, storage class) or (location, usage type); names that only match loosely (e.g. a
+    substring of the offer's class) fall back to a memoized predicate scan with _s3_storage_class_matches.
+    """
+    want = storage_class.strip().lower()
+    rows = tuple(
+        r for r in index.by_storage_class(location, _S3_STORAGE_CLASS_NAMES.get(want, want))
+        if _s3_family(r) == "Storage"
+    )
+    if not rows and want in _S3_USAGETYPES:
+        rows = tuple(
+            r for r in index.by_usagetype(location, _S3_USAGETYPES[want]) if _s3_family(r) != "Storage"
+        )
+    if rows:
+        return rows
+    return index.select(
+        location,
+        ("s3-storage", storage_class),
+        lambda r: _s3_storage_class_matches(r.attributes, r.product_family, storage_class),
+    )
+
+
+def _is_s3_storage_product(_sku: str, product: dict[str, Any]) -> bool:
+    """Products that can match any storage class: Storage family or storage usage types."""
+    attrs = product.get("attributes") or {}
+    if (attrs.get("productFamily") or product.get("productFamily")) == "Storage":
+        return True
+    ut = attrs.get("usagetype") or attrs.get("usageType") or ""
+    return "Storage" in ut or "ByteHrs" in ut
+
+
+async def _s3_index(url: str, revalidate: bool = False) -> tuple[PricingIndex | None, str]:
+    return await _fetch_index(
+        url,
+        SERVICE_CODE_S3,
+        _is_s3_storage_product,
+        lambda unit: _normalize_to_gb_month(0.0, unit) is not None,
+        revalidate,
+    )
+
+
+def compiled_service_codes() -> set[str]:
+    """Service codes with at least one compiled offer file (what reingest can refresh)."""
+    return {index.service_code for _, index in _indexes.values()}
+
+
+async def reingest(service_code: str) -> bool:
+    """
+    Revalidate every compiled offer file of service_code with the origin (conditional GET) and
+    recompile the ones that changed, swapping each index in place. Also reloads the service's region
+    index: per-region offer URLs are versioned, so a new publication shows up as new URLs there (the
+    indexes of superseded URLs are dropped). Returns True if any index or region URL was replaced.
+    """
+    changed = False
+    before = catalog.cached_region_urls(service_code)
+    if before:
+        after = await catalog.region_urls(service_code, force=True) or {}
+        for region, url in before.items():
+            if after.get(region, url) != url:
+                _indexes.pop(url, None)
+                changed = True
+    for url, (_, old) in list(_indexes.items()):
+        if old.service_code != service_code:
+            continue
+        if service_code == SERVICE_CODE_S3:
+            index, _ = await _s3_index(url, revalidate=True)
+        else:
+            index, _ = await _backup_index(url, service_code, revalidate=True)
+        changed = changed or (index is not None and index is not old)
+    return changed
+
+
+async def resolve_s3_storage_public(
     region_code: str,
     storage_class: str,
     currency: str = "USD",
 ) -> PricingResult:
     """
     Resolve S3 storage pricing from public price list (no credentials).
-    Tries regional URL first (has products with location/usagetype), then global. Matches by productFamily+storageClass or by usagetype.
+    Fetches only the region's offer file (exact URL from the region index); the all-regions file is
+    the last resort. Matches by productFamily+storageClass or by usagetype.
     """
     location = get_location_for_region(region_code)
     if not location:
         return PricingResult(error=f"Unknown region: {region_code}")
 
     fetch_error = ""
-    data = None
+    index = None
     url = None
-    url = _get_offer_url_regional(SERVICE_CODE_S3, region_code)
-    data, fetch_error = _fetch_json(url)
-    if not data:
-        url = _resolve_offer_url(SERVICE_CODE_S3)
-        if url:
-            data, fetch_error = _fetch_json(url)
-        else:
-            fetch_error = ""
-    if not data:
-        url = _get_offer_url_global(SERVICE_CODE_S3)
-        data, fetch_error2 = _fetch_json(url)
-        if fetch_error2:
-            fetch_error = fetch_error2
-    if not data:
+    urls = await _regional_offer_urls(SERVICE_CODE_S3, region_code) + _global_offer_urls(SERVICE_CODE_S3)
+    for url in urls:
+        index, error = await _s3_index(url)
+        if index:
+            break
+        fetch_error = error or fetch_error
+    if not index:
         return PricingResult(
             error=f"Public price list (S3) unavailable. {fetch_error or 'Check network.'}",
             raw_filter_used={"service": SERVICE_CODE_S3, "region": region_code, "url": url},
         )
 
-    products = data.get("products") or {}
-    terms = data.get("terms") or {}
-    on_demand = terms.get("OnDemand") or {}
-
     result = PricingResult(
         raw_filter_used={
             "service": "Amazon S3 (public)",
@@ -367,45 +503,22 @@ def resolve_s3_storage_public(
         },
     )
     tiers_with_rates: list[tuple[float, float, float]] = []
-    want = storage_class.strip().lower()
 
-    for sku, product in products.items():
-        attrs = product.get("attributes") or {}
-        if attrs.get("location") != location:
-            continue
-        product_family = attrs.get("productFamily") or product.get("productFamily")
-        storage_class_ok = False
-        if product_family == "Storage":
-            sc = (attrs.get("storageClass") or attrs.get("storage class") or "").strip().lower()
-            if want == "standard" and ("general" in sc or sc == "standard" or not sc):
-                storage_class_ok = True
-            elif sc and (want == sc or want in sc or sc in want):
-                storage_class_ok = True
-        else:
-            ut = attrs.get("usagetype") or attrs.get("usageType") or ""
-            storage_class_ok = _s3_usagetype_matches(storage_class, ut)
-        if not storage_class_ok:
+    for row in _s3_storage_rows(index, location, storage_class):
+        price_per_unit = row.price(currency)
+        if price_per_unit is None:
             continue
-        if sku not in on_demand:
+        rate = _normalize_to_gb_month(price_per_unit, row.unit)
+        if rate is None or rate < 0:
             continue
-        term_entries = on_demand[sku]
-        for term_sku, term_detail in term_entries.items():
-            for dim_id, dim in (term_detail.get("priceDimensions") or {}).items():
-                price_per_unit, unit = _parse_price_dimension(dim, currency)
-                if price_per_unit is None:
-                    continue
-                rate = _normalize_to_gb_month(price_per_unit, unit)
-                if rate is None or rate < 0:
-                    continue
-                start, end = _range_from_dim(dim)
-                tiers_with_rates.append((start, end, rate))
-                if result.sku is None:
-                    result.sku = sku
-                    result.product_attributes = dict(attrs)
-                    result.term_code = "OnDemand"
-                    result.price_dimension = dict(dim)
-                result.currency = currency
-                result.unit = "GB-Mo"
+        tiers_with_rates.append((row.begin_gb, row.end_gb, rate))
+        if result.sku is None:
+            result.sku = row.sku
+            result.product_attributes = dict(row.attributes)
+            result.term_code = "OnDemand"
+            result.price_dimension = dict(row.price_dimension)
+        result.currency = currency
+        result.unit = "GB-Mo"
 
     if not tiers_with_rates:
         result.error = "No S3 storage price found for storage class and location in public price list"
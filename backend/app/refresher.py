@@ -0,0 +1,130 @@
+# refresher.py - v1.0
+# Scheduled price list refresh: periodically revalidates the main offer index and, when it changed,
+# re-ingests the services whose offer files changed and lets the app recompute cached prices.
+# Request handlers never wait on it; they keep reading the previous data until the swap.
+# Dependencies: offer_catalog. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from .offer_catalog import OfferCatalog
+
+logger = logging.getLogger(__name__)
+
+
+class PriceListRefresher:
+    """
+    Every interval_seconds: reload the offer catalog (conditional GET). If its publicationDate or a
+    watched service's currentVersionUrl / currentRegionIndexUrl changed since the previous check (even if
+    a request already reloaded the catalog), call reingest(code) for each watched service (revalidates
+    that service's offer files, True if any was recompiled) and then on_change(code) for the ones that
+    changed.
+    """
+
+    def __init__(
+        self,
+        catalog: OfferCatalog,
+        watched: Callable[[], Iterable[str]],
+        reingest: Callable[[str], Awaitable[bool]],
+        on_change: Callable[[str], Awaitable[Any]],
+        interval_seconds: float = 3600,
+    ):
+        self._catalog = catalog
+        self._watched = watched
+        self._reingest = reingest
+        self._on_change = on_change
+        self._interval = interval_seconds
+        self._task: asyncio.Task[None] | None = None
+        self._checks = 0
+        self._errors = 0
+        self._last_error = ""
+        self._last_check_at: float | None = None
+        self._last_changed: list[str] = []
+        # Catalog state as of the last check; requests may refresh the catalog in between, so change
+        # detection compares against this rather than the catalog's state when a check starts.
+        self._seen_publication_date: str | None = None
+        self._seen: dict[str, tuple[str | None, str | None]] | None = None
+
+    def _fingerprint(self, codes: Iterable[str]) -> dict[str, tuple[str | None, str | None]]:
+        return {
+            code: (self._catalog.current_version_url(code), self._catalog.current_region_index_url(code))
+            for code in codes
+        }
+
+    async def check_once(self) -> list[str]:
+        """One refresh pass. Returns the service codes whose pricing data was replaced."""
+        codes = sorted(self._watched())
+        if not codes:
+            return []
+        if self._seen is None:
+            self._seen_publication_date = self._catalog.publication_date
+            self._seen = self._fingerprint(codes)
+        error = await self._catalog.refresh(force=True)
+        if error:
+            raise RuntimeError(f"Offer index refresh failed: {error}")
+        publication_date, current = self._catalog.publication_date, self._fingerprint(codes)
+        # Services first watched since the last check were compiled from current data: no change for them.
+        before = {code: self._seen.get(code, current[code]) for code in codes}
+        unchanged = publication_date == self._seen_publication_date and current == before
+        if unchanged:
+            self._seen.update(current)
+            return []
+        changed = []
+        for code in codes:
+            if await self._reingest(code):
+                changed.append(code)
+                await self._on_change(code)
+        # Only now: if re-ingest failed part way, the next check sees the change again and retries.
+        self._seen_publication_date = publication_date
+        self._seen.update(current)
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            self._checks += 1
+            self._last_check_at = time.time()
+            try:
+                changed = await self.check_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._last_error = str(e)
+                logger.warning("Price list refresh failed: %s", e)
+                continue
+            self._last_error = ""
+            if changed:
+                self._last_changed = changed
+                logger.info("Price lists changed upstream, refreshed: %s", ", ".join(changed))
+
+    def start(self) -> None:
+        """Start the periodic loop on the running event loop (no-op if running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def status(self) -> dict[str, Any]:
+        """Counters for /health."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self._interval,
+            "checks": self._checks,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "last_check_at": self._last_check_at,
+            "last_changed": self._last_changed,
+        }
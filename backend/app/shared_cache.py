@@ -0,0 +1,248 @@
+# shared_cache.py - v1.0
+# TTLCache kept in a shared storage backend (SQLite file for all workers on a node, Redis for all nodes),
+# so workers share one copy of resolved pricing. A per-key lease makes one process compute a missing key
+# while the others wait for its result, so a cold key costs one price list fetch instead of one per worker.
+# From coroutines, every backend call runs on a worker thread, so a slow SQLite lock or Redis round trip
+# never stalls the event loop.
+# Dependencies: cache, backends. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from .backends import BackendError, CacheBackend
+from .cache import CacheResult, TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SharedTTLCache(TTLCache):
+    """
+    TTLCache whose entries live in a CacheBackend that several processes use at once. Same interface and
+    semantics as TTLCache (TTL, stale window, single-flight per key); size bounds and LRU eviction are the
+    backend's. Values must be JSON-serializable and come back as plain JSON types; cached_at is wall-clock
+    time. Hit / miss counters in stats() are per process; entries and bytes are for the shared store, with
+    entries recounted at most once per count_interval_seconds (counting lists every key, a SCAN on Redis).
+    A process that misses a key another process is computing waits up to lease_seconds for its result,
+    polling every poll_seconds, then computes the key itself. If the backend is unreachable, lookups miss
+    and values are computed locally (and not stored) instead of failing requests.
+    """
+
+    _now = staticmethod(time.time)
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float = 86400,
+        stale_ttl_seconds: float = 0,
+        lease_seconds: float = 120,
+        poll_seconds: float = 0.05,
+        namespace: str = "pricing",
+        count_interval_seconds: float = 60,
+    ):
+        super().__init__(ttl_seconds, stale_ttl_seconds=stale_ttl_seconds)
+        self.backend = backend
+        self._prefix = f"{namespace}:"
+        self._lease_prefix = f"{namespace}-lease:"
+        self._lease_seconds = lease_seconds
+        self._poll_seconds = poll_seconds
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}".encode()
+        self._backend_errors = 0
+        self._count_interval = count_interval_seconds
+        self._count: int | None = None
+        self._counted_at = 0.0
+
+    def _backend_failed(self, op: str, e: BackendError) -> None:
+        self._backend_errors += 1
+        logger.warning("Shared cache %s failed: %s", op, e)
+
+    # Storage: the TTLCache primitives, backed by the shared store.
+
+    def _lookup(
+        self, k: str, count: bool = True, allow_stale: bool = False
+    ) -> tuple[Any, float, bool] | None:
+        try:
+            raw = self.backend.get(self._prefix + k)
+        except BackendError as e:
+            self._backend_failed("read", e)
+            raw = None
+        entry = json.loads(raw) if raw is not None else None
+        stale = False
+        if entry is not None:
+            age = self._now() - entry["cached_at"]
+            if age > self._ttl + self._stale_ttl:
+                entry = None
+                with self._lock:
+                    self._expirations += 1
+            elif age > self._ttl:
+                stale = True
+                if not allow_stale:
+                    entry = None
+        with self._lock:
+            if entry is None:
+                self._misses += count
+                return None
+            if count:
+                self._hits += 1
+                self._stale_hits += stale
+        return (entry["value"], entry["cached_at"], stale)
+
+    def set(self, value: Any, **kwargs: Any) -> None:
+        """Store value for ttl + stale_ttl; the backend evicts by its own size bounds."""
+        entry = {"value": value, "cached_at": self._now(), "fields": kwargs}
+        data = json.dumps(entry, separators=(",", ":")).encode()
+        try:
+            self.backend.set(self._prefix + self._key(**kwargs), data, self._ttl + self._stale_ttl)
+        except BackendError as e:
+            self._backend_failed("write", e)
+
+    def invalidate(self, **kwargs: Any) -> bool:
+        """Remove entry if present. Returns True if removed (False also if the backend is unreachable)."""
+        try:
+            return self.backend.delete(self._prefix + self._key(**kwargs))
+        except BackendError as e:
+            self._backend_failed("delete", e)
+            return False
+
+    def find(self, **match: Any) -> list[dict[str, Any]]:
+        """Key fields of every stored entry (fresh or stale) whose fields include all of match.
+        Empty if the backend is unreachable."""
+        found = []
+        try:
+            for key in self.backend.keys(self._prefix):
+                raw = self.backend.get(key)
+                if raw is None:
+                    continue
+                fields = json.loads(raw)["fields"]
+                if all(fields.get(f) == v for f, v in match.items()):
+                    found.append(fields)
+        except BackendError as e:
+            self._backend_failed("scan", e)
+            return []
+        return found
+
+    def invalidate_all(self) -> None:
+        try:
+            for key in self.backend.keys(self._prefix):
+                self.backend.delete(key)
+        except BackendError as e:
+            self._backend_failed("delete", e)
+
+    def __len__(self) -> int:
+        try:
+            return len(self.backend.keys(self._prefix))
+        except BackendError as e:
+            self._backend_failed("scan", e)
+            return 0
+
+    async def _alookup(
+        self, k: str, count: bool = True, allow_stale: bool = False
+    ) -> tuple[Any, float, bool] | None:
+        return await asyncio.to_thread(self._lookup, k, count, allow_stale)
+
+    async def _aset(self, value: Any, kwargs: dict[str, Any]) -> None:
+        await asyncio.to_thread(lambda: self.set(value, **kwargs))
+
+    async def ainvalidate(self, **kwargs: Any) -> bool:
+        return await asyncio.to_thread(lambda: self.invalidate(**kwargs))
+
+    async def afind(self, **match: Any) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(lambda: self.find(**match))
+
+    def sweep(self) -> int:
+        """Drop expired keys in backends that expire lazily. Returns the number removed."""
+        try:
+            removed = self.backend.sweep()
+        except BackendError as e:
+            self._backend_failed("sweep", e)
+            return 0
+        with self._lock:
+            self._expirations += removed
+        return removed
+
+    def close(self) -> None:
+        super().close()
+        self.backend.close()
+
+    def _entry_count(self) -> int:
+        """Shared entries as of the last count, recounted when older than count_interval_seconds."""
+        with self._lock:
+            if self._count is not None and time.monotonic() - self._counted_at < self._count_interval:
+                return self._count
+        count = len(self.backend.keys(self._prefix))
+        with self._lock:
+            self._count, self._counted_at = count, time.monotonic()
+        return count
+
+    def stats(self) -> dict[str, Any]:
+        try:
+            shared = {**self.backend.stats(), "entries": self._entry_count()}
+        except BackendError as e:
+            shared = {"backend": self.backend.kind, "error": str(e)}
+        stats: dict[str, Any] = {**super().stats(), **shared, "backend_errors": self._backend_errors}
+        for local_only in ("max_entries", "max_bytes"):
+            stats.pop(local_only)
+        return stats
+
+    # Cross-process single-flight: the in-process flight leader also takes the key's lease.
+
+    def _try_lease(self, k: str) -> bool:
+        try:
+            return self.backend.add(self._lease_prefix + k, self._owner, self._lease_seconds)
+        except BackendError as e:
+            self._backend_failed("lease", e)
+            # The add may have gone through with its reply lost: drop our lease if it is there, so other
+            # processes do not wait on it while we compute locally.
+            self._release_lease(k)
+            return True  # no coordination possible: compute locally
+
+    def _release_lease(self, k: str) -> None:
+        key = self._lease_prefix + k
+        try:
+            # Not atomic: at worst a lease that already expired and was taken over is dropped early.
+            if self.backend.get(key) == self._owner:
+                self.backend.delete(key)
+        except BackendError as e:
+            self._backend_failed("lease release", e)
+
+    def _lease_step(
+        self, k: str, newer_than: float | None, deadline: float
+    ) -> tuple[bool, bool, tuple[Any, float, bool] | None]:
+        """(done, leased, hit): hit if another process stored k meanwhile (after newer_than, when given);
+        leased if we own k now; done with neither once the deadline passed."""
+        hit = self._lookup(k, count=False)
+        if hit is not None and (newer_than is None or hit[1] >= newer_than):
+            return True, False, hit
+        if self._try_lease(k):
+            return True, True, None
+        return self._now() > deadline, False, None
+
+    async def _alead(
+        self,
+        k: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_if: Callable[[Any], bool] | None,
+        kwargs: dict[str, Any],
+        replace: bool = False,
+    ) -> CacheResult:
+        started = self._now()
+        # A replace is satisfied by a value another process stored after we were asked to refresh.
+        newer_than = started if replace else None
+        deadline = started + self._lease_seconds
+        done, leased, hit = await asyncio.to_thread(self._lease_step, k, newer_than, deadline)
+        while not done:
+            await asyncio.sleep(self._poll_seconds)
+            done, leased, hit = await asyncio.to_thread(self._lease_step, k, newer_than, deadline)
+        if hit is not None:
+            return CacheResult(hit[0], hit[1], True, False)
+        try:
+            return await super()._alead(k, compute, cache_if, kwargs, replace)
+        finally:
+            if leased:
+                await asyncio.to_thread(self._release_lease, k)
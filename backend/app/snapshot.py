@@ -0,0 +1,261 @@
+# snapshot.py - v1.0
+# Compact binary snapshot of a compiled PricingIndex: columnar row arrays plus an interned string table.
+# A process start reads the file in one call and decodes it into its own private PricingIndex, in
+# milliseconds instead of re-parsing the JSON offer file. Rows are not shared between workers; each holds
+# its own decoded copy.
+# Dependencies: pricing_index. Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any
+
+from .pricing_index import PricingIndex, RateRow
+
+MAGIC = b"AWSPIDX\x00"
+FORMAT_VERSION = 1
+# magic, format version, rows, strings, prices, attribute sets, attribute pairs, source mtime (ns),
+# then string ids of service_code, url, version, publication_date (-1 = None).
+_HEADER = struct.Struct("<8sIIIIIIq4i")
+# Per-row u32 columns, in file order.
+_ROW_COLUMNS = ("sku", "location", "product_family", "storage_class", "usagetype", "unit", "dim", "attrs")
+
+
+class SnapshotError(ValueError):
+    """Snapshot file is missing, truncated, from another format version, or otherwise unreadable."""
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.items: list[str] = []
+
+    def id(self, s: str | None) -> int:
+        if s is None:
+            return -1
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def _le(a: array) -> bytes:
+    """Array bytes in little-endian order (the on-disk byte order)."""
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def write_snapshot(index: PricingIndex, path: str | Path, source_mtime_ns: int = 0) -> int:
+    """Write index to path atomically (temp file + rename). Returns the snapshot size in bytes.
+    source_mtime_ns records which stored offer file the snapshot was built from."""
+    strings = _StringTable()
+    cols: dict[str, array] = {name: array("I") for name in _ROW_COLUMNS}
+    begin, end = array("d"), array("d")
+    price_start, price_currency, price_value = array("I", [0]), array("I"), array("d")
+    attr_sets: dict[int, int] = {}  # id(attributes dict) -> set number; rows of one product share it
+    attr_start, attr_key, attr_val = array("I", [0]), array("I"), array("I")
+    for row in index:
+        set_no = attr_sets.get(id(row.attributes))
+        if set_no is None:
+            set_no = attr_sets[id(row.attributes)] = len(attr_start) - 1
+            for k, v in row.attributes.items():
+                attr_key.append(strings.id(k))
+                attr_val.append(strings.id(v if isinstance(v, str) else json.dumps(v)))
+            attr_start.append(len(attr_key))
+        cols["sku"].append(strings.id(row.sku))
+        cols["location"].append(strings.id(row.location))
+        cols["product_family"].append(strings.id(row.product_family))
+        cols["storage_class"].append(strings.id(row.storage_class))
+        cols["usagetype"].append(strings.id(row.usagetype))
+        cols["unit"].append(strings.id(row.unit))
+        cols["dim"].append(strings.id(json.dumps(row.price_dimension, separators=(",", ":"))))
+        cols["attrs"].append(set_no)
+        begin.append(row.begin_gb)
+        end.append(row.end_gb)
+        for currency, value in row.prices.items():
+            price_currency.append(strings.id(currency))
+            price_value.append(value)
+        price_start.append(len(price_currency))
+
+    header_ids = [
+        strings.id(index.service_code),
+        strings.id(index.url),
+        strings.id(index.version),
+        strings.id(index.publication_date),
+    ]
+    encoded = [s.encode("utf-8") for s in strings.items]
+    str_offsets = array("I", [0])
+    for b in encoded:
+        str_offsets.append(str_offsets[-1] + len(b))
+    blob = b"".join(encoded)
+
+    sections = [
+        _le(str_offsets),
+        blob,
+        *(_le(cols[name]) for name in _ROW_COLUMNS),
+        _le(begin),
+        _le(end),
+        _le(price_start),
+        _le(price_currency),
+        _le(price_value),
+        _le(attr_start),
+        _le(attr_key),
+        _le(attr_val),
+    ]
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(begin),
+        len(strings.items),
+        len(price_value),
+        len(attr_start) - 1,
+        len(attr_key),
+        source_mtime_ns,
+        *header_ids,
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in (header, *sections):
+                out.write(chunk)
+                out.write(b"\0" * _pad(len(chunk)))
+                size += len(chunk) + _pad(len(chunk))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return size
+
+
+def snapshot_source_mtime(path: str | Path) -> int | None:
+    """source_mtime_ns recorded in a snapshot header, or None if the file is missing or not a snapshot."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    fields = _HEADER.unpack(raw)
+    if fields[0] != MAGIC or fields[1] != FORMAT_VERSION:
+        return None
+    return fields[7]
+
+
+class _Reader:
+    """Sequential section reader over the file contents; numeric sections are read as typed views."""
+
+    def __init__(self, view: memoryview, offset: int):
+        self._view = view
+        self._pos = offset
+
+    def _take(self, nbytes: int) -> memoryview:
+        start, self._pos = self._pos, self._pos + nbytes + _pad(nbytes)
+        if start + nbytes > len(self._view):
+            raise SnapshotError("Snapshot is truncated")
+        return self._view[start:start + nbytes]
+
+    def numbers(self, typecode: str, count: int) -> list[Any]:
+        part = self._take(count * array(typecode).itemsize)
+        if sys.byteorder == "little":
+            with part.cast(typecode) as typed:
+                values = typed.tolist()
+        else:
+            a = array(typecode, part.tobytes())
+            a.byteswap()
+            values = a.tolist()
+        part.release()
+        return values
+
+    def raw(self, nbytes: int) -> bytes:
+        part = self._take(nbytes)
+        data = part.tobytes()
+        part.release()
+        return data
+
+
+def load_snapshot(path: str | Path) -> PricingIndex:
+    """Decode a snapshot written by write_snapshot into a new PricingIndex. Raises SnapshotError if it
+    is unusable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise SnapshotError(str(e)) from e
+    with memoryview(data) as view:
+        return _decode(view)
+
+
+def _decode(view: memoryview) -> PricingIndex:
+    if len(view) < _HEADER.size:
+        raise SnapshotError("Snapshot is truncated")
+    magic, version, n_rows, n_strings, n_prices, n_sets, n_pairs, _mtime, *header_ids = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise SnapshotError("Not a pricing snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    r = _Reader(view, _HEADER.size + _pad(_HEADER.size))
+    str_offsets = r.numbers("I", n_strings + 1)
+    blob = r.raw(str_offsets[-1])
+    try:
+        strings = [blob[str_offsets[i]:str_offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+        cols = {name: r.numbers("I", n_rows) for name in _ROW_COLUMNS}
+        begin = r.numbers("d", n_rows)
+        end = r.numbers("d", n_rows)
+        price_start = r.numbers("I", n_rows + 1)
+        price_currency = r.numbers("I", n_prices)
+        price_value = r.numbers("d", n_prices)
+        attr_start = r.numbers("I", n_sets + 1)
+        attr_key = r.numbers("I", n_pairs)
+        attr_val = r.numbers("I", n_pairs)
+        attributes = [
+            {strings[attr_key[j]]: strings[attr_val[j]] for j in range(attr_start[i], attr_start[i + 1])}
+            for i in range(n_sets)
+        ]
+        rows = [
+            RateRow(
+                sku=strings[cols["sku"][i]],
+                location=strings[cols["location"][i]],
+                product_family=strings[cols["product_family"][i]],
+                storage_class=strings[cols["storage_class"][i]],
+                usagetype=strings[cols["usagetype"][i]],
+                unit=strings[cols["unit"][i]],
+                begin_gb=begin[i],
+                end_gb=end[i],
+                prices={
+                    strings[price_currency[j]]: price_value[j]
+                    for j in range(price_start[i], price_start[i + 1])
+                },
+                attributes=attributes[cols["attrs"][i]],
+                price_dimension=json.loads(strings[cols["dim"][i]]),
+            )
+            for i in range(n_rows)
+        ]
+        service_code, url, offer_version, publication_date = (
+            strings[i] if i >= 0 else None for i in header_ids
+        )
+    except (IndexError, UnicodeDecodeError, ValueError) as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from e
+    return PricingIndex(
+        service_code or "",
+        rows,
+        url=url,
+        version=offer_version,
+        publication_date=publication_date,
+    )
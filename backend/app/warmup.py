@@ -0,0 +1,103 @@
+# warmup.py - v1.0
+# Startup cache warm-up: runs a list of pricing lookups in the background with bounded concurrency and
+# reports progress, so the first user in each region does not pay for a cold price list fetch.
+# Dependencies: none (asyncio). Port: N/A (backend internal).
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+WarmJob = tuple[str, Callable[[], Awaitable[Any]]]
+
+
+def env_list(value: str | None, default: list[str]) -> list[str]:
+    """Comma-separated env value as a list ('' or unset -> default)."""
+    items = [v.strip() for v in (value or "").split(",") if v.strip()]
+    return items or default
+
+
+class CacheWarmer:
+    """
+    Runs (label, job) pairs once in a background task. A job fails if it raises or returns a dict with
+    "error"; failures are counted, not retried (the normal request path still resolves on demand).
+    """
+
+    def __init__(self, jobs: list[WarmJob], concurrency: int = 8):
+        self._jobs = jobs
+        self._concurrency = max(1, concurrency)
+        self._task: asyncio.Task[None] | None = None
+        self._state = "idle"  # idle | running | done | cancelled
+        self._done = 0
+        self._failed = 0
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self._state == "done"
+
+    def start(self) -> None:
+        """Start the warm-up on the running event loop (no-op if already started)."""
+        if self._task is None:
+            self._state = "running"
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel an unfinished warm-up and wait for it (app shutdown)."""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._state = "cancelled"
+
+    async def wait(self) -> None:
+        """Wait until the warm-up finishes (tests, scripts)."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def run_one(label: str, job: Callable[[], Awaitable[Any]]) -> None:
+            async with semaphore:
+                try:
+                    result = await job()
+                    failed = isinstance(result, dict) and bool(result.get("error"))
+                except Exception:
+                    logger.exception("Warm-up of %s failed", label)
+                    failed = True
+                self._done += 1
+                if failed:
+                    self._failed += 1
+                    logger.info("Warm-up of %s returned no price", label)
+
+        await asyncio.gather(*(run_one(label, job) for label, job in self._jobs))
+        self._state = "done"
+        self._finished_at = time.monotonic()
+        logger.info(
+            "Pricing cache warm-up finished: %d jobs, %d failed, %.1fs",
+            self._done,
+            self._failed,
+            self._finished_at - (self._started_at or self._finished_at),
+        )
+
+    def progress(self) -> dict[str, Any]:
+        """State and counters for /health."""
+        end = self._finished_at or time.monotonic()
+        return {
+            "state": self._state,
+            "total": len(self._jobs),
+            "done": self._done,
+            "failed": self._failed,
+            "elapsed_seconds": round(end - self._started_at, 3) if self._started_at else None,
+        }
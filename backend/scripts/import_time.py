@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# import_time.py - v1.0
+# Startup benchmark: imports app.main in a fresh interpreter with `python -X importtime`, prints the slowest
+# modules and fails (exit 1) when the import takes longer than the budget or pulls in a dependency that
+# must load on first use only (boto3, botocore, anthropic, yaml, numpy, httpx).
+# Deps: none (stdlib). Run from backend/: python scripts/import_time.py [--budget-ms N] [--top N]. Port: N/A.
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Budget for the cumulative import time of app.main: about 800 ms measured, nearly all of it FastAPI /
+# pydantic, plus headroom for a slower machine. Raise it per run with --budget-ms or the env variable.
+DEFAULT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+# Imported on first use (GetProducts fallback, first chat turn, service mapping, first grid request, first
+# price list download), never by app.main.
+LAZY_MODULES = ("boto3", "botocore", "anthropic", "yaml", "numpy", "httpx")
+
+
+def measure(module: str = "app.main") -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from `python -X importtime -c 'import module'`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def eager_modules(module: str = "app.main", lazy: tuple[str, ...] = LAZY_MODULES) -> list[str]:
+    """The lazy modules found in sys.modules right after `import module` in a fresh interpreter."""
+    code = f"import sys, {module}; print(' '.join(m for m in {lazy!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=False
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return proc.stdout.split()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure and budget the import time of app.main.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--module", default="app.main")
+    args = parser.parse_args(argv)
+
+    times = measure(args.module)
+    total_ms = times.get(args.module, 0) / 1000
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in sorted(times.items(), key=lambda kv: kv[1], reverse=True)[1 : args.top + 1]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [m for m in LAZY_MODULES if m in times]
+    if eager:
+        print(f"FAIL: imported at startup but should load on first use: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# fake_redis.py - v1.0
+# Tiny in-process Redis stand-in speaking RESP over TCP, for testing RedisBackend without a server.
+# Supports PING, AUTH, SELECT, GET, SET [NX] [PX|EX], DEL, EXISTS, PEXPIRE, PERSIST, SCAN ... MATCH, DBSIZE,
+# FLUSHDB.
+# Dependencies: none. Port: ephemeral (127.0.0.1).
+
+from __future__ import annotations
+
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line[:1] == b"*", line
+        args = []
+        for _ in range(int(line[1:-2])):
+            n = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(n + 2)[:-2])
+        return args
+
+    def _reply(self, value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, Exception):
+            return b"-ERR %s\r\n" % str(value).encode()
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(self._reply(v) for v in value)
+
+    def handle(self) -> None:
+        server: FakeRedisServer = self.server  # type: ignore[assignment]
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            server.commands.append(args[0].upper().decode())
+            try:
+                reply = server.execute(args)
+            except Exception as e:
+                reply = e
+            self.wfile.write(self._reply(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Start with `with FakeRedisServer() as server:`; connect to server.url."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password: str | None = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.password = password
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.commands: list[str] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def __enter__(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, key: bytes) -> bytes | None:
+        item = self.data.get(key)
+        if item is not None and item[1] is not None and item[1] <= time.time():
+            del self.data[key]
+            item = None
+        return None if item is None else item[0]
+
+    def execute(self, args: list[bytes]):
+        cmd, rest = args[0].upper(), args[1:]
+        with self._lock:
+            if cmd == b"PING":
+                return "PONG"
+            if cmd == b"AUTH":
+                if rest[-1].decode() != self.password:
+                    raise ValueError("invalid password")
+                return "OK"
+            if cmd in (b"SELECT", b"FLUSHDB"):
+                if cmd == b"FLUSHDB":
+                    self.data.clear()
+                return "OK"
+            if cmd == b"GET":
+                return self._live(rest[0])
+            if cmd == b"SET":
+                key, value, opts = rest[0], rest[1], [o.upper() for o in rest[2:]]
+                expires = None
+                if b"PX" in opts:
+                    expires = time.time() + int(rest[2 + opts.index(b"PX") + 1]) / 1000
+                if b"EX" in opts:
+                    expires = time.time() + int(rest[2 + opts.index(b"EX") + 1])
+                if b"NX" in opts and self._live(key) is not None:
+                    return None
+                self.data[key] = (value, expires)
+                return "OK"
+            if cmd == b"DEL":
+                return sum(self.data.pop(k, None) is not None for k in rest)
+            if cmd == b"EXISTS":
+                return sum(self._live(k) is not None for k in rest)
+            if cmd in (b"PEXPIRE", b"PERSIST"):
+                value = self._live(rest[0])
+                if value is None or (cmd == b"PERSIST" and self.data[rest[0]][1] is None):
+                    return 0
+                expires = time.time() + int(rest[1]) / 1000 if cmd == b"PEXPIRE" else None
+                self.data[rest[0]] = (value, expires)
+                return 1
+            if cmd == b"DBSIZE":
+                return sum(self._live(k) is not None for k in list(self.data))
+            if cmd == b"SCAN":
+                pattern = rest[rest.index(b"MATCH") + 1].decode() if b"MATCH" in rest else "*"
+                keys = [k for k in list(self.data) if self._live(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+                return [b"0", keys]
+            raise ValueError(f"unknown command '{cmd.decode()}'")
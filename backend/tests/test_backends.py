@@ -0,0 +1,184 @@
+# test_backends.py - v1.0
+# Unit tests: memory / SQLite / Redis-protocol storage backends (Redis against tests.fake_redis).
+# Dependencies: backends. Port: N/A.
+
+import sqlite3
+import time
+
+import pytest
+from app.backends import BackendError, MemoryBackend, RedisBackend, SqliteBackend, make_backend
+from tests.fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+def redis_server():
+    with FakeRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "redis":
+        server = request.getfixturevalue("redis_server")
+        b = RedisBackend(server.url)
+    elif request.param == "sqlite":
+        b = SqliteBackend(tmp_path / "kv.sqlite3")
+    else:
+        b = MemoryBackend()
+    yield b
+    b.close()
+
+
+def test_get_set_delete(backend):
+    assert backend.get("a") is None
+    backend.set("a", b"\x00binary\r\n")
+    assert backend.get("a") == b"\x00binary\r\n"
+    backend.set("a", b"v2")
+    assert backend.get("a") == b"v2"
+    assert backend.delete("a") is True
+    assert backend.delete("a") is False
+
+
+def test_ttl_and_add(backend):
+    backend.set("short", b"x", ttl_seconds=0.05)
+    assert backend.add("lease", b"me", ttl_seconds=0.05) is True
+    assert backend.add("lease", b"other", ttl_seconds=0.05) is False
+    assert backend.get("lease") == b"me"
+    time.sleep(0.1)
+    assert backend.get("short") is None
+    assert backend.add("lease", b"other") is True  # expired lease can be taken
+    assert backend.get("lease") == b"other"
+
+
+def test_touch_restarts_ttl_without_rewrite(backend):
+    assert backend.touch("missing", 10) is False
+    backend.set("a", b"v", ttl_seconds=0.05)
+    assert backend.touch("a", 10) is True
+    time.sleep(0.1)
+    assert backend.get("a") == b"v"
+    assert backend.touch("a", 0.05) is True
+    time.sleep(0.1)
+    assert backend.get("a") is None and backend.touch("a", 10) is False
+    backend.set("b", b"w", ttl_seconds=0.05)
+    assert backend.touch("b") is True and backend.touch("b") is True  # no expiry, already none
+    time.sleep(0.1)
+    assert backend.get("b") == b"w"
+
+
+def test_keys_by_prefix(backend):
+    for key in ("pricing:a", "pricing:b", "session:a"):
+        backend.set(key, b"1")
+    assert sorted(backend.keys("pricing:")) == ["pricing:a", "pricing:b"]
+    assert sorted(backend.keys()) == ["pricing:a", "pricing:b", "session:a"]
+
+
+@pytest.mark.parametrize("make", [lambda p: MemoryBackend(max_entries=2), lambda p: SqliteBackend(p / "kv", max_entries=2, touch_interval_seconds=0)])
+def test_lru_eviction(tmp_path, make):
+    backend = make(tmp_path)
+    backend.set("a", b"1")
+    time.sleep(0.002)
+    backend.set("b", b"2")
+    time.sleep(0.002)
+    backend.get("a")  # b is now least recently used
+    time.sleep(0.002)
+    backend.set("c", b"3")
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1" and backend.get("c") == b"3"
+    assert backend.stats()["evictions"] == 1
+
+
+def test_sqlite_read_touches_use_time_at_most_once_per_interval(tmp_path):
+    clock = [1000.0]
+    backend = SqliteBackend(tmp_path / "kv", max_entries=2, clock=lambda: clock[0], touch_interval_seconds=60)
+    backend.set("a", b"1")
+    clock[0] += 1
+    backend.set("b", b"2")
+    clock[0] += 1
+    backend.get("a")  # touched less than 60 s ago: no write, a stays least recently used
+    backend.set("c", b"3")
+    assert backend.get("a") is None and backend.get("b") == b"2"
+    clock[0] += 60
+    backend.get("b")  # now old enough to be touched
+    clock[0] += 1
+    backend.set("d", b"4")
+    assert backend.get("c") is None and backend.get("b") == b"2"
+
+
+def test_sqlite_lock_timeout_and_errors_raise_backend_error(tmp_path):
+    backend = SqliteBackend(tmp_path / "kv", timeout_seconds=0.05)
+    other = sqlite3.connect(tmp_path / "kv", isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    try:
+        started = time.monotonic()
+        with pytest.raises(BackendError):
+            backend.set("a", b"1")
+        assert time.monotonic() - started < 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    backend.set("a", b"1")
+    backend.close()
+    (tmp_path / "kv").unlink()
+    (tmp_path / "kv").mkdir()  # the path is now a directory: the file cannot be reopened
+    with pytest.raises(BackendError):
+        backend.get("a")
+
+
+def test_sqlite_tables_are_separate_namespaces(tmp_path):
+    pricing = SqliteBackend(tmp_path / "kv", table="pricing", max_entries=1)
+    sessions = SqliteBackend(tmp_path / "kv", table="sessions")
+    pricing.set("k", b"p")
+    sessions.set("k", b"s")
+    sessions.set("k2", b"s")
+    assert pricing.get("k") == b"p" and sessions.keys() == ["k", "k2"]
+
+
+def test_redis_auth_and_errors():
+    with FakeRedisServer(password="s3cret") as server:
+        backend = RedisBackend(server.url)
+        backend.set("a", b"1")
+        assert backend.get("a") == b"1"
+        assert server.commands[0] == "AUTH"
+        with pytest.raises(BackendError, match="unknown command"):
+            backend.command("NOPE")
+        assert backend.get("a") == b"1"  # connection still usable after an error reply
+        with pytest.raises(BackendError, match="invalid password"):
+            RedisBackend(server.url.replace("s3cret", "wrong")).get("a")
+
+
+def test_redis_reconnects_and_reports_unreachable(redis_server):
+    backend = RedisBackend(redis_server.url)
+    backend.set("a", b"1")
+    backend._sock.close()  # dropped connection: the next command reconnects
+    assert backend.get("a") == b"1"
+    host, port = redis_server.server_address[:2]
+    redis_server.shutdown()
+    redis_server.server_close()
+    backend.close()
+    with pytest.raises(BackendError):
+        RedisBackend(f"redis://{host}:{port}/0", timeout_seconds=0.5).get("a")
+
+
+def test_redis_add_is_not_resent_after_lost_reply(redis_server, monkeypatch):
+    backend = RedisBackend(redis_server.url)
+    assert backend.get("warm") is None  # connected
+    real = backend._roundtrip
+
+    def reply_lost(*args):
+        real(*args)  # the server runs the command...
+        raise ConnectionError("connection reset")  # ...but its reply never arrives
+
+    monkeypatch.setattr(backend, "_roundtrip", reply_lost)
+    with pytest.raises(BackendError):
+        backend.add("lease", b"me", ttl_seconds=10)
+    monkeypatch.setattr(backend, "_roundtrip", real)
+    assert redis_server.commands.count("SET") == 1 and backend.get("lease") == b"me"
+    backend.close()
+
+
+def test_make_backend(tmp_path):
+    assert make_backend("memory").kind == "memory"
+    assert make_backend("SQLITE", path=tmp_path / "kv").kind == "sqlite"
+    assert make_backend("redis", redis_url="redis://example:6380/2").stats()["server"] == "example:6380/2"
+    with pytest.raises(ValueError):
+        make_backend("memcached")
@@ -0,0 +1,87 @@
+# test_batch_pricing.py - v1.0
+# Unit tests: POST /api/pricing/batch (ordering, dedupe, shared offer index, per-item errors, validation). No network.
+# Dependencies: main, public_pricing. Port: N/A.
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app import public_pricing as pub
+from tests.test_pricing_index import _offer
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """App with every public price list URL served from one local S3 offer file and an empty cache."""
+    path = tmp_path / "offer.json"
+    path.write_text(json.dumps(_offer()))
+
+    async def fetch(url, timeout=None, revalidate=False):
+        return path, ""
+
+    monkeypatch.setattr(pub.offer_store, "fetch", fetch)
+    monkeypatch.setattr(pub, "_indexes", {})
+    monkeypatch.setattr(pub, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(main, "pricing_cache", main.TTLCache())
+    monkeypatch.setattr(main, "failure_cache", main.TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(main, "WARMUP_ENABLED", False)
+    with TestClient(main.app) as c:
+        yield c
+
+
+def test_batch_resolves_items_in_order(client, monkeypatch):
+    compiled = []
+    real = pub.compile_offer
+    monkeypatch.setattr(pub, "compile_offer", lambda *a, **kw: compiled.append(1) or real(*a, **kw))
+    items = [
+        {"service": "s3-storage", "region": "us-east-1", "storageClass": "Standard"},
+        {"service": "s3-storage", "region": "eu-west-1", "storageClass": "Standard"},
+        {"service": "s3-storage", "region": "us-east-1", "storageClass": "Infrequent Access"},
+        {"service": "aws-backup", "region": "nowhere-1"},
+    ]
+    body = client.post("/api/pricing/batch", json={"items": items}).json()
+    results = body["results"]
+    assert body["count"] == 4 and body["errors"] == 1
+    assert [r["region"] for r in results] == ["us-east-1", "eu-west-1", "us-east-1", "nowhere-1"]
+    assert [t["rate_per_gb_month"] for t in results[0]["tiers"]] == [0.023, 0.022, 0.021]
+    assert results[1]["rate_per_gb_month"] == 0.024
+    assert results[2]["rate_per_gb_month"] == 0.0125
+    assert results[3]["error"] == "Unknown region: nowhere-1"
+    assert len(compiled) == 2  # one per regional offer file, shared by every item in that region
+
+
+def test_batch_dedupes_identical_items(client):
+    item = {"service": "s3-storage", "region": "us-east-1", "storageClass": "Infrequent Access"}
+    body = client.post("/api/pricing/batch", json={"items": [item] * 3}).json()
+    assert body["count"] == 3
+    assert all(r["rate_per_gb_month"] == 0.0125 for r in body["results"])
+    assert main.pricing_cache.stats()["misses"] == 1
+
+
+def test_batch_item_exception_becomes_error_entry(client, monkeypatch):
+    real = main._cached_s3_storage
+
+    async def flaky(region, currency, storage_class, refresh=False):
+        if region == "eu-west-1":
+            raise RuntimeError("unexpected reply")
+        return await real(region, currency, storage_class, refresh)
+
+    monkeypatch.setattr(main, "_cached_s3_storage", flaky)
+    items = [
+        {"service": "s3-storage", "region": "eu-west-1", "storageClass": "Standard"},
+        {"service": "s3-storage", "region": "us-east-1", "storageClass": "Infrequent Access"},
+    ]
+    resp = client.post("/api/pricing/batch", json={"items": items})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["errors"] == 1
+    assert body["results"][0]["error"] == "Pricing lookup failed: unexpected reply"
+    assert body["results"][1]["rate_per_gb_month"] == 0.0125
+
+
+def test_batch_validation(client):
+    assert client.post("/api/pricing/batch", json={"items": []}).status_code == 422
+    bad = {"items": [{"service": "ec2", "region": "us-east-1"}]}
+    assert client.post("/api/pricing/batch", json=bad).status_code == 422
@@ -0,0 +1,230 @@
+# test_cache.py - v1.0
+# Unit tests: TTL cache get/set/expiry and single-flight aget_or_compute on the event loop.
+# Dependencies: cache. Port: N/A.
+
+import asyncio
+import time
+
+import pytest
+from app.cache import TTLCache, singleflight
+
+
+def test_get_set_invalidate():
+    cache = TTLCache(ttl_seconds=60)
+    assert cache.get(service="s3", region="us-east-1") is None
+    cache.set({"rate": 1}, service="s3", region="us-east-1")
+    value, cached_at = cache.get(service="s3", region="us-east-1")
+    assert value == {"rate": 1} and cached_at <= time.monotonic()
+    assert cache.invalidate(service="s3", region="us-east-1") is True
+    assert cache.invalidate(service="s3", region="us-east-1") is False
+
+
+def test_expiry():
+    cache = TTLCache(ttl_seconds=0)
+    cache.set(1, k="a")
+    time.sleep(0.01)
+    assert cache.get(k="a") is None
+
+
+def test_aget_or_compute_caches():
+    cache = TTLCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "v"
+
+    assert asyncio.run(cache.aget_or_compute(compute, k="a"))[::2] == ("v", False)
+    assert asyncio.run(cache.aget_or_compute(compute, k="a"))[::2] == ("v", True)
+    assert asyncio.run(cache.aget_or_compute(compute, k="a")).stale is False
+    assert len(calls) == 1
+
+
+def test_aget_or_compute_cache_if():
+    cache = TTLCache()
+
+    async def compute():
+        return {"error": "x"}
+
+    asyncio.run(cache.aget_or_compute(compute, cache_if=lambda v: not v.get("error"), k="a"))
+    assert cache.get(k="a") is None
+
+
+def test_waiters_see_leader_exception():
+    cache = TTLCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        pending = (cache.aget_or_compute(compute, k="a") for _ in range(4))
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(e) for e in errors] == ["upstream down"] * 4 and len(calls) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.aget_or_compute(compute, k="a"))
+
+
+def test_lru_eviction_by_entries():
+    cache = TTLCache(max_entries=2)
+    cache.set(1, k="a")
+    cache.set(2, k="b")
+    cache.get(k="a")  # a is now most recently used
+    cache.set(3, k="c")
+    assert cache.get(k="b") is None
+    assert cache.get(k="a")[0] == 1 and cache.get(k="c")[0] == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    cache = TTLCache(max_bytes=10_000)
+    cache.set("x" * 4000, k="a")
+    cache.set("y" * 4000, k="b")
+    cache.set("z" * 4000, k="c")
+    stats = cache.stats()
+    assert stats["bytes"] <= 10_000 and stats["entries"] == 2
+    assert cache.get(k="a") is None
+    cache.set("w" * 20_000, k="big")  # larger than the whole cache: not stored
+    assert cache.get(k="big") is None and len(cache) == 2
+
+
+def test_sweep_and_counters():
+    cache = TTLCache(ttl_seconds=0)
+    cache.set(1, k="a")
+    cache.set(2, k="b")
+    time.sleep(0.01)
+    assert cache.sweep() == 2
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+    assert cache.get(k="a") is None
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 0 and stats["expirations"] == 2
+
+
+def test_background_sweeper():
+    cache = TTLCache(ttl_seconds=0.01)
+    cache.set(1, k="a")
+    cache.start_sweeper(interval_seconds=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(cache) == 0
+    finally:
+        cache.stop_sweeper()
+
+
+def test_stale_entry_blocks_without_allow_stale():
+    cache = TTLCache(ttl_seconds=0.01, stale_ttl_seconds=60)
+    cache.set("old", k="a")
+    time.sleep(0.02)
+    assert cache.get(k="a") is None  # plain get never serves stale
+
+    async def compute():
+        return "new"
+
+    hit = asyncio.run(cache.aget_or_compute(compute, k="a"))
+    assert hit.value == "new" and not hit.from_cache and not hit.stale
+
+
+def test_entries_dropped_after_stale_window():
+    cache = TTLCache(ttl_seconds=0, stale_ttl_seconds=0.01)
+    cache.set("old", k="a")
+    time.sleep(0.02)
+    assert cache.get_stale(k="a") is None
+
+
+def test_async_misses_coalesce():
+    cache = TTLCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute(compute, k="a") for _ in range(8)))
+
+    results = asyncio.run(run())
+    assert [r.value for r in results] == ["value"] * 8
+    assert len(calls) == 1
+    assert asyncio.run(cache.aget_or_compute(compute, k="a")).from_cache
+
+
+def test_async_stale_refreshed_in_background():
+    cache = TTLCache(ttl_seconds=0.01, stale_ttl_seconds=60)
+    cache.set("old", k="a")
+    time.sleep(0.02)
+
+    async def compute():
+        return "new"
+
+    async def run():
+        hit = await cache.aget_or_compute(compute, allow_stale=True, k="a")
+        while cache._tasks:
+            await asyncio.sleep(0.001)
+        return hit
+
+    hit = asyncio.run(run())
+    assert hit.value == "old" and hit.stale
+    assert cache.get(k="a")[0] == "new"
+    assert cache.stats()["background_refreshes"] == 1
+
+
+def test_arefresh_replaces_in_place_and_find():
+    cache = TTLCache()
+    cache.set("old", service="s3", region="us-east-1")
+    cache.set("other", service="backup", region="us-east-1")
+    assert cache.find(service="s3") == [{"service": "s3", "region": "us-east-1"}]
+
+    async def compute():
+        assert cache.get(service="s3", region="us-east-1")[0] == "old"  # readers still see old value
+        return "new"
+
+    hit = asyncio.run(cache.arefresh(compute, service="s3", region="us-east-1"))
+    assert hit.value == "new" and not hit.from_cache
+    assert cache.get(service="s3", region="us-east-1")[0] == "new"
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    flights = {}
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def run():
+        leader = asyncio.ensure_future(singleflight(flights, "k", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(singleflight(flights, "k", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # e.g. the leader's client disconnected
+        assert await waiter == "value"
+        return leader
+
+    leader = asyncio.run(run())
+    assert leader.cancelled() and calls == [1] and flights == {}
+
+
+def test_cancelled_caller_of_aget_or_compute_detaches_only_itself():
+    cache = TTLCache(ttl_seconds=60)
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(cache.aget_or_compute(compute, k="a"))
+        second = asyncio.ensure_future(cache.aget_or_compute(compute, k="a"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return (await second).value
+
+    assert asyncio.run(run()) == 42
+    assert cache.get(k="a")[0] == 42
@@ -0,0 +1,97 @@
+# test_calc_grid.py - v1.0
+# Unit tests: POST /api/calc/grid columnar layout and agreement with the scalar cost engine;
+# /api/calc budget inverse.
+# Dependencies: main, cost_engine. Port: N/A.
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import cost_engine as ce
+from app.main import app
+
+client = TestClient(app)
+TIERS = [
+    {"from_gb": 0, "to_gb": 51200, "rate_per_gb_month": 0.023},
+    {"from_gb": 51200, "to_gb": 1e40, "rate_per_gb_month": 0.022},
+]
+
+
+def test_default_preset_grid():
+    body = client.post(
+        "/api/calc/grid", json={"aws_backup_rate_per_gb_month": 0.05, "s3_tiers": TIERS}
+    ).json()
+    assert body["shape"] == [9, 1, 1] and body["rows"] == 9
+    assert body["axes"]["data_tb"] == [10, 20, 30, 40, 50, 60, 70, 80, 90]
+    cols = body["columns"]
+    assert cols["data_gb"][0] == 10240
+    assert cols["aws_backup_total_usd"][8] == pytest.approx(90 * 1024 * 0.05)
+
+
+def test_grid_matches_scalar_calc():
+    req = {
+        "data_tb": [5, 75],
+        "versioning_overhead_pct": [0, 0.5],
+        "num_copy_addons": [0, 2],
+        "aws_backup_rate_per_gb_month": 0.05,
+        "s3_tiers": TIERS,
+        "flat_addon_usd": 3,
+        "tb_binary": False,
+    }
+    body = client.post("/api/calc/grid", json=req).json()
+    cols = body["columns"]
+    assert body["rows"] == 8 and len(cols["s3_total_usd"]) == 8
+    tiers = [ce.TierBand(t["from_gb"], t["to_gb"], t["rate_per_gb_month"]) for t in TIERS]
+    i = 0
+    for tb in req["data_tb"]:
+        for overhead in req["versioning_overhead_pct"]:
+            for copies in req["num_copy_addons"]:
+                gb = ce.tb_to_gb(tb, binary=False)
+                mult = ce.copy_multiplier(copies)
+                awb = ce.aws_backup_total(gb, 0.05, mult, 3)
+                s3 = ce.s3_versioning_total(gb, overhead, tiers, mult, 3)
+                assert (cols["data_tb"][i], cols["num_copy_addons"][i]) == (tb, copies)
+                assert cols["aws_backup_total_usd"][i] == pytest.approx(awb)
+                assert cols["s3_total_usd"][i] == pytest.approx(s3)
+                assert cols["s3_delta_pct"][i] == pytest.approx(ce.delta_pct(s3, awb))
+                i += 1
+
+
+def test_missing_rates_give_null_columns():
+    body = client.post("/api/calc/grid", json={"data_tb": [1]}).json()
+    cols = body["columns"]
+    assert cols["aws_backup_total_usd"] is None and cols["s3_total_usd"] is None
+    assert cols["s3_delta_usd"] is None and cols["versioned_gb"] == [1280.0]
+
+
+def test_grid_limits():
+    too_big = {"data_tb_range": {"start": 0, "stop": 1e9, "step": 1}}
+    assert client.post("/api/calc/grid", json=too_big).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "tb_range", [{"start": 0, "stop": 90, "step": 1e-320}, {"start": 0, "stop": 1e300, "step": 1e-300}]
+)
+def test_grid_range_with_overflowing_step_count_is_rejected(tb_range):
+    assert client.post("/api/calc/grid", json={"data_tb_range": tb_range}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        {"data_tb": [1, -5]},
+        {"data_tb": [1], "num_copy_addons": [-1]},
+        {"data_tb": [1], "versioning_overhead_pct": [0.5, 2.5]},
+        {"data_tb": [1], "versioning_overhead_pct": []},
+    ],
+)
+def test_grid_axis_values_validated_by_model(bad):
+    assert client.post("/api/calc/grid", json=bad).status_code == 422
+
+
+def test_calc_budget_inverse():
+    body = client.post(
+        "/api/calc",
+        json={"data_tb": 1, "aws_backup_rate_per_gb_month": 0.05, "s3_tiers": TIERS, "budget_usd": 100},
+    ).json()
+    assert body["budget"]["aws_backup_gb"] == pytest.approx(2000)
+    assert body["budget"]["s3_versioning_gb"] == pytest.approx(100 / 0.023 / 1.25)
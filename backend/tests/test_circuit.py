@@ -0,0 +1,121 @@
+# test_circuit.py - v1.0
+# Unit tests: circuit breaker states, Pricing API fallback failing fast while open, and the short-TTL
+# negative cache for failed pricing lookups.
+# Dependencies: circuit, pricing_resolver, main. Port: N/A.
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app import pricing_resolver as resolver
+from app.circuit import CircuitBreaker
+
+
+def _breaker(threshold=2, reset=30):
+    clock = [1000.0]
+    breaker = CircuitBreaker("test", failure_threshold=threshold, reset_seconds=reset)
+    breaker._now = lambda: clock[0]
+    return breaker, clock
+
+
+def test_opens_after_threshold_and_half_opens_after_reset():
+    breaker, clock = _breaker()
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.retry_in() == 30
+    clock[0] += 30
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    status = breaker.status()
+    assert status["trips"] == 1 and status["rejected"] == 2 and status["consecutive_failures"] == 0
+
+
+def test_failed_trial_reopens_and_lost_trial_is_replaced():
+    breaker, clock = _breaker(threshold=1)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()  # trial that never reports back...
+    clock[0] += 30
+    assert breaker.allow()  # ...is replaced after another reset period
+
+
+def test_success_resets_consecutive_failures():
+    breaker, _ = _breaker(threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+class _FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get_paginator(self, _name):
+        self.calls += 1
+        raise RuntimeError("endpoint unreachable")
+
+
+def test_pricing_api_fails_fast_while_open(monkeypatch):
+    monkeypatch.setattr(resolver, "pricing_api_circuit", CircuitBreaker("pricing-api", failure_threshold=2))
+    public_failure = resolver.PricingResult(error="Public price list (S3) unavailable. timed out")
+    client = _FailingClient()
+    for _ in range(4):
+        result = resolver._resolve_s3_storage_api("US East (N. Virginia)", "Standard", "USD", client, public_failure)
+        assert result.error
+    assert client.calls == 2
+    assert result.error == public_failure.error
+    assert resolver.pricing_api_circuit.status()["rejected"] == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "pricing_cache", main.TTLCache())
+    monkeypatch.setattr(main, "failure_cache", main.TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(main, "WARMUP_ENABLED", False)
+    calls = []
+
+    async def resolve(region_code, storage_class, currency):
+        calls.append(region_code)
+        if region_code == "eu-west-1":
+            return resolver.PricingResult(rate_per_gb_month=0.024)
+        return resolver.PricingResult(error="Public price list (S3) unavailable. timed out")
+
+    monkeypatch.setattr(main, "resolve_s3_storage", resolve)
+    with TestClient(main.app) as c:
+        yield c, calls
+
+
+def test_failures_are_cached_briefly_per_key(client):
+    c, calls = client
+    for _ in range(3):
+        assert c.get("/api/pricing/s3-storage", params={"region": "us-east-1"}).json()["error"]
+    assert calls == ["us-east-1"]
+    assert c.get("/api/pricing/s3-storage", params={"region": "eu-west-1"}).json()["rate_per_gb_month"] == 0.024
+    c.get("/api/pricing/s3-storage", params={"region": "us-east-1", "refresh": True})
+    assert calls == ["us-east-1", "eu-west-1", "us-east-1"]
+    assert len(main.failure_cache) == 1
+
+
+def test_recompute_after_reingest_drops_failures(client):
+    c, calls = client
+    c.get("/api/pricing/s3-storage", params={"region": "us-east-1"})
+    asyncio.run(main._recompute_cached_pricing("AmazonS3"))
+    assert len(main.failure_cache) == 0
+
+
+def test_health_reports_circuits(client):
+    c, _ = client
+    health = c.get("/health").json()
+    assert [b["name"] for b in health["circuits"]] == ["price-list", "pricing-api"]
+    assert "entries" in health["negative_cache"]
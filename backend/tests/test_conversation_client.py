@@ -0,0 +1,148 @@
+# test_conversation_client.py - v1.0
+# Unit tests: shared Anthropic client (lazy, reused across turns / threads, configured from env) and
+# streamed chat turns over SSE. No network.
+# Dependencies: conversation.client, conversation.engine, main. Port: N/A.
+
+import json
+import threading
+
+import pytest
+from app import main
+from app.backends import MemoryBackend
+from app.conversation import client as conv_client
+from app.conversation import state
+from app.conversation.engine import chat_turn, chat_turn_stream
+from app.conversation.state import Session
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    conv_client.close_client()
+    yield
+    conv_client.close_client()
+
+
+def test_missing_key_is_reported_as_reply(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    assert conv_client.preload_client() is False
+    session = Session(session_id="s", mode="balanced")
+    result = chat_turn(session, "hello")
+    assert "ANTHROPIC_API_KEY is missing" in result["reply"]
+    assert [m.role for m in session.messages] == ["user", "assistant"]
+
+
+def test_client_is_shared_across_threads(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(conv_client.get_client())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 1
+    client = clients[0]
+    assert client.max_retries == conv_client.ANTHROPIC_MAX_RETRIES
+    assert client.timeout.connect == conv_client.ANTHROPIC_CONNECT_TIMEOUT_SECONDS
+    assert client.timeout.read == conv_client.ANTHROPIC_TIMEOUT_SECONDS
+
+
+def test_key_change_builds_new_client(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-one")
+    first = conv_client.get_client()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-two")
+    second = conv_client.get_client()
+    assert second is not first and second.api_key == "sk-two"
+    assert first.is_closed() and not second.is_closed()
+
+
+def test_turns_reuse_the_client(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    shared = conv_client.get_client()
+    seen = []
+
+    class Reply:
+        content = [type("Block", (), {"text": "hi there"})()]
+
+    def create(**kwargs):
+        seen.append(kwargs["messages"])
+        return Reply()
+
+    monkeypatch.setattr(shared.messages, "create", create)
+    session = Session(session_id="s", mode="balanced")
+    assert chat_turn(session, "one")["reply"] == "hi there"
+    assert chat_turn(session, "two")["reply"] == "hi there"
+    assert len(seen) == 2 and len(seen[1]) == 3  # history + new turn, same client both times
+
+
+class _FakeStream:
+    def __init__(self, chunks, fail_after=None):
+        self._chunks = chunks
+        self._fail_after = fail_after
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    @property
+    def text_stream(self):
+        for i, chunk in enumerate(self._chunks):
+            if i == self._fail_after:
+                raise RuntimeError("overloaded")
+            yield chunk
+
+
+def test_stream_yields_deltas_then_records_turn(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(conv_client.get_client().messages, "stream", lambda **kw: _FakeStream(["Hel", "lo", "!"]))
+    session = Session(session_id="s", mode="balanced")
+    events = list(chat_turn_stream(session, "hi"))
+    assert [e["text"] for e in events[:-1]] == ["Hel", "lo", "!"]
+    assert events[-1] == {"type": "done", "reply": "Hello!", "session_id": "s", "recommendation": None}
+    assert [(m.role, m.content) for m in session.messages] == [("user", "hi"), ("assistant", "Hello!")]
+
+
+def test_stream_error_replaces_partial_reply(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(
+        conv_client.get_client().messages, "stream", lambda **kw: _FakeStream(["par", "tial"], fail_after=1)
+    )
+    session = Session(session_id="s", mode="balanced")
+    events = list(chat_turn_stream(session, "hi"))
+    assert events[0] == {"type": "delta", "text": "par"}
+    assert events[-1]["reply"] == "Sorry, the assistant encountered an error: overloaded"
+    assert session.messages[-1].content == events[-1]["reply"]
+
+
+def test_abandoned_stream_is_not_recorded(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    stream = _FakeStream(["a", "b", "c"])
+    monkeypatch.setattr(conv_client.get_client().messages, "stream", lambda **kw: stream)
+    session = Session(session_id="s", mode="balanced")
+    events = chat_turn_stream(session, "hi")
+    next(events)
+    events.close()  # client disconnected
+    assert stream.closed and session.messages == []
+
+
+def test_stream_endpoint_sends_sse_and_saves_session(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(conv_client.get_client().messages, "stream", lambda **kw: _FakeStream(["4 TB ", "costs $92."]))
+    monkeypatch.setattr(state, "_sessions", state.SessionStore(MemoryBackend()))
+    monkeypatch.setattr(main, "WARMUP_ENABLED", False)
+    with TestClient(main.app) as client:
+        res = client.post("/api/conversation/stream", json={"message": "4 TB in S3?"})
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in res.text.strip().split("\n\n")
+        ]
+        assert [name for name, _ in events] == ["start", "delta", "delta", "done"]
+        sid = events[0][1]["session_id"]
+        assert events[-1][1]["reply"] == "4 TB costs $92." and events[-1][1]["session_id"] == sid
+        assert client.get(f"/api/session/{sid}").json()["message_count"] == 2
+        assert client.post("/api/conversation/stream", json={"message": " "}).status_code == 400
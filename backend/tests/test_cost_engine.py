@@ -1,5 +1,5 @@
 # test_cost_engine.py - v1.0
-# Unit tests: TB/GB conversion, versioning overhead, copy multiplier, tier math.
+# Unit tests: TB/GB conversion, versioning overhead, copy multiplier, tier math, compiled schedules.
 # Dependencies: cost_engine. Port: N/A.
 
 import pytest
@@ -7,15 +7,19 @@ from app.cost_engine import (
     TB_CONVERSION_BINARY,
     TB_CONVERSION_DECIMAL,
     TierBand,
+    aws_backup_gb_for_total,
     aws_backup_total,
+    compile_tiers,
     copy_multiplier,
     cost_from_flat_rate,
     cost_from_tiers,
     delta_pct,
     delta_usd,
     gb_to_tb,
+    s3_versioning_gb_for_total,
     s3_versioning_total,
     tb_to_gb,
+    tier_key,
     versioned_gb,
 )
 
@@ -100,3 +104,43 @@ def test_delta_pct():
     assert delta_pct(100, 80) == 25.0
     assert delta_pct(80, 100) == -20.0
     assert delta_pct(50, 0) == 0.0
+
+
+S3_TIERS = [
+    TierBand(0, 50 * 1024, 0.023),
+    TierBand(50 * 1024, 500 * 1024, 0.022),
+    TierBand(500 * 1024, float("inf"), 0.021),
+]
+
+
+def test_tier_schedule_matches_linear_walk():
+    schedule = compile_tiers(tier_key(S3_TIERS))
+    for gb in (0, 1, 51_199, 51_200, 51_201, 300_000, 512_000, 2_000_000):
+        assert schedule.cost(gb) == pytest.approx(cost_from_tiers(gb, S3_TIERS))
+    assert cost_from_tiers(60 * 1024, schedule) == pytest.approx(cost_from_tiers(60 * 1024, S3_TIERS))
+    finite = compile_tiers(tier_key([TierBand(0, 100, 0.5)]))
+    assert finite.cost(1000) == pytest.approx(cost_from_tiers(1000, [TierBand(0, 100, 0.5)]))
+
+
+def test_tier_schedule_compiled_once():
+    as_dicts = [{"from_gb": t.from_gb, "to_gb": t.to_gb, "rate_per_gb_month": t.rate_per_gb_month} for t in S3_TIERS]
+    assert compile_tiers(tier_key(reversed(S3_TIERS))) is compile_tiers(tier_key(as_dicts))
+
+
+def test_tier_schedule_inverse():
+    schedule = compile_tiers(tier_key(S3_TIERS))
+    for gb in (0, 10, 51_200, 100_000, 3_000_000):
+        assert schedule.gb_for_cost(schedule.cost(gb)) == pytest.approx(gb)
+    assert schedule.gb_for_cost(-1) == 0.0
+    free_after = compile_tiers(tier_key([TierBand(0, 100, 0.5)]))
+    assert free_after.gb_for_cost(50) == float("inf")
+    assert free_after.gb_for_cost(25) == pytest.approx(50)
+
+
+def test_gb_for_total_inverts_totals():
+    schedule = compile_tiers(tier_key(S3_TIERS))
+    total = s3_versioning_total(80_000, 0.25, schedule, 2.0, 5)
+    assert s3_versioning_gb_for_total(total, 0.25, schedule, 2.0, 5) == pytest.approx(80_000)
+    total = aws_backup_total(1024, 0.05, 2.0, 10)
+    assert aws_backup_gb_for_total(total, 0.05, 2.0, 10) == pytest.approx(1024)
+    assert aws_backup_gb_for_total(5, 0.05, 1.0, 10) == 0.0
@@ -0,0 +1,59 @@
+# test_cost_vector.py - v1.0
+# Unit tests: array cost formulas agree with the scalar cost_engine and broadcast over scenarios.
+# Dependencies: cost_vector, cost_engine, numpy. Port: N/A.
+
+import numpy as np
+import pytest
+from app import cost_engine as ce
+from app import cost_vector as cv
+from app.cost_engine import TierBand
+
+S3_TIERS = [
+    TierBand(0, 50 * 1024, 0.023),
+    TierBand(50 * 1024, 500 * 1024, 0.022),
+    TierBand(500 * 1024, float("inf"), 0.021),
+]
+
+
+@pytest.mark.parametrize(
+    "tiers",
+    [
+        S3_TIERS,
+        [TierBand(0, float("inf"), 0.0125)],
+        [TierBand(0, 100, 0.5), TierBand(100, 300, 0.25)],  # no open-ended band
+        [TierBand(0, 100, 0.5), TierBand(100, float("inf"), 0.25), TierBand(1e9, float("inf"), 9.0)],
+        [],
+    ],
+)
+def test_cost_from_tiers_matches_scalar(tiers):
+    gb = np.array([-5, 0, 1, 99.5, 100, 250, 300, 1000, 51_200, 600_000, 1e7])
+    expected = [ce.cost_from_tiers(float(x), tiers) for x in gb]
+    assert cv.cost_from_tiers(gb, tiers) == pytest.approx(expected)
+
+
+def test_totals_match_scalar_and_broadcast():
+    base_gb = np.linspace(0, 2_000_000, 101)[:, None]  # sizes down, overheads across
+    overhead = np.array([0.0, 0.25, 1.0])[None, :]
+    table = cv.TierTable(S3_TIERS)
+    s3 = cv.s3_versioning_total(base_gb, overhead, table, copy_mult=2.0, flat_addon_usd=5.0)
+    assert s3.shape == (101, 3)
+    for i in (0, 17, 100):
+        for j in range(3):
+            scalar = ce.s3_versioning_total(float(base_gb[i, 0]), float(overhead[0, j]), S3_TIERS, 2.0, 5.0)
+            assert s3[i, j] == pytest.approx(scalar)
+    awb = cv.aws_backup_total(base_gb, 0.05, cv.copy_multiplier(np.array([0, 1, -2])), 10.0)
+    assert awb.shape == (101, 3)
+    assert awb[100, 1] == pytest.approx(ce.aws_backup_total(2_000_000, 0.05, 2.0, 10.0))
+    assert awb[100, 2] == pytest.approx(ce.aws_backup_total(2_000_000, 0.05, 1.0, 10.0))
+
+
+def test_deltas():
+    cost = np.array([100.0, 80.0, 50.0])
+    ref = np.array([80.0, 100.0, 0.0])
+    assert cv.delta_usd(cost, ref).tolist() == [20.0, -20.0, 50.0]
+    assert cv.delta_pct(cost, ref).tolist() == [25.0, -20.0, 0.0]
+
+
+def test_scalar_inputs():
+    assert float(cv.versioned_gb(1000, 0.25)) == 1250.0
+    assert float(cv.cost_from_tiers(1000, [TierBand(0, float("inf"), 0.023)])) == pytest.approx(23.0)
@@ -0,0 +1,21 @@
+# test_import_time.py - v1.0
+# Startup imports: app.main leaves boto3 / botocore / anthropic / yaml / numpy / httpx to first use (checked
+# in sys.modules of a fresh interpreter); the import-time budget report of scripts/import_time.py.
+# Dependencies: scripts.import_time. Port: N/A.
+
+from scripts import import_time
+
+
+def test_app_main_leaves_heavy_modules_to_first_use():
+    assert import_time.eager_modules("app.main") == []
+    assert import_time.eager_modules("app.cost_vector", ("numpy",)) == ["numpy"]  # the check sees imports
+
+
+def test_report_fails_over_budget_or_on_eager_import(monkeypatch, capsys):
+    monkeypatch.setattr(import_time, "measure", lambda module: {module: 900_000, "fastapi": 700_000})
+    assert import_time.main(["--budget-ms", "1000"]) == 0
+    assert import_time.main(["--budget-ms", "500"]) == 1
+    assert "over the 500 ms budget" in capsys.readouterr().out
+    monkeypatch.setattr(import_time, "measure", lambda module: {module: 900_000, "boto3": 300_000})
+    assert import_time.main(["--budget-ms", "1000"]) == 1
+    assert "should load on first use: boto3" in capsys.readouterr().out
@@ -0,0 +1,102 @@
+# test_offer_catalog.py - v1.0
+# Unit tests: offer catalog memoization, URL resolution, failed reloads.
+# Dependencies: offer_catalog. Port: N/A.
+
+import asyncio
+
+from app.offer_catalog import OfferCatalog
+
+BASE = "https://pricing.example.com"
+INDEX = {
+    "publicationDate": "2024-01-01T00:00:00Z",
+    "offers": {
+        "AmazonS3": {
+            "currentVersionUrl": "/offers/v1.0/aws/AmazonS3/current/index.json",
+            "currentRegionIndexUrl": "/offers/v1.0/aws/AmazonS3/current/region_index.json",
+        },
+        "AWSBackup": {"currentVersionUrl": "AWSBackup/current/index.json"},
+    },
+}
+
+
+def _catalog(responses, ttl=3600):
+    calls = []
+
+    async def fetch(url, revalidate=False):
+        calls.append(url)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return OfferCatalog(f"{BASE}/offers/v1.0/aws/index.json", BASE, fetch, ttl_seconds=ttl), calls
+
+
+def test_index_fetched_once_per_ttl():
+    catalog, calls = _catalog([(INDEX, "")])
+    assert asyncio.run(catalog.refresh()) == ""
+    assert asyncio.run(catalog.refresh()) == ""
+    assert catalog.find_service("backup") == "AWSBackup"
+    assert catalog.current_version_url("AmazonS3") == f"{BASE}/offers/v1.0/aws/AmazonS3/current/index.json"
+    assert catalog.current_region_index_url("AmazonS3").endswith("/AmazonS3/current/region_index.json")
+    assert catalog.current_version_url("AWSBackup") == f"{BASE}/offers/v1.0/aws/AWSBackup/current/index.json"
+    assert catalog.publication_date == "2024-01-01T00:00:00Z"
+    assert sorted(catalog.service_codes()) == ["AWSBackup", "AmazonS3"]
+    assert len(calls) == 1
+
+
+def test_unknown_service():
+    catalog, _ = _catalog([(INDEX, "")])
+    asyncio.run(catalog.refresh())
+    assert catalog.current_version_url("AmazonEC2") is None
+    assert catalog.current_region_index_url("AWSBackup") is None
+
+
+def test_failed_reload_keeps_previous_offers():
+    catalog, calls = _catalog([(INDEX, ""), (None, "HTTP 503: Service Unavailable")], ttl=0)
+    asyncio.run(catalog.refresh())
+    assert catalog.find_service("s3") == "AmazonS3"
+    assert asyncio.run(catalog.refresh(force=True)) == "HTTP 503: Service Unavailable"
+    assert catalog.error
+    assert catalog.find_service("s3") == "AmazonS3"
+    assert len(calls) >= 2
+
+
+def test_failure_without_data():
+    catalog, _ = _catalog([(None, "timed out")])
+    assert asyncio.run(catalog.refresh()) == "timed out"
+    assert catalog.service_codes() == []
+    assert catalog.error == "timed out"
+
+
+def test_concurrent_refreshes_share_one_fetch():
+    catalog, calls = _catalog([(INDEX, "")])
+
+    async def refresh_many():
+        return await asyncio.gather(*(catalog.refresh() for _ in range(5)))
+
+    assert asyncio.run(refresh_many()) == [""] * 5
+    assert len(calls) == 1
+
+
+def test_region_index_loaded_once_and_resolved():
+    region_index = {"regions": {
+        "us-east-1": {"regionCode": "us-east-1", "currentVersionUrl": "/offers/v1.0/aws/AmazonS3/20240101000000/us-east-1/index.json"},
+        "eu-west-1": {"regionCode": "eu-west-1", "currentVersionUrl": "/offers/v1.0/aws/AmazonS3/20240101000000/eu-west-1/index.json"},
+    }}
+    calls = []
+
+    async def fetch(url, revalidate=False):
+        calls.append((url.rsplit("/", 1)[-1], revalidate))
+        return (region_index if url.endswith("region_index.json") else INDEX), ""
+
+    catalog = OfferCatalog(f"{BASE}/offers/v1.0/aws/index.json", BASE, fetch)
+
+    async def run():
+        await catalog.refresh()
+        return await asyncio.gather(*(catalog.region_urls("AmazonS3") for _ in range(3)))
+
+    regions = asyncio.run(run())[0]
+    assert regions["eu-west-1"] == f"{BASE}/offers/v1.0/aws/AmazonS3/20240101000000/eu-west-1/index.json"
+    assert asyncio.run(catalog.region_urls("AWSBackup")) is None  # no currentRegionIndexUrl
+    assert calls == [("index.json", False), ("region_index.json", False)]
+    asyncio.run(catalog.region_urls("AmazonS3", force=True))
+    assert calls[-1] == ("region_index.json", True)
+    assert catalog.cached_region_urls("AmazonS3") == regions
@@ -0,0 +1,136 @@
+# test_offer_store.py - v1.0
+# Unit tests: on-disk offer store (download once, 304 revalidation, stale copy on origin failure,
+# concurrent fetches share one request).
+# Dependencies: offer_store. Port: ephemeral (local test HTTP server).
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from app.circuit import CircuitBreaker
+from app.offer_store import OfferFileStore
+
+BODY = b'{"products": {}, "terms": {"OnDemand": {}}}'
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests: list[tuple[str, str | None]] = []
+
+    def do_GET(self):
+        inm = self.headers.get("If-None-Match")
+        _Handler.requests.append((self.path, inm))
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if inm == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_then_conditional_revalidate(server, tmp_path):
+    store = OfferFileStore(tmp_path, max_age_seconds=0)
+    path, err = asyncio.run(store.fetch(f"{server}/offer.json"))
+    assert err == "" and path.read_bytes() == BODY
+    path2, err = asyncio.run(store.fetch(f"{server}/offer.json"))
+    assert err == "" and path2 == path and path2.read_bytes() == BODY
+    assert _Handler.requests == [("/offer.json", None), ("/offer.json", ETAG)]
+    assert store.metadata(f"{server}/offer.json")["etag"] == ETAG
+
+
+def test_fresh_copy_served_without_request(server, tmp_path):
+    store = OfferFileStore(tmp_path, max_age_seconds=3600)
+    asyncio.run(store.fetch(f"{server}/offer.json"))
+    asyncio.run(store.fetch(f"{server}/offer.json"))
+    assert len(_Handler.requests) == 1
+
+
+def test_survives_restart(server, tmp_path):
+    asyncio.run(OfferFileStore(tmp_path, max_age_seconds=0).fetch(f"{server}/offer.json"))
+    path, err = asyncio.run(OfferFileStore(tmp_path, max_age_seconds=0).fetch(f"{server}/offer.json"))
+    assert err == "" and path.read_bytes() == BODY
+    assert _Handler.requests[-1] == ("/offer.json", ETAG)
+
+
+def test_error_without_copy(server, tmp_path):
+    path, err = asyncio.run(OfferFileStore(tmp_path).fetch(f"{server}/missing"))
+    assert path is None and err.startswith("HTTP 404")
+
+
+def test_discard_and_stored_copy_when_origin_down(tmp_path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/offer.json"
+    store = OfferFileStore(tmp_path, max_age_seconds=0)
+    asyncio.run(store.fetch(url))
+    httpd.shutdown()
+    httpd.server_close()
+    path, err = asyncio.run(store.fetch(url, timeout=2))
+    assert err == "" and path.read_bytes() == BODY
+    store.discard(url)
+    assert store.metadata(url) == {}
+    path, err = asyncio.run(store.fetch(url, timeout=2))
+    assert path is None and err
+
+
+def test_concurrent_fetches_share_one_request(server, tmp_path):
+    store = OfferFileStore(tmp_path)
+
+    async def fetch_many():
+        return await asyncio.gather(*(store.fetch(f"{server}/offer.json") for _ in range(5)))
+
+    results = asyncio.run(fetch_many())
+    assert all(err == "" and path.read_bytes() == BODY for path, err in results)
+    assert len(_Handler.requests) == 1
+
+
+def test_revalidate_checks_origin_even_when_fresh(server, tmp_path):
+    store = OfferFileStore(tmp_path, max_age_seconds=3600)
+    asyncio.run(store.fetch(f"{server}/offer.json"))
+    path, err = asyncio.run(store.fetch(f"{server}/offer.json", revalidate=True))
+    assert err == "" and path.read_bytes() == BODY
+    assert _Handler.requests == [("/offer.json", None), ("/offer.json", ETAG)]
+
+
+def test_open_circuit_serves_stored_copy_without_request(server, tmp_path):
+    store = OfferFileStore(tmp_path, max_age_seconds=0, circuit=CircuitBreaker("test", failure_threshold=1))
+    asyncio.run(store.fetch(f"{server}/offer.json"))
+    store.circuit.record_failure()
+    path, err = asyncio.run(store.fetch(f"{server}/offer.json"))
+    assert err == "" and path.read_bytes() == BODY
+    path, err = asyncio.run(store.fetch(f"{server}/other.json"))
+    assert path is None and "circuit open" in err
+    assert len(_Handler.requests) == 1
+
+
+def test_unreachable_origin_opens_circuit(tmp_path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/offer.json"
+    httpd.server_close()
+    store = OfferFileStore(tmp_path, circuit=CircuitBreaker("test", failure_threshold=2))
+    for _ in range(2):
+        asyncio.run(store.fetch(url, timeout=2))
+    assert store.circuit.state == "open"
@@ -0,0 +1,80 @@
+# test_offer_stream.py - v1.0
+# Unit tests: streaming offer-file parser (filtering, chunk boundaries, skipped terms).
+# Dependencies: offer_stream. Port: N/A.
+
+import io
+import json
+
+import pytest
+from app.offer_stream import OfferStreamError, load_offer
+
+OFFER = {
+    "formatVersion": "v1.0",
+    "disclaimer": "This pricing list is for informational purposes only.",
+    "offerCode": "AmazonS3",
+    "version": "20240101000000",
+    "publicationDate": "2024-01-01T00:00:00Z",
+    "products": {
+        "SKU1": {
+            "sku": "SKU1",
+            "productFamily": "Storage",
+            "attributes": {"location": "US East (N. Virginia)", "storageClass": "General Purpose"},
+        },
+        "SKU2": {
+            "sku": "SKU2",
+            "productFamily": "Storage",
+            "attributes": {"location": "EU (Ireland)", "storageClass": "General Purpose"},
+        },
+        "SKU3": {
+            "sku": "SKU3",
+            "productFamily": "Data Transfer",
+            "attributes": {"location": "US East (N. Virginia)", "note": "escaped \"quote\" and {brace}"},
+        },
+    },
+    "terms": {
+        "OnDemand": {
+            "SKU1": {"SKU1.T": {"priceDimensions": {"SKU1.T.D": {"unit": "GB-Mo", "pricePerUnit": {"USD": "0.0230000000"}}}}},
+            "SKU2": {"SKU2.T": {"priceDimensions": {"SKU2.T.D": {"unit": "GB-Mo", "pricePerUnit": {"USD": "0.0240000000"}}}}},
+            "SKU3": {"SKU3.T": {"priceDimensions": {"SKU3.T.D": {"unit": "GB", "pricePerUnit": {"USD": "0.09"}}}}},
+        },
+        "Reserved": {"SKU1": {"x": [1, 2, {"nested": "]}"}]}},
+    },
+}
+
+
+def _keep_virginia(_sku, product):
+    return (product.get("attributes") or {}).get("location") == "US East (N. Virginia)"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_keeps_matching_products_and_terms(chunk_size):
+    raw = json.dumps(OFFER, indent=2).encode()
+    data = load_offer(io.BytesIO(raw), _keep_virginia, chunk_size=chunk_size)
+    assert set(data["products"]) == {"SKU1", "SKU3"}
+    assert set(data["terms"]["OnDemand"]) == {"SKU1", "SKU3"}
+    assert data["terms"]["OnDemand"]["SKU1"] == OFFER["terms"]["OnDemand"]["SKU1"]
+    assert data["products"]["SKU3"] == OFFER["products"]["SKU3"]
+    assert "Reserved" not in data["terms"]
+    assert data["offerCode"] == "AmazonS3"
+    assert data["publicationDate"] == "2024-01-01T00:00:00Z"
+    assert "disclaimer" not in data
+
+
+def test_multibyte_text_across_chunks():
+    offer = {"products": {"S": {"attributes": {"location": "South America (São Paulo)"}}}, "terms": {"OnDemand": {"S": {}}}}
+    raw = json.dumps(offer, ensure_ascii=False).encode("utf-8")
+    data = load_offer(io.BytesIO(raw), lambda sku, p: True, chunk_size=3)
+    assert data["products"]["S"]["attributes"]["location"] == "South America (São Paulo)"
+    assert data["terms"]["OnDemand"] == {"S": {}}
+
+
+def test_terms_before_products_are_pruned():
+    offer = {"terms": OFFER["terms"], "products": OFFER["products"]}
+    data = load_offer(io.BytesIO(json.dumps(offer).encode()), _keep_virginia, chunk_size=5)
+    assert set(data["terms"]["OnDemand"]) == {"SKU1", "SKU3"}
+
+
+def test_truncated_file_raises():
+    raw = json.dumps(OFFER).encode()[:-20]
+    with pytest.raises(OfferStreamError):
+        load_offer(io.BytesIO(raw), _keep_virginia, chunk_size=16)
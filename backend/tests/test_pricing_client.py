@@ -0,0 +1,60 @@
+# test_pricing_client.py - v1.0
+# Unit tests: shared boto3 Pricing client (built once, botocore config from env, reused across threads).
+# Dependencies: pricing_client, pricing_resolver. Port: N/A.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import pricing_client
+from app import pricing_resolver as resolver
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(pricing_client, "_client", None)
+    yield
+    pricing_client.close_pricing_client()
+
+
+def test_one_client_shared_across_threads():
+    with ThreadPoolExecutor(8) as pool:
+        clients = list(pool.map(lambda _: pricing_client.get_pricing_client(), range(16)))
+    assert all(c is clients[0] for c in clients)
+    assert clients[0].meta.region_name == "us-east-1"
+
+
+def test_config_from_settings(monkeypatch):
+    monkeypatch.setattr(pricing_client, "PRICING_API_MAX_POOL_CONNECTIONS", 32)
+    monkeypatch.setattr(pricing_client, "PRICING_API_RETRY_MODE", "adaptive")
+    monkeypatch.setattr(pricing_client, "PRICING_API_READ_TIMEOUT_SECONDS", 12.0)
+    config = pricing_client.get_pricing_client().meta.config
+    assert config.max_pool_connections == 32
+    assert config.retries["mode"] == "adaptive"
+    assert config.read_timeout == 12.0
+
+
+def test_close_then_rebuild():
+    first = pricing_client.get_pricing_client()
+    pricing_client.close_pricing_client()
+    assert pricing_client.get_pricing_client() is not first
+
+
+def test_fallback_uses_shared_client(monkeypatch):
+    used = []
+
+    class _Client:
+        def get_paginator(self, _name):
+            used.append(self)
+            return self
+
+        def paginate(self, **_kwargs):
+            return iter([{"PriceList": []}])
+
+    shared = _Client()
+    monkeypatch.setattr(resolver, "get_pricing_client", lambda: shared)
+    monkeypatch.setattr(resolver, "pricing_api_circuit", resolver.CircuitBreaker("pricing-api"))
+    public_failure = resolver.PricingResult(error="Public price list (S3) unavailable.")
+    for _ in range(2):
+        resolver._resolve_s3_storage_api("US East (N. Virginia)", "Standard", "USD", None, public_failure)
+    assert used == [shared, shared]
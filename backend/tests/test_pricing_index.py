@@ -0,0 +1,230 @@
+# test_pricing_index.py - v1.0
+# Unit tests: compiled pricing index and public resolvers reading from it (no network).
+# Dependencies: pricing_index, public_pricing. Port: N/A.
+
+import asyncio
+import json
+
+import pytest
+from app import public_pricing as pub
+from app.offer_catalog import OfferCatalog
+from app.pricing_index import PricingIndex, compile_offer
+
+VIRGINIA = "US East (N. Virginia)"
+IRELAND = "EU (Ireland)"
+
+
+def _dim(unit, usd, begin=None, end=None):
+    d = {"unit": unit, "pricePerUnit": {"USD": usd}}
+    if begin is not None:
+        d["beginRange"] = begin
+        d["endRange"] = end
+    return d
+
+
+def _offer():
+    products = {
+        "S3STD": {"productFamily": "Storage", "attributes": {"location": VIRGINIA, "storageClass": "General Purpose", "usagetype": "TimedStorage-ByteHrs"}},
+        "S3IA": {"productFamily": "Storage", "attributes": {"location": VIRGINIA, "storageClass": "Infrequent Access", "usagetype": "TimedStorage-SIA-ByteHrs"}},
+        "S3IE": {"productFamily": "Storage", "attributes": {"location": IRELAND, "storageClass": "General Purpose", "usagetype": "EU-TimedStorage-ByteHrs"}},
+        "XFER": {"productFamily": "Data Transfer", "attributes": {"location": VIRGINIA, "usagetype": "DataTransfer-Out-Bytes"}},
+    }
+    terms = {
+        "S3STD": {"S3STD.T": {"priceDimensions": {
+            "a": _dim("GB-Mo", "0.023", "0", "51200"),
+            "b": _dim("GB-Mo", "0.022", "51200", "512000"),
+            "c": _dim("GB-Mo", "0.021", "512000", "Inf"),
+        }}},
+        "S3IA": {"S3IA.T": {"priceDimensions": {"a": _dim("GB-Mo", "0.0125")}}},
+        "S3IE": {"S3IE.T": {"priceDimensions": {"a": _dim("GB-Mo", "0.024")}}},
+        "XFER": {"XFER.T": {"priceDimensions": {"a": _dim("GB", "0.09")}}},
+    }
+    return {"offerCode": "AmazonS3", "version": "v1", "products": products, "terms": {"OnDemand": terms}}
+
+
+def test_compile_and_lookup():
+    index = compile_offer(_offer(), "AmazonS3")
+    assert len(index) == 6
+    assert index.version == "v1"
+    assert set(index.locations()) == {VIRGINIA, IRELAND}
+    rows = index.by_storage_class(VIRGINIA, "general purpose")
+    assert [r.price("USD") for r in rows] == [0.023, 0.022, 0.021]
+    assert rows[2].end_gb == float("inf")
+    assert index.by_usagetype(VIRGINIA, "TimedStorage-ByteHrs") == rows
+    assert [r.sku for r in index.at(VIRGINIA)] == ["S3STD"] * 3 + ["S3IA", "XFER"]
+    assert index.by_storage_class(IRELAND, "Infrequent Access") == () and index.at("Nowhere") == ()
+
+
+def test_select_is_memoized():
+    index = compile_offer(_offer(), "AmazonS3", keep_unit=lambda u: u == "GB-Mo")
+    calls = []
+
+    def match(row):
+        calls.append(row.sku)
+        return row.storage_class == "Infrequent Access"
+
+    first = index.select(VIRGINIA, "ia", match)
+    second = index.select(VIRGINIA, "ia", match)
+    assert first == second and [r.sku for r in first] == ["S3IA"]
+    assert len(calls) == 4  # one pass over Virginia's GB-Mo rows only
+
+
+def test_select_memo_is_bounded_and_includes_misses():
+    index = PricingIndex("AmazonS3", list(compile_offer(_offer(), "AmazonS3")), max_selections=2)
+    calls = []
+
+    def by_class(storage_class):
+        return lambda r: calls.append(1) or r.storage_class == storage_class
+
+    assert index.select(VIRGINIA, "Bogus", by_class("Bogus")) == ()
+    scanned = len(calls)
+    assert index.select(VIRGINIA, "Bogus", by_class("Bogus")) == () and len(calls) == scanned  # memoized miss
+    for bogus in ("Bogus-1", "Bogus-2", "Bogus-3"):  # client-supplied values cannot grow the memo
+        index.select(VIRGINIA, bogus, by_class(bogus))
+    assert list(index._selections) == [(VIRGINIA, "Bogus-2"), (VIRGINIA, "Bogus-3")]
+
+
+@pytest.fixture
+def stored_offer(tmp_path, monkeypatch):
+    """Serve a local offer file for every public price list URL."""
+    path = tmp_path / "offer.json"
+    path.write_text(json.dumps(_offer()))
+
+    async def fetch(url, timeout=None, revalidate=False):
+        return path, ""
+
+    monkeypatch.setattr(pub.offer_store, "fetch", fetch)
+    monkeypatch.setattr(pub, "_indexes", {})
+    monkeypatch.setattr(pub, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    return path
+
+
+def test_resolve_s3_storage_public_tiers(stored_offer):
+    result = asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert result.error is None
+    assert result.sku == "S3STD"
+    assert [t["rate_per_gb_month"] for t in result.tiers] == [0.023, 0.022, 0.021]
+
+
+def test_resolve_s3_storage_public_flat(stored_offer):
+    result = asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard"))
+    assert result.rate_per_gb_month == 0.024
+    assert result.tiers == []
+
+
+def test_exact_storage_classes_are_keyed_lookups(stored_offer, monkeypatch):
+    asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))  # compile
+    index = pub._indexes[next(iter(pub._indexes))][1]
+    assert pub._s3_storage_rows(index, VIRGINIA, "infrequent")[0].sku == "S3IA"  # loose name: predicate
+    monkeypatch.setattr(index, "select", lambda *a: pytest.fail("predicate scan for an exact class"))
+    for storage_class in ("Standard", "Standard-IA", "Infrequent Access"):
+        assert asyncio.run(pub.resolve_s3_storage_public("us-east-1", storage_class)).error is None
+
+
+def test_index_compiled_once_per_file(stored_offer, monkeypatch):
+    compiled = []
+    real = pub.compile_offer
+    monkeypatch.setattr(pub, "compile_offer", lambda *a, **kw: compiled.append(1) or real(*a, **kw))
+
+    async def resolve_many():
+        classes = ("Standard", "Standard-IA", "Standard", "Glacier")
+        return await asyncio.gather(*(pub.resolve_s3_storage_public("us-east-1", c) for c in classes))
+
+    asyncio.run(resolve_many())
+    asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard-IA"))
+    assert len(compiled) == 1
+
+
+def _backup_offer():
+    dims = {"a": _dim("GB-Mo", "0.05")}
+    return {
+        "offerCode": "AWSBackup",
+        "products": {"BK": {"productFamily": "Storage", "attributes": {"location": VIRGINIA, "usagetype": "USE1-WarmStorage-ByteHrs"}}},
+        "terms": {"OnDemand": {"BK": {"BK.T": {"priceDimensions": dims}}}},
+    }
+
+
+def _offer_file(rel):
+    return rel.strip("/").replace("/", "_")
+
+
+@pytest.fixture
+def price_list(tmp_path, monkeypatch):
+    """Public price list with region indexes served from local files; records every URL fetched."""
+    base = "https://pricing.example.com"
+
+    def offers(code, regions):
+        return {"regions": {r: {"currentVersionUrl": f"/offers/v1.0/aws/{code}/v1/{r}/index.json"} for r in regions}}
+
+    files = {
+        "/offers/v1.0/aws/index.json": {"offers": {
+            code: {
+                "currentVersionUrl": f"/offers/v1.0/aws/{code}/current/index.json",
+                "currentRegionIndexUrl": f"/offers/v1.0/aws/{code}/current/region_index.json",
+            } for code in ("AmazonS3", "AWSBackup")
+        }},
+        "/offers/v1.0/aws/AmazonS3/current/region_index.json": offers("AmazonS3", ["us-east-1", "eu-west-1"]),
+        "/offers/v1.0/aws/AWSBackup/current/region_index.json": offers("AWSBackup", ["us-east-1"]),
+        "/offers/v1.0/aws/AmazonS3/v1/us-east-1/index.json": _offer(),
+        "/offers/v1.0/aws/AmazonS3/v1/eu-west-1/index.json": _offer(),
+        "/offers/v1.0/aws/AmazonS3/current/index.json": _offer(),
+        "/offers/v1.0/aws/AWSBackup/v1/us-east-1/index.json": _backup_offer(),
+        "/offers/v1.0/aws/AWSBackup/current/index.json": _backup_offer(),
+    }
+    fetched = []
+
+    async def fetch(url, timeout=None, revalidate=False):
+        rel = url[len(base):]
+        fetched.append(rel)
+        if rel not in files:
+            return None, "HTTP 404: Not Found"
+        path = tmp_path / _offer_file(rel)
+        path.write_text(json.dumps(files[rel]))
+        return path, ""
+
+    monkeypatch.setattr(pub.offer_store, "fetch", fetch)
+    monkeypatch.setattr(pub, "_indexes", {})
+    monkeypatch.setattr(pub, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(pub, "OFFERS_BASE", f"{base}/offers/v1.0/aws")
+    monkeypatch.setattr(pub, "catalog", OfferCatalog(f"{base}/offers/v1.0/aws/index.json", base, pub._fetch_json))
+    return files, fetched
+
+
+def test_s3_fetches_only_the_regional_file(price_list):
+    _, fetched = price_list
+    result = asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard"))
+    assert result.rate_per_gb_month == 0.024
+    assert result.raw_filter_used["url"].endswith("/AmazonS3/v1/eu-west-1/index.json")
+    assert fetched == [
+        "/offers/v1.0/aws/index.json",
+        "/offers/v1.0/aws/AmazonS3/current/region_index.json",
+        "/offers/v1.0/aws/AmazonS3/v1/eu-west-1/index.json",
+    ]
+
+
+def test_backup_falls_back_to_fallback_region_file(price_list):
+    _, fetched = price_list
+    result = asyncio.run(pub.resolve_aws_backup_storage_public("eu-west-1"))
+    assert result.rate_per_gb_month == 0.05 and "us-east-1" in result.error
+    assert result.raw_filter_used["location"] == IRELAND
+    assert not any(f.endswith("/current/index.json") for f in fetched)  # never the all-regions file
+
+
+def test_global_file_is_last_resort(price_list):
+    files, fetched = price_list
+    del files["/offers/v1.0/aws/AmazonS3/current/region_index.json"]
+    result = asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert result.sku == "S3STD"
+    assert fetched[-2:] == ["/offers/v1.0/aws/AmazonS3/current/us-east-1/index.json", "/offers/v1.0/aws/AmazonS3/current/index.json"]
+
+
+def test_reingest_follows_new_regional_version(price_list):
+    files, _ = price_list
+    asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    old_url = next(iter(pub._indexes))
+    files["/offers/v1.0/aws/AmazonS3/current/region_index.json"]["regions"]["us-east-1"]["currentVersionUrl"] = "/offers/v1.0/aws/AmazonS3/v2/us-east-1/index.json"
+    files["/offers/v1.0/aws/AmazonS3/v2/us-east-1/index.json"] = _offer()
+    assert asyncio.run(pub.reingest("AmazonS3")) is True
+    assert old_url not in pub._indexes
+    result = asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert result.raw_filter_used["url"].endswith("/AmazonS3/v2/us-east-1/index.json")
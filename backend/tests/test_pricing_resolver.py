@@ -0,0 +1,90 @@
+# test_pricing_resolver.py - v1.0
+# Unit tests: lazy GetProducts pagination (early exit, page budget) and the API fallbacks reading from it.
+# Dependencies: pricing_resolver. Port: N/A.
+
+import json
+
+import pytest
+
+from app import pricing_resolver as resolver
+
+VIRGINIA = "US East (N. Virginia)"
+
+
+def _product(sku, term_type="OnDemand", usd="0.05", unit="GB-Mo", family="Storage", begin=None):
+    dim = {"unit": unit, "pricePerUnit": {"USD": usd}}
+    if begin is not None:
+        dim["beginRange"], dim["endRange"] = begin, "Inf"
+    return json.dumps({
+        "product": {"sku": sku, "attributes": {"productFamily": family, "location": VIRGINIA}},
+        "terms": {term_type: {f"{sku}.T": {"priceDimensions": {"d": dim}}}},
+    })
+
+
+class _PagedClient:
+    """Fake pricing client: serves pages lazily and records how many were requested."""
+
+    def __init__(self, pages):
+        self._pages = pages
+        self.served = 0
+        self.config = None
+
+    def get_paginator(self, name):
+        assert name == "get_products"
+        return self
+
+    def paginate(self, ServiceCode, Filters, PaginationConfig):
+        self.config = PaginationConfig
+        for i, products in enumerate(self._pages):
+            self.served += 1
+            page = {"PriceList": products}
+            if i < len(self._pages) - 1:
+                page["NextToken"] = str(i + 1)
+            yield page
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit(monkeypatch):
+    monkeypatch.setattr(resolver, "pricing_api_circuit", resolver.CircuitBreaker("pricing-api"))
+
+
+def _public_failure():
+    return resolver.PricingResult(error="Public price list unavailable.")
+
+
+def test_products_decoded_lazily_page_by_page():
+    client = _PagedClient([[_product("A"), "{not json"], [_product("B")]])
+    products = resolver.get_products(client, "AWS Backup", [], page_size=2)
+    assert client.served == 0
+    assert next(products)["product"]["sku"] == "A"
+    assert client.served == 1
+    assert [p["product"]["sku"] for p in products] == ["B"]
+    assert client.config == {"PageSize": 2}
+
+
+def test_page_budget_bounds_pagination():
+    client = _PagedClient([[_product(str(i))] for i in range(5)])
+    skus = [p["product"]["sku"] for p in resolver.get_products(client, "Amazon S3", [], max_pages=2)]
+    assert skus == ["0", "1"] and client.served == 2
+
+
+def test_backup_stops_paginating_at_first_on_demand_rate():
+    pages = [[_product("XFER", unit="GB", family="Data Transfer"), _product("BK")], [_product("LATER")], [_product("LAST")]]
+    client = _PagedClient(pages)
+    result = resolver._resolve_aws_backup_storage_api(VIRGINIA, "USD", client, _public_failure())
+    assert result.sku == "BK" and result.term_code == "OnDemand" and result.rate_per_gb_month == 0.05
+    assert client.served == 1
+
+
+def test_backup_falls_back_to_first_reserved_rate():
+    client = _PagedClient([[_product("R1", term_type="Reserved", usd="0.04")], [_product("R2", term_type="Reserved")]])
+    result = resolver._resolve_aws_backup_storage_api(VIRGINIA, "USD", client, _public_failure())
+    assert result.sku == "R1" and result.term_code == "Reserved" and result.rate_per_gb_month == 0.04
+    assert client.served == 2
+
+
+def test_s3_collects_tiers_across_pages():
+    client = _PagedClient([[_product("T1", usd="0.023", begin="0")], [_product("T2", usd="0.022", begin="51200")]])
+    result = resolver._resolve_s3_storage_api(VIRGINIA, "Standard", "USD", client, _public_failure())
+    assert [t["rate_per_gb_month"] for t in result.tiers] == [0.023, 0.022]
+    assert client.served == 2
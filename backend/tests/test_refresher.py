@@ -0,0 +1,130 @@
+# test_refresher.py - v1.0
+# Unit tests: scheduled price list refresh (change detection, re-ingest and index swap). No network.
+# Dependencies: refresher, offer_catalog, public_pricing. Port: N/A.
+
+import asyncio
+import json
+
+from app import public_pricing as pub
+from app.offer_catalog import OfferCatalog
+from app.refresher import PriceListRefresher
+from tests.test_pricing_index import _offer
+
+
+def _index(published):
+    return {
+        "publicationDate": published,
+        "offers": {"AmazonS3": {"currentVersionUrl": "/offers/v1.0/aws/AmazonS3/current/index.json"}},
+    }
+
+
+def _refresher(responses, reingest_result=True):
+    revalidated = []
+
+    async def fetch(url, revalidate=False):
+        revalidated.append(revalidate)
+        return responses.pop(0) if len(responses) > 1 else responses[0], ""
+
+    catalog = OfferCatalog("https://p.example.com/offers/v1.0/aws/index.json", "https://p.example.com", fetch)
+    calls = {"reingest": [], "changed": []}
+
+    async def reingest(code):
+        calls["reingest"].append(code)
+        return reingest_result
+
+    async def on_change(code):
+        calls["changed"].append(code)
+
+    refresher = PriceListRefresher(catalog, lambda: ["AmazonS3"], reingest, on_change, interval_seconds=0.01)
+    return refresher, catalog, calls, revalidated
+
+
+def test_unchanged_index_skips_reingest():
+    refresher, catalog, calls, revalidated = _refresher([_index("2024-01-01")])
+
+    async def run():
+        await catalog.refresh()
+        return await refresher.check_once()
+
+    assert asyncio.run(run()) == []
+    assert calls["reingest"] == [] and revalidated == [False, True]
+
+
+def test_new_publication_reingests_changed_services():
+    refresher, catalog, calls, _ = _refresher([_index("2024-01-01"), _index("2024-02-01")])
+
+    async def run():
+        await catalog.refresh()
+        return await refresher.check_once()
+
+    assert asyncio.run(run()) == ["AmazonS3"]
+    assert calls == {"reingest": ["AmazonS3"], "changed": ["AmazonS3"]}
+
+
+def test_change_detected_when_requests_refreshed_catalog_first():
+    refresher, catalog, calls, _ = _refresher([_index("2024-01-01"), _index("2024-01-01"), _index("2024-02-01")])
+
+    async def run():
+        await catalog.refresh()
+        first = await refresher.check_once()
+        await catalog.refresh(force=True)  # a request loads the new publication before the next check
+        return first, await refresher.check_once()
+
+    assert asyncio.run(run()) == ([], ["AmazonS3"])
+    assert calls == {"reingest": ["AmazonS3"], "changed": ["AmazonS3"]}
+
+
+def test_reingest_without_file_change_does_not_notify():
+    refresher, catalog, calls, _ = _refresher(
+        [_index("2024-01-01"), _index("2024-02-01")], reingest_result=False
+    )
+
+    async def run():
+        await catalog.refresh()
+        return await refresher.check_once()
+
+    assert asyncio.run(run()) == []
+    assert calls["reingest"] == ["AmazonS3"] and calls["changed"] == []
+
+
+def test_periodic_loop_and_status():
+    refresher, catalog, calls, _ = _refresher([_index("2024-01-01")])
+
+    async def run():
+        await catalog.refresh()
+        refresher.start()
+        while refresher.status()["checks"] < 2:
+            await asyncio.sleep(0.005)
+        running = refresher.status()["running"]
+        await refresher.stop()
+        return running
+
+    assert asyncio.run(run()) is True
+    status = refresher.status()
+    assert not status["running"] and status["errors"] == 0 and status["last_changed"] == []
+
+
+def test_public_pricing_reingest_swaps_index(tmp_path, monkeypatch):
+    path = tmp_path / "offer.json"
+    offer = _offer()
+    path.write_text(json.dumps(offer))
+    revalidated = []
+
+    async def fetch(url, timeout=None, revalidate=False):
+        revalidated.append(revalidate)
+        return path, ""
+
+    monkeypatch.setattr(pub.offer_store, "fetch", fetch)
+    monkeypatch.setattr(pub, "_indexes", {})
+    monkeypatch.setattr(pub, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    first = asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard"))
+    assert first.rate_per_gb_month == 0.024
+    assert pub.compiled_service_codes() == {"AmazonS3"}
+    assert asyncio.run(pub.reingest("AmazonS3")) is False  # file unchanged: nothing recompiled
+    assert revalidated[-1] is True
+
+    offer["terms"]["OnDemand"]["S3IE"]["S3IE.T"]["priceDimensions"]["a"]["pricePerUnit"]["USD"] = "0.020"
+    path.write_text(json.dumps(offer))
+    assert asyncio.run(pub.reingest("AmazonS3")) is True
+    assert asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard")).rate_per_gb_month == 0.020
+    assert asyncio.run(pub.reingest("AWSBackup")) is False
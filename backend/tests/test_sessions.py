@@ -0,0 +1,138 @@
+# test_sessions.py - v1.0
+# Unit tests: conversation session store on memory / SQLite / Redis-protocol backends and the session API.
+# Dependencies: conversation.state, backends, main. Port: N/A.
+
+import pytest
+from app import main
+from app.backends import MemoryBackend, RedisBackend, SqliteBackend
+from app.conversation import state
+from fastapi.testclient import TestClient
+from tests.fake_redis import FakeRedisServer
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_backend(request, tmp_path):
+    """Factory of backends that share one store, like several app workers would."""
+    if request.param == "redis":
+        server = FakeRedisServer().__enter__()
+        request.addfinalizer(lambda: server.__exit__(None, None, None))
+        return lambda: RedisBackend(server.url)
+    if request.param == "sqlite":
+        return lambda: SqliteBackend(tmp_path / "sessions.sqlite3", table="sessions")
+    shared = MemoryBackend()
+    return lambda: shared
+
+
+def test_session_visible_to_other_workers(make_backend):
+    worker_a, worker_b = state.SessionStore(make_backend()), state.SessionStore(make_backend())
+    s = worker_a.create_or_update(mode="expert")
+    s.append("user", "How much is 10 TB in S3?")
+    s.append("assistant", "About $235/month in us-east-1.")
+    worker_a.save(s)
+
+    other = worker_b.get(s.session_id)
+    assert other is not None and other.mode == "expert"
+    assert [(m.role, m.content) for m in other.messages] == [(m.role, m.content) for m in s.messages]
+
+    again = worker_b.create_or_update(s.session_id, mode="guided")
+    assert again.mode == "guided" and len(again.messages) == 2
+    assert worker_a.get(s.session_id).mode == "guided"
+    assert worker_a.get("missing") is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(state, "_sessions", state.SessionStore(MemoryBackend()))
+    monkeypatch.setattr(main, "WARMUP_ENABLED", False)
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    with TestClient(main.app) as c:
+        yield c
+
+
+def test_conversation_turn_is_saved(client):
+    sid = client.post("/api/session", json={"mode": "expert"}).json()["session_id"]
+    reply = client.post("/api/conversation", json={"session_id": sid, "message": "hi", "mode": "expert"}).json()
+    assert "ANTHROPIC_API_KEY" in reply["reply"]
+    info = client.get(f"/api/session/{sid}").json()
+    assert info == {"session_id": sid, "mode": "expert", "message_count": 2}
+    assert client.get("/api/session/unknown").status_code == 404
+
+
+def test_message_budget_trims_oldest_exchanges():
+    store = state.SessionStore(MemoryBackend(), max_messages=4)
+    s = store.create_or_update()
+    for i in range(3):
+        s.append("user", f"q{i}")
+        s.append("assistant", f"a{i}")
+    store.save(s)
+    assert [m.content for m in store.get(s.session_id).messages] == ["q1", "a1", "q2", "a2"]
+    assert store.stats()["trimmed_messages"] == 2
+
+
+def test_byte_budget_keeps_history_starting_with_user():
+    store = state.SessionStore(MemoryBackend(), max_bytes=400)
+    s = store.create_or_update()
+    s.append("user", "x" * 150)
+    s.append("assistant", "y" * 150)
+    s.append("assistant", "z" * 10)
+    s.append("user", "latest")
+    store.save(s)
+    kept = store.get(s.session_id).messages
+    assert [m.content for m in kept] == ["latest"]
+
+
+def test_idle_sessions_expire_and_reads_extend_them():
+    clock = [1000.0]
+    store = state.SessionStore(MemoryBackend(clock=lambda: clock[0]), idle_seconds=60, sweep_interval_seconds=0)
+    active, idle = store.create_or_update(), store.create_or_update()
+    clock[0] += 45
+    assert store.get(active.session_id) is not None  # read restarts the idle timeout
+    clock[0] += 30
+    assert store.get(idle.session_id) is None
+    assert store.get(active.session_id) is not None
+    store.create_or_update()
+    clock[0] += 61
+    stats = store.stats()
+    assert stats["sessions"] == 0 and stats["bytes"] == 0 and stats["expired"] == 2
+
+
+def test_reads_touch_instead_of_rewriting_the_session(make_backend):
+    backend = make_backend()
+    writes = []
+    real_set = backend.set
+    backend.set = lambda *a, **kw: writes.append(a[0]) or real_set(*a, **kw)
+    store = state.SessionStore(backend, idle_seconds=60)
+    s = store.create_or_update()
+    writes.clear()
+    assert store.get(s.session_id) is not None and store.get(s.session_id) is not None
+    assert writes == []
+
+
+def test_session_count_is_cached_between_sweeps():
+    backend = MemoryBackend()
+    store = state.SessionStore(backend, sweep_interval_seconds=60)
+    store.create_or_update()
+    assert store.stats()["sessions"] == 1
+    scans = []
+    real_keys = backend.keys
+    backend.keys = lambda prefix="": scans.append(prefix) or real_keys(prefix)
+    store.create_or_update()
+    assert store.stats()["sessions"] == 1 and scans == []  # approximate until the next recount
+    store._counted_at -= 61
+    assert store.stats()["sessions"] == 2 and scans == ["session:"]
+
+
+def test_session_count_bounded_lru():
+    store = state.SessionStore(MemoryBackend(max_entries=2))
+    first, second = store.create_or_update(), store.create_or_update()
+    store.get(first.session_id)  # second is now least recently used
+    third = store.create_or_update()
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) and store.get(third.session_id)
+    stats = store.stats()
+    assert stats["sessions"] == 2 and stats["evictions"] == 1 and stats["bytes"] > 0
+
+
+def test_health_reports_sessions(client):
+    client.post("/api/session", json={})
+    assert client.get("/health").json()["sessions"]["sessions"] == 1
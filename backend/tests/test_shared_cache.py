@@ -0,0 +1,226 @@
+# test_shared_cache.py - v1.0
+# Unit tests: TTL cache kept in a shared backend (SQLite, Redis protocol) across instances / processes,
+# and its per-key lease.
+# Dependencies: shared_cache, backends. Port: N/A.
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from app.backends import MemoryBackend, RedisBackend, SqliteBackend
+from app.shared_cache import SharedTTLCache
+from tests.fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "cache.sqlite3"
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_cache(request, db):
+    """Factory of caches that all share one store (same SQLite file / same Redis server)."""
+    if request.param == "redis":
+        server = FakeRedisServer().__enter__()
+        request.addfinalizer(lambda: server.__exit__(None, None, None))
+        return lambda **kw: SharedTTLCache(RedisBackend(server.url), **kw)
+    return lambda **kw: SharedTTLCache(SqliteBackend(db), **kw)
+
+
+def test_get_set_invalidate_find(make_cache):
+    cache = make_cache(ttl_seconds=60)
+    assert cache.get(service="s3", region="us-east-1") is None
+    cache.set({"rate": 1, "tiers": [1.5]}, service="s3", region="us-east-1")
+    value, cached_at = cache.get(service="s3", region="us-east-1")
+    assert value == {"rate": 1, "tiers": [1.5]} and cached_at <= time.time()
+    assert cache.find(service="s3") == [{"service": "s3", "region": "us-east-1"}]
+    assert cache.invalidate(service="s3", region="us-east-1") is True
+    assert cache.invalidate(service="s3", region="us-east-1") is False
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 0
+
+
+def test_stats_entry_count_is_cached_between_recounts(make_cache):
+    cache = make_cache()
+    cache.set("v", k="a")
+    assert cache.stats()["entries"] == 1
+    scans = []
+    real_keys = cache.backend.keys
+    cache.backend.keys = lambda prefix="": scans.append(prefix) or real_keys(prefix)
+    cache.set("w", k="b")
+    assert cache.stats()["entries"] == 1 and scans == []  # approximate until the next recount
+    cache._counted_at -= 61
+    assert cache.stats()["entries"] == 2 and scans == ["pricing:"]
+
+
+def test_instances_share_the_store(make_cache):
+    writer, reader = make_cache(), make_cache()
+    writer.set("value", k="a")
+    assert reader.get(k="a")[0] == "value"
+    assert len(reader) == 1
+    reader.invalidate_all()
+    assert writer.get(k="a") is None
+
+
+def test_expiry_and_stale_window(make_cache):
+    cache = make_cache(ttl_seconds=10, stale_ttl_seconds=10)
+    now = [time.time()]
+    cache._now = lambda: now[0]
+    cache.set("v", k="a")
+    now[0] += 15
+    assert cache.get(k="a") is None
+    assert cache.get_stale(k="a")[0::2] == ("v", True)
+    now[0] += 10
+    assert cache.get_stale(k="a") is None
+
+
+def test_backend_ttl_and_sweep(db):
+    clock = [1000.0]
+    cache = SharedTTLCache(SqliteBackend(db, clock=lambda: clock[0]), ttl_seconds=10, stale_ttl_seconds=10)
+    cache.set("v", k="a")
+    cache.set("w", k="b")
+    clock[0] += 21
+    assert cache.sweep() == 2
+    assert len(cache) == 0
+
+
+def test_unreachable_backend_degrades_to_local_compute():
+    with FakeRedisServer() as server:
+        url = server.url
+    cache = SharedTTLCache(RedisBackend(url, timeout_seconds=0.5))
+
+    async def compute():
+        return "computed"
+
+    hit = asyncio.run(cache.aget_or_compute(compute, k="a"))
+    assert hit.value == "computed" and not hit.from_cache
+    assert cache.stats()["backend_errors"] >= 2
+
+
+def test_unreachable_backend_management_calls_do_not_raise():
+    with FakeRedisServer() as server:
+        url = server.url
+    cache = SharedTTLCache(RedisBackend(url, timeout_seconds=0.5))
+    assert cache.invalidate(k="a") is False
+    assert asyncio.run(cache.ainvalidate(k="a")) is False
+    assert cache.find(k="a") == [] and asyncio.run(cache.afind(k="a")) == []
+    cache.invalidate_all()
+    assert len(cache) == 0
+    assert cache.stats()["backend_errors"] == 6
+
+
+class _SlowBackend(MemoryBackend):
+    """Every call blocks its thread, like a SQLite writer lock or a slow Redis round trip."""
+
+    def get(self, key):
+        time.sleep(0.05)
+        return super().get(key)
+
+    def set(self, key, value, ttl_seconds=None):
+        time.sleep(0.05)
+        super().set(key, value, ttl_seconds)
+
+
+def test_backend_io_runs_off_the_event_loop():
+    cache = SharedTTLCache(_SlowBackend())
+    ticks = []
+
+    async def compute():
+        return "v"
+
+    async def ticker():
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    async def run():
+        tick = asyncio.ensure_future(ticker())
+        await cache.aget_or_compute(compute, k="a")  # lookup, lease, lookup, set, lease release
+        hit = await cache.aget_or_compute(compute, k="a")
+        tick.cancel()
+        return hit
+
+    assert asyncio.run(run()).from_cache
+    assert len(ticks) > 10  # the loop kept running while the backend calls blocked
+
+
+def test_waits_for_other_process_lease(make_cache):
+    holder, waiter = make_cache(), make_cache(poll_seconds=0.01)
+    assert holder._try_lease("k=a")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "mine"
+
+    async def run():
+        task = asyncio.ensure_future(waiter.aget_or_compute(compute, k="a"))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        holder.set("theirs", k="a")
+        holder._release_lease("k=a")
+        return await task
+
+    hit = asyncio.run(run())
+    assert hit.value == "theirs" and hit.from_cache
+    assert calls == []
+
+
+def test_expired_lease_is_taken_over(make_cache):
+    holder = make_cache(lease_seconds=60)
+    waiter = make_cache(lease_seconds=0.05, poll_seconds=0.01)
+    assert holder._try_lease("k=a")  # holder "crashes" without releasing
+
+    async def compute():
+        return "mine"
+
+    hit = asyncio.run(waiter.aget_or_compute(compute, k="a"))
+    assert hit.value == "mine" and not hit.from_cache
+    assert holder.get(k="a")[0] == "mine"
+
+
+def test_arefresh_accepts_newer_value_from_other_process(make_cache):
+    holder, waiter = make_cache(), make_cache(poll_seconds=0.01)
+    holder.set("old", k="a")
+    assert holder._try_lease("k=a")
+
+    async def compute():
+        raise AssertionError("refresh computed although another process stored a newer value")
+
+    async def run():
+        task = asyncio.ensure_future(waiter.arefresh(compute, k="a"))
+        await asyncio.sleep(0.05)
+        holder.set("new", k="a")
+        holder._release_lease("k=a")
+        return await task
+
+    assert asyncio.run(run()).value == "new"
+
+
+def _worker(path, log, start):
+    cache = SharedTTLCache(SqliteBackend(path), poll_seconds=0.01)
+    start.wait()
+
+    async def compute():
+        with open(log, "a") as f:
+            f.write("x")
+        await asyncio.sleep(0.3)
+        return "value"
+
+    assert asyncio.run(cache.aget_or_compute(compute, k="a")).value == "value"
+
+
+def test_one_compute_across_processes(db, tmp_path):
+    SqliteBackend(db).close()  # create the table before the workers race
+    log = tmp_path / "computes.log"
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    procs = [ctx.Process(target=_worker, args=(db, log, start)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    start.set()
+    for p in procs:
+        p.join(30)
+    assert [p.exitcode for p in procs] == [0] * 4
+    assert log.read_text() == "x"
@@ -0,0 +1,122 @@
+# test_snapshot.py - v1.0
+# Unit tests: binary snapshot of compiled pricing indexes and the public resolvers loading it on restart.
+# Dependencies: snapshot, pricing_index, public_pricing. Port: N/A.
+
+import asyncio
+import json
+
+import pytest
+from app import public_pricing as pub
+from app.pricing_index import compile_offer
+from app.snapshot import SnapshotError, load_snapshot, snapshot_source_mtime, write_snapshot
+from tests.test_pricing_index import IRELAND, VIRGINIA, _offer
+
+
+def _rows(index):
+    return [(r, r.attributes, r.price_dimension) for r in index]
+
+
+def test_round_trip(tmp_path):
+    offer = _offer()
+    offer["publicationDate"] = "2024-05-01T00:00:00Z"
+    index = compile_offer(offer, "AmazonS3", url="https://example/offer.json")
+    path = tmp_path / "s3.idx"
+    size = write_snapshot(index, path, source_mtime_ns=123)
+    assert size == path.stat().st_size and size % 8 == 0
+
+    loaded = load_snapshot(path)
+    assert _rows(loaded) == _rows(index)
+    assert (loaded.service_code, loaded.url, loaded.version, loaded.publication_date) == (
+        "AmazonS3", "https://example/offer.json", "v1", "2024-05-01T00:00:00Z",
+    )
+    assert set(loaded.locations()) == {VIRGINIA, IRELAND}
+    rows = loaded.select(VIRGINIA, "gp", lambda r: r.usagetype == "TimedStorage-ByteHrs")
+    assert [r.price("USD") for r in rows] == [0.023, 0.022, 0.021]
+    assert rows[2].end_gb == float("inf")
+    assert rows[0].attributes is rows[1].attributes  # one attribute dict per product, as compiled
+    assert snapshot_source_mtime(path) == 123
+
+
+def test_missing_header_fields_stay_none(tmp_path):
+    offer = _offer()
+    del offer["version"]
+    path = tmp_path / "s3.idx"
+    write_snapshot(compile_offer(offer, "AmazonS3"), path)
+    loaded = load_snapshot(path)
+    assert loaded.url is None and loaded.version is None and loaded.publication_date is None
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda raw: b"",
+        lambda raw: raw[:40],
+        lambda raw: raw[: len(raw) // 2],
+        lambda raw: b"NOTASNAP" + raw[8:],
+        lambda raw: raw[:8] + (99).to_bytes(4, "little") + raw[12:],
+    ],
+    ids=["empty", "header-only", "truncated", "magic", "version"],
+)
+def test_unusable_snapshot_raises(tmp_path, damage):
+    path = tmp_path / "s3.idx"
+    write_snapshot(compile_offer(_offer(), "AmazonS3"), path, source_mtime_ns=1)
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+
+def test_source_mtime_of_missing_or_foreign_file(tmp_path):
+    assert snapshot_source_mtime(tmp_path / "nope.idx") is None
+    other = tmp_path / "other.idx"
+    other.write_text("{}" * 40)
+    assert snapshot_source_mtime(other) is None
+
+
+@pytest.fixture
+def stored_offer(tmp_path, monkeypatch):
+    path = tmp_path / "offer.json"
+    path.write_text(json.dumps(_offer()))
+
+    async def fetch(url, timeout=None, revalidate=False):
+        return path, ""
+
+    monkeypatch.setattr(pub.offer_store, "fetch", fetch)
+    monkeypatch.setattr(pub, "_indexes", {})
+    monkeypatch.setattr(pub, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    return path
+
+
+def test_restart_loads_snapshot_without_parsing(stored_offer, monkeypatch):
+    first = asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert list((stored_offer.parent / "snapshots").glob("*.idx"))
+
+    def no_parse(*a, **kw):
+        raise AssertionError("offer file parsed despite a current snapshot")
+
+    monkeypatch.setattr(pub, "_indexes", {})  # new process: compiled indexes are gone
+    monkeypatch.setattr(pub, "load_offer", no_parse)
+    again = asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert again.error is None
+    assert again.tiers == first.tiers and again.sku == "S3STD"
+
+
+def test_stale_or_corrupt_snapshot_is_rebuilt(stored_offer, monkeypatch):
+    asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard"))
+    (snap,) = (stored_offer.parent / "snapshots").glob("*.idx")
+
+    offer = _offer()
+    offer["terms"]["OnDemand"]["S3IE"]["S3IE.T"]["priceDimensions"]["a"]["pricePerUnit"]["USD"] = "0.020"
+    stored_offer.write_text(json.dumps(offer))  # newer stored file: snapshot no longer matches
+    monkeypatch.setattr(pub, "_indexes", {})
+    assert asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard")).rate_per_gb_month == 0.020
+    assert snapshot_source_mtime(snap) == stored_offer.stat().st_mtime_ns
+
+    snap.write_bytes(snap.read_bytes()[:100])
+    monkeypatch.setattr(pub, "_indexes", {})
+    assert asyncio.run(pub.resolve_s3_storage_public("eu-west-1", "Standard")).rate_per_gb_month == 0.020
+
+
+def test_snapshots_can_be_disabled(stored_offer, monkeypatch):
+    monkeypatch.setattr(pub, "SNAPSHOTS_ENABLED", False)
+    asyncio.run(pub.resolve_s3_storage_public("us-east-1", "Standard"))
+    assert not (stored_offer.parent / "snapshots").exists()
@@ -0,0 +1,82 @@
+# test_warmup.py - v1.0
+# Unit tests: startup cache warm-up (progress, failures, cancel) and the /ready gate.
+# Dependencies: warmup, main. Port: N/A.
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.warmup import CacheWarmer, env_list
+
+
+def test_env_list():
+    assert env_list(None, ["a"]) == ["a"]
+    assert env_list(" us-east-1, ,eu-west-1 ", ["a"]) == ["us-east-1", "eu-west-1"]
+
+
+def test_warmer_runs_jobs_with_bounded_concurrency():
+    running = []
+    peak = []
+
+    async def job():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return {"rate_per_gb_month": 0.023}
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def no_price():
+        return {"error": "No S3 storage price found"}
+
+    jobs = [(f"job {i}", job) for i in range(6)] + [("fail", failing), ("empty", no_price)]
+    warmer = CacheWarmer(jobs, concurrency=2)
+    assert warmer.progress()["state"] == "idle"
+
+    async def run():
+        warmer.start()
+        await warmer.wait()
+
+    asyncio.run(run())
+    progress = warmer.progress()
+    assert warmer.finished and progress["state"] == "done"
+    assert (progress["total"], progress["done"], progress["failed"]) == (8, 8, 2)
+    assert max(peak) <= 2
+
+
+def test_warmer_stop_cancels():
+    async def slow():
+        await asyncio.sleep(10)
+
+    warmer = CacheWarmer([("slow", slow)])
+
+    async def run():
+        warmer.start()
+        await asyncio.sleep(0)
+        await warmer.stop()
+
+    asyncio.run(run())
+    assert warmer.progress()["state"] == "cancelled" and not warmer.finished
+
+
+def test_ready_gated_until_warmup_finishes(monkeypatch):
+    async def job():
+        await asyncio.sleep(0.2)
+        return {}
+
+    monkeypatch.setattr(main, "warmer", CacheWarmer([("job", job)]))
+    monkeypatch.setattr(main, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(main, "WARMUP_GATE_READINESS", True)
+    with TestClient(main.app) as client:
+        first = client.get("/ready")
+        assert first.status_code == 503 and first.json()["status"] == "warming"
+        assert client.get("/health").json()["warmup"]["state"] == "running"
+        deadline = time.monotonic() + 5
+        while client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        body = client.get("/ready").json()
+        assert body["status"] == "ready" and body["warmup"]["done"] == 1
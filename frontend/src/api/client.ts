@@ -17,6 +17,7 @@ export type AwsBackupPricing = {
   error?: string;
   cached_at?: number;
   from_cache?: boolean;
+  stale?: boolean; // served past cache TTL while the backend refreshes it
 };
 
 export type S3StoragePricing = {
@@ -32,6 +33,7 @@ export type S3StoragePricing = {
   error?: string;
   cached_at?: number;
   from_cache?: boolean;
+  stale?: boolean; // served past cache TTL while the backend refreshes it
 };
 
 export type RegionOption = { code: string; location: string };
@@ -61,6 +63,28 @@ export async function fetchS3StoragePricing(
   return res.json();
 }
 
+export type BatchPricingItem = {
+  service: "aws-backup" | "s3-storage";
+  region: string;
+  storageClass?: string;
+  currency?: string;
+};
+
+export type BatchPricingResult = BatchPricingItem & (AwsBackupPricing | S3StoragePricing);
+
+export async function fetchPricingBatch(
+  items: BatchPricingItem[],
+  refresh = false
+): Promise<{ results: BatchPricingResult[]; count: number; errors: number }> {
+  const res = await fetch(`${API_BASE}/api/pricing/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ items, refresh }),
+  });
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export async function fetchRegions(): Promise<RegionOption[]> {
   const res = await fetch(`${API_BASE}/api/regions`);
   if (!res.ok) throw new Error(await res.text());
@@ -85,24 +109,75 @@ export type ConversationResponse = {
   recommendation: unknown;
 };
 
+function conversationBody(body: ConversationRequest): string {
+  return JSON.stringify({
+    session_id: body.session_id ?? null,
+    message: body.message,
+    mode: body.mode ?? "balanced",
+    image: body.image ?? null,
+    image_media_type: body.image_media_type ?? null,
+  });
+}
+
 export async function postConversation(
   body: ConversationRequest
 ): Promise<ConversationResponse> {
   const res = await fetch(`${API_BASE}/api/conversation`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
-      session_id: body.session_id ?? null,
-      message: body.message,
-      mode: body.mode ?? "balanced",
-      image: body.image ?? null,
-      image_media_type: body.image_media_type ?? null,
-    }),
+    body: conversationBody(body),
   });
   if (!res.ok) throw new Error(await res.text());
   return res.json();
 }
 
+export type ConversationStreamHandlers = {
+  onStart?: (sessionId: string) => void;
+  onDelta?: (text: string) => void;
+};
+
+/**
+ * Streaming postConversation (server-sent events from /api/conversation/stream). onDelta receives reply
+ * text as it is generated; resolves with the final response, whose reply is authoritative.
+ */
+export async function streamConversation(
+  body: ConversationRequest,
+  handlers: ConversationStreamHandlers = {}
+): Promise<ConversationResponse> {
+  const res = await fetch(`${API_BASE}/api/conversation/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: conversationBody(body),
+  });
+  if (!res.ok || !res.body) throw new Error(await res.text());
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result: ConversationResponse | null = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end: number;
+    while ((end = buffer.indexOf("\n\n")) >= 0) {
+      const block = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+      if (event === "start") handlers.onStart?.(payload.session_id);
+      else if (event === "delta") handlers.onDelta?.(payload.text);
+      else if (event === "done") result = payload as ConversationResponse;
+    }
+  }
+  if (!result) throw new Error("Conversation stream ended before the reply was complete");
+  return result;
+}
+
 export type SessionResponse = {
   session_id: string;
   mode: ConversationMode;
@@ -6,7 +6,7 @@
 
 import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import {
-  postConversation,
+  streamConversation,
   type ConversationMode,
   type ConversationResponse,
 } from "../api/client";
@@ -73,16 +73,33 @@ export default function ChatInterface({
     const imageToSend = attachedImage;
     setAttachedImage(null);
 
+    // The assistant message appears with the first streamed chunk and grows as text arrives.
+    let streaming = false;
     try {
-      const res: ConversationResponse = await postConversation({
-        session_id: sessionId ?? undefined,
-        message: text || (imageToSend ? "Interpret this architecture drawing and suggest a solution." : ""),
-        mode,
-        image: imageToSend?.data ?? undefined,
-        image_media_type: imageToSend?.mediaType ?? undefined,
-      });
+      const res: ConversationResponse = await streamConversation(
+        {
+          session_id: sessionId ?? undefined,
+          message: text || (imageToSend ? "Interpret this architecture drawing and suggest a solution." : ""),
+          mode,
+          image: imageToSend?.data ?? undefined,
+          image_media_type: imageToSend?.mediaType ?? undefined,
+        },
+        {
+          onStart: setSessionId,
+          onDelta: (chunk) => {
+            const first = !streaming;
+            streaming = true;
+            setMessages((prev) =>
+              first
+                ? [...prev, { role: "assistant", content: chunk }]
+                : [...prev.slice(0, -1), { role: "assistant", content: prev[prev.length - 1].content + chunk }]
+            );
+          },
+        }
+      );
       setSessionId(res.session_id);
-      setMessages((prev) => [...prev, { role: "assistant", content: res.reply }]);
+      const final: ChatMessage = { role: "assistant", content: res.reply };
+      setMessages((prev) => (streaming ? [...prev.slice(0, -1), final] : [...prev, final]));
     } catch (e) {
       const msg = e instanceof Error ? e.message : "Failed to send message";
       setMessages((prev) => [